@@ -2,70 +2,283 @@
 Climate data API integrations
 """
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import logging
-from typing import Dict, List, Any, Optional
+import numpy as np
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Callable, Hashable
 from datetime import datetime, timedelta
-import json
+from operator import itemgetter
+import orjson
+from cachetools import LRUCache, TTLCache
 from config import settings
 
 logger = logging.getLogger(__name__)
 
+# World Bank indicators fetched by get_climate_indicators by default
+CLIMATE_INDICATORS = (
+    'EN.ATM.CO2E.PC',  # CO2 emissions (metric tons per capita)
+    'EG.FEC.RNEW.ZS',  # Renewable energy consumption (% of total final energy consumption)
+    'AG.LND.FRST.ZS'   # Forest area (% of land area)
+)
+
+# Upper bounds for bulk NASA POWER / World Bank downloads
+MAX_RESPONSE_BYTES = 10_000_000
+MAX_NASA_DATE_SPAN = timedelta(days=3650)
+
+# (connect, read) timeouts in seconds; NASA POWER is slow to respond under load
+DEFAULT_TIMEOUT = (3.05, 15)
+NASA_TIMEOUT = (3.05, 60)
+
+# Carbon Interface estimate payload builders, keyed by activity type
+CARBON_PAYLOAD_BUILDERS: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    'electricity': lambda activity_data: {
+        'type': 'electricity',
+        'electricity_unit': 'kwh',
+        'electricity_value': activity_data.get('kwh', 0),
+        'country': activity_data.get('country', 'us')
+    },
+    'vehicle': lambda activity_data: {
+        'type': 'vehicle',
+        'distance_unit': activity_data.get('distance_unit', 'km'),
+        'distance_value': activity_data.get('distance', 0),
+        'vehicle_model_id': activity_data.get('vehicle_model_id', '7268a9b7-17e8-4c8d-acca-57059252afe9')  # Default car
+    },
+    'flight': lambda activity_data: {
+        'type': 'flight',
+        'passengers': activity_data.get('passengers', 1),
+        'legs': activity_data.get('legs', [])
+    }
+}
+
+# Approximate grid carbon intensity (kg CO2e per kWh) by Carbon Interface country code
+GRID_CARBON_INTENSITY = {
+    'us': 0.37,
+    'ca': 0.12,
+    'gb': 0.21,
+    'de': 0.38,
+    'fr': 0.06,
+    'es': 0.16,
+    'it': 0.29,
+    'nl': 0.33,
+    'se': 0.04,
+    'no': 0.03,
+    'jp': 0.46,
+    'kr': 0.43,
+    'cn': 0.58,
+    'in': 0.71,
+    'au': 0.63,
+    'br': 0.10,
+    'mx': 0.42,
+    'za': 0.90
+}
+
+KG_TO_LB = 2.20462
+
+# Renewable potential thresholds (upper bounds of Low and Medium): solar in kWh/m²/day, wind in m/s
+SOLAR_POTENTIAL_BINS = (3, 5)
+WIND_POTENTIAL_BINS = (3, 6)
+POTENTIAL_LEVELS = np.array(["Low", "Medium", "High"])
+
+# Projects a World Bank row to its (date, value) pair
+_date_and_value = itemgetter('date', 'value')
+
 class ClimateAPIHandler:
     """Handler for various climate data APIs"""
     
     def __init__(self):
         self.session = requests.Session()
         self.session.headers.update({
-            'User-Agent': 'ClimateIQ-Platform/1.0'
+            'User-Agent': 'ClimateIQ-Platform/1.0',
+            'Connection': 'keep-alive'
         })
+        
+        # Pooled keep-alive connections with retries on throttling and transient server errors
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=64,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        # Fixed endpoints and Carbon Interface auth, built once per handler. The bearer token is
+        # passed per request rather than set on the session so it is never sent to other hosts.
+        self._geocode_url = f"{settings.OPENWEATHER_GEO_API_BASE}/direct"
+        self._weather_url = f"{settings.OPENWEATHER_API_BASE}/weather"
+        self._air_quality_url = f"{settings.OPENWEATHER_API_BASE}/air_pollution"
+        self._nasa_url = f"{settings.NASA_API_BASE}/daily/point"
+        self._carbon_url = f"{settings.CARBON_INTERFACE_API_BASE}/estimates"
+        self._carbon_headers = {
+            'Authorization': f'Bearer {settings.CARBON_INTERFACE_API_KEY}',
+            'Content-Type': 'application/json'
+        }
+        
+        # Answer simple electricity estimates from GRID_CARBON_INTENSITY instead of Carbon Interface
+        self.use_local_carbon = settings.USE_LOCAL_CARBON_FACTORS
+        
+        # Response caches, with TTLs matched to how fast each source changes
+        self._cache_lock = threading.Lock()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._last_good = LRUCache(maxsize=4096)  # outlives the TTL caches, for stale-on-error fallback
+        self._geo_cache = TTLCache(maxsize=4096, ttl=604800)  # 7 days, coordinates are static
+        self._weather_cache = TTLCache(maxsize=1024, ttl=900)  # 15 minutes
+        self._air_quality_cache = TTLCache(maxsize=1024, ttl=1800)  # 30 minutes
+        self._nasa_cache = TTLCache(maxsize=256, ttl=86400)  # 24 hours
+        self._world_bank_cache = TTLCache(maxsize=256, ttl=86400)  # 24 hours
+    
+    def _cached(self, cache: TTLCache, key: Hashable, fetch: Callable[[], Dict[str, Any]],
+                should_store: Callable[[Dict[str, Any]], bool] = None) -> Dict[str, Any]:
+        """Return a cached response for key, or fetch and cache it; error responses are not cached.
+        
+        Concurrent misses for the same key are coalesced: the first caller fetches and the others wait on its result.
+        If the fetch fails, the last good response for the key is served instead, marked 'stale'.
+        """
+        flight_key = (id(cache), key)
+        with self._cache_lock:
+            value = cache.get(key)
+            if value is not None:
+                return value
+            
+            future = self._inflight.get(flight_key)
+            is_leader = future is None
+            if is_leader:
+                future = self._inflight[flight_key] = Future()
+        
+        if not is_leader:
+            return future.result()
+        
+        try:
+            value = fetch()
+        except BaseException as e:
+            with self._cache_lock:
+                del self._inflight[flight_key]
+            future.set_exception(e)
+            raise
+        
+        with self._cache_lock:
+            if 'error' not in value:
+                if should_store is None or should_store(value):
+                    cache[key] = value
+                    self._last_good[flight_key] = value
+            elif flight_key in self._last_good:
+                logger.warning("Serving stale response for %s: %s", key, value['error'])
+                value = {**self._last_good[flight_key], 'stale': True}
+            del self._inflight[flight_key]
+        future.set_result(value)
+        return value
+    
+    def _error_response(self, error: Exception) -> Dict[str, Any]:
+        """Build an error result, flagging upstream timeouts so callers can tell them apart"""
+        if isinstance(error, requests.exceptions.Timeout):
+            return {'error': f"Request timed out: {error}", 'timeout': True}
+        return {'error': str(error)}
+    
+    def _read_bounded_json(self, response: requests.Response) -> Any:
+        """Decode a streamed JSON response, refusing bodies larger than MAX_RESPONSE_BYTES"""
+        with response:
+            if int(response.headers.get('Content-Length') or 0) > MAX_RESPONSE_BYTES:
+                raise ValueError(f"Response too large: {response.headers['Content-Length']} bytes")
+            
+            # Content-Length may be missing (chunked encoding), so also bound what is actually read
+            body = bytearray()
+            for chunk in response.iter_content(chunk_size=65536):
+                body += chunk
+                if len(body) > MAX_RESPONSE_BYTES:
+                    raise ValueError(f"Response too large: over {MAX_RESPONSE_BYTES} bytes")
+        
+        return orjson.loads(body)
+    
+    def get_location_coordinates(self, location: str) -> Dict[str, Any]:
+        """Get coordinates for a location name from OpenWeatherMap geocoding"""
+        return self._cached(self._geo_cache, (location,), lambda: self._fetch_location_coordinates(location))
+    
+    def _fetch_location_coordinates(self, location: str) -> Dict[str, Any]:
+        """Geocode a location name, bypassing the cache"""
+        try:
+            params = {
+                'q': location,
+                'limit': 1,
+                'appid': settings.OPENWEATHER_API_KEY
+            }
+            
+            response = self.session.get(self._geocode_url, params=params, timeout=DEFAULT_TIMEOUT)
+            response.raise_for_status()
+            
+            data = orjson.loads(response.content)
+            
+            if data:
+                return {
+                    'location': data[0]['name'],
+                    'country': data[0].get('country'),
+                    'lat': data[0]['lat'],
+                    'lon': data[0]['lon']
+                }
+            
+            return {'error': f'Location not found: {location}'}
+            
+        except Exception as e:
+            logger.error("Error geocoding location: %s", e)
+            return self._error_response(e)
     
     def get_weather_data(self, location: str) -> Dict[str, Any]:
         """Get current weather data from OpenWeatherMap"""
+        return self._cached(self._weather_cache, (location,), lambda: self._fetch_weather_data(location))
+    
+    def _fetch_weather_data(self, location: str) -> Dict[str, Any]:
+        """Fetch current weather data from OpenWeatherMap, bypassing the cache"""
         try:
-            url = f"{settings.OPENWEATHER_API_BASE}/weather"
             params = {
                 'q': location,
                 'appid': settings.OPENWEATHER_API_KEY,
                 'units': 'metric'
             }
             
-            response = self.session.get(url, params=params)
+            response = self.session.get(self._weather_url, params=params, timeout=DEFAULT_TIMEOUT)
             response.raise_for_status()
             
-            data = response.json()
+            data = orjson.loads(response.content)
+            main = data['main']
+            coord = data['coord']
             
             return {
                 'location': data['name'],
                 'country': data['sys']['country'],
-                'temperature': data['main']['temp'],
-                'humidity': data['main']['humidity'],
-                'pressure': data['main']['pressure'],
+                'temperature': main['temp'],
+                'humidity': main['humidity'],
+                'pressure': main['pressure'],
                 'weather': data['weather'][0]['description'],
                 'wind_speed': data['wind']['speed'],
                 'coordinates': {
-                    'lat': data['coord']['lat'],
-                    'lon': data['coord']['lon']
+                    'lat': coord['lat'],
+                    'lon': coord['lon']
                 }
             }
             
         except Exception as e:
-            logger.error(f"Error fetching weather data: {e}")
-            return {'error': str(e)}
+            logger.error("Error fetching weather data: %s", e)
+            return self._error_response(e)
     
     def get_air_quality(self, lat: float, lon: float) -> Dict[str, Any]:
         """Get air quality data from OpenWeatherMap"""
+        return self._cached(self._air_quality_cache, (round(lat, 3), round(lon, 3)),
+                            lambda: self._fetch_air_quality(lat, lon))
+    
+    def _fetch_air_quality(self, lat: float, lon: float) -> Dict[str, Any]:
+        """Fetch air quality data from OpenWeatherMap, bypassing the cache"""
         try:
-            url = f"{settings.OPENWEATHER_API_BASE}/air_pollution"
             params = {
                 'lat': lat,
                 'lon': lon,
                 'appid': settings.OPENWEATHER_API_KEY
             }
             
-            response = self.session.get(url, params=params)
+            response = self.session.get(self._air_quality_url, params=params, timeout=DEFAULT_TIMEOUT)
             response.raise_for_status()
             
-            data = response.json()
+            data = orjson.loads(response.content)
             
             if data['list']:
                 aqi_data = data['list'][0]
@@ -78,13 +291,21 @@ class ClimateAPIHandler:
             return {'error': 'No air quality data available'}
             
         except Exception as e:
-            logger.error(f"Error fetching air quality data: {e}")
-            return {'error': str(e)}
+            logger.error("Error fetching air quality data: %s", e)
+            return self._error_response(e)
     
     def get_nasa_power_data(self, lat: float, lon: float, start_date: str, end_date: str) -> Dict[str, Any]:
         """Get NASA POWER data for renewable energy potential"""
+        return self._cached(self._nasa_cache, (round(lat, 3), round(lon, 3), start_date, end_date),
+                            lambda: self._fetch_nasa_power_data(lat, lon, start_date, end_date))
+    
+    def _fetch_nasa_power_data(self, lat: float, lon: float, start_date: str, end_date: str) -> Dict[str, Any]:
+        """Fetch NASA POWER data, bypassing the cache"""
         try:
-            url = f"{settings.NASA_API_BASE}/daily/point"
+            span = datetime.strptime(end_date, '%Y%m%d') - datetime.strptime(start_date, '%Y%m%d')
+            if not timedelta(0) <= span <= MAX_NASA_DATE_SPAN:
+                raise ValueError(f"Date range {start_date}-{end_date} must be non-negative and at most 10 years")
+            
             params = {
                 'parameters': 'ALLSKY_SFC_SW_DWN,T2M,WS10M',  # Solar irradiance, temperature, wind speed
                 'community': 'RE',  # Renewable Energy
@@ -96,78 +317,73 @@ class ClimateAPIHandler:
                 'api_key': settings.NASA_API_KEY
             }
             
-            response = self.session.get(url, params=params)
+            response = self.session.get(self._nasa_url, params=params, stream=True, timeout=NASA_TIMEOUT)
             response.raise_for_status()
             
-            data = response.json()
+            data = self._read_bounded_json(response)
+            parameter = data['properties']['parameter']
+            lon, lat = data['geometry']['coordinates'][:2]
             
             return {
-                'solar_irradiance': data['properties']['parameter']['ALLSKY_SFC_SW_DWN'],
-                'temperature': data['properties']['parameter']['T2M'],
-                'wind_speed': data['properties']['parameter']['WS10M'],
+                'solar_irradiance': parameter['ALLSKY_SFC_SW_DWN'],
+                'temperature': parameter['T2M'],
+                'wind_speed': parameter['WS10M'],
                 'location': {
-                    'lat': data['geometry']['coordinates'][1],
-                    'lon': data['geometry']['coordinates'][0]
+                    'lat': lat,
+                    'lon': lon
                 }
             }
             
         except Exception as e:
-            logger.error(f"Error fetching NASA POWER data: {e}")
-            return {'error': str(e)}
+            logger.error("Error fetching NASA POWER data: %s", e)
+            return self._error_response(e)
     
     def calculate_carbon_footprint(self, activity_type: str, activity_data: Dict[str, Any]) -> Dict[str, Any]:
         """Calculate carbon footprint using Carbon Interface API"""
+        if self.use_local_carbon and activity_type == 'electricity':
+            country = str(activity_data.get('country', 'us')).lower()
+            if country in GRID_CARBON_INTENSITY:
+                return self._estimate_electricity_locally(activity_data, country)
+        
         try:
-            url = f"{settings.CARBON_INTERFACE_API_BASE}/estimates"
-            headers = {
-                'Authorization': f'Bearer {settings.CARBON_INTERFACE_API_KEY}',
-                'Content-Type': 'application/json'
-            }
-            
             # Prepare payload based on activity type
             payload = self._prepare_carbon_payload(activity_type, activity_data)
             
-            response = self.session.post(url, headers=headers, json=payload)
+            response = self.session.post(self._carbon_url, headers=self._carbon_headers, data=orjson.dumps(payload), timeout=DEFAULT_TIMEOUT)
             response.raise_for_status()
             
-            data = response.json()
+            attributes = orjson.loads(response.content)['data']['attributes']
             
             return {
-                'carbon_kg': data['data']['attributes']['carbon_kg'],
-                'carbon_lb': data['data']['attributes']['carbon_lb'],
-                'carbon_mt': data['data']['attributes']['carbon_mt'],
+                'carbon_kg': attributes['carbon_kg'],
+                'carbon_lb': attributes['carbon_lb'],
+                'carbon_mt': attributes['carbon_mt'],
                 'activity_type': activity_type,
                 'activity_data': activity_data
             }
             
         except Exception as e:
-            logger.error(f"Error calculating carbon footprint: {e}")
-            return {'error': str(e)}
+            logger.error("Error calculating carbon footprint: %s", e)
+            return self._error_response(e)
+    
+    def _estimate_electricity_locally(self, activity_data: Dict[str, Any], country: str) -> Dict[str, Any]:
+        """Estimate electricity emissions from the local grid intensity table"""
+        carbon_kg = activity_data.get('kwh', 0) * GRID_CARBON_INTENSITY[country]
+        return {
+            'carbon_kg': round(carbon_kg, 2),
+            'carbon_lb': round(carbon_kg * KG_TO_LB, 2),
+            'carbon_mt': round(carbon_kg / 1000, 4),
+            'activity_type': 'electricity',
+            'activity_data': activity_data,
+            'source': 'local_factors'
+        }
     
     def _prepare_carbon_payload(self, activity_type: str, activity_data: Dict[str, Any]) -> Dict[str, Any]:
         """Prepare payload for Carbon Interface API"""
-        if activity_type == 'electricity':
-            return {
-                'type': 'electricity',
-                'electricity_unit': 'kwh',
-                'electricity_value': activity_data.get('kwh', 0),
-                'country': activity_data.get('country', 'us')
-            }
-        elif activity_type == 'vehicle':
-            return {
-                'type': 'vehicle',
-                'distance_unit': activity_data.get('distance_unit', 'km'),
-                'distance_value': activity_data.get('distance', 0),
-                'vehicle_model_id': activity_data.get('vehicle_model_id', '7268a9b7-17e8-4c8d-acca-57059252afe9')  # Default car
-            }
-        elif activity_type == 'flight':
-            return {
-                'type': 'flight',
-                'passengers': activity_data.get('passengers', 1),
-                'legs': activity_data.get('legs', [])
-            }
-        else:
+        builder = CARBON_PAYLOAD_BUILDERS.get(activity_type)
+        if builder is None:
             raise ValueError(f"Unsupported activity type: {activity_type}")
+        return builder(activity_data)
     
     def get_climate_trace_data(self, country: str = None, sector: str = None, year: int = 2022) -> Dict[str, Any]:
         """Get emissions data from Climate TRACE using correct API endpoints"""
@@ -200,10 +416,10 @@ class ClimateAPIHandler:
                 if sector:
                     params['sectors'] = sector
             
-            response = self.session.get(url, params=params)
+            response = self.session.get(url, params=params, timeout=DEFAULT_TIMEOUT)
             response.raise_for_status()
             
-            data = response.json()
+            data = orjson.loads(response.content)
             
             # Process the response based on endpoint
             if 'assets/emissions' in url:
@@ -232,23 +448,23 @@ class ClimateAPIHandler:
             
         except requests.exceptions.HTTPError as e:
             if e.response.status_code == 404:
-                logger.warning(f"Climate TRACE endpoint not found: {e}")
+                logger.warning("Climate TRACE endpoint not found: %s", e)
                 return self._get_climate_trace_fallback_data(country, sector, year)
             else:
-                logger.error(f"HTTP error fetching Climate TRACE data: {e}")
+                logger.error("HTTP error fetching Climate TRACE data: %s", e)
                 return {'error': f'HTTP {e.response.status_code}: {str(e)}'}
         except Exception as e:
-            logger.error(f"Error fetching Climate TRACE data: {e}")
+            logger.error("Error fetching Climate TRACE data: %s", e)
             return self._get_climate_trace_fallback_data(country, sector, year)
     
     def get_climate_trace_sectors(self) -> Dict[str, Any]:
         """Get available sectors from Climate TRACE"""
         try:
             url = f"{settings.CLIMATETRACE_API_BASE}/definitions/sectors"
-            response = self.session.get(url)
+            response = self.session.get(url, timeout=DEFAULT_TIMEOUT)
             response.raise_for_status()
             
-            sectors_data = response.json()
+            sectors_data = orjson.loads(response.content)
             
             # Convert list to dict if needed
             if isinstance(sectors_data, list):
@@ -262,7 +478,7 @@ class ClimateAPIHandler:
             }
             
         except Exception as e:
-            logger.error(f"Error fetching Climate TRACE sectors: {e}")
+            logger.error("Error fetching Climate TRACE sectors: %s", e)
             return {
                 'sectors': {
                     'power': 1,
@@ -283,16 +499,16 @@ class ClimateAPIHandler:
         """Get available countries from Climate TRACE"""
         try:
             url = f"{settings.CLIMATETRACE_API_BASE}/definitions/countries"
-            response = self.session.get(url)
+            response = self.session.get(url, timeout=DEFAULT_TIMEOUT)
             response.raise_for_status()
             
             return {
-                'countries': response.json(),
+                'countries': orjson.loads(response.content),
                 'source': 'climate_trace_api'
             }
             
         except Exception as e:
-            logger.error(f"Error fetching Climate TRACE countries: {e}")
+            logger.error("Error fetching Climate TRACE countries: %s", e)
             return {
                 'countries': ['USA', 'CHN', 'IND', 'RUS', 'JPN', 'DEU', 'IRN', 'SAU', 'KOR', 'CAN'],
                 'source': 'fallback_data'
@@ -312,10 +528,10 @@ class ClimateAPIHandler:
             if sector:
                 params['sectors'] = sector
             
-            response = self.session.get(url, params=params)
+            response = self.session.get(url, params=params, timeout=DEFAULT_TIMEOUT)
             response.raise_for_status()
             
-            data = response.json()
+            data = orjson.loads(response.content)
             
             return {
                 'assets': data,
@@ -328,8 +544,8 @@ class ClimateAPIHandler:
             }
             
         except Exception as e:
-            logger.error(f"Error searching Climate TRACE assets: {e}")
-            return {'error': str(e)}
+            logger.error("Error searching Climate TRACE assets: %s", e)
+            return self._error_response(e)
     
     def _get_climate_trace_fallback_data(self, country: str = None, sector: str = None, year: int = 2022) -> Dict[str, Any]:
         """Provide fallback data when Climate TRACE API is unavailable"""
@@ -361,6 +577,11 @@ class ClimateAPIHandler:
     
     def get_world_bank_climate_data(self, country_code: str, indicator: str) -> Dict[str, Any]:
         """Get climate indicators from World Bank API"""
+        return self._cached(self._world_bank_cache, (country_code, indicator),
+                            lambda: self._fetch_world_bank_climate_data(country_code, indicator))
+    
+    def _fetch_world_bank_climate_data(self, country_code: str, indicator: str) -> Dict[str, Any]:
+        """Fetch a World Bank indicator series, bypassing the cache"""
         try:
             url = f"{settings.WORLD_BANK_API_BASE}/country/{country_code}/indicator/{indicator}"
             params = {
@@ -369,73 +590,133 @@ class ClimateAPIHandler:
                 'per_page': 100
             }
             
-            response = self.session.get(url, params=params)
+            response = self.session.get(url, params=params, stream=True, timeout=DEFAULT_TIMEOUT)
             response.raise_for_status()
             
-            data = response.json()
-            
-            if len(data) > 1 and data[1]:
-                return {
-                    'country': data[1][0]['country']['value'],
-                    'indicator': data[1][0]['indicator']['value'],
-                    'data': [
-                        {
-                            'year': item['date'],
-                            'value': item['value']
-                        }
-                        for item in data[1] if item['value'] is not None
-                    ]
-                }
-            
-            return {'error': 'No data available'}
+            return self._parse_world_bank_series(self._read_bounded_json(response))
             
         except Exception as e:
-            logger.error(f"Error fetching World Bank data: {e}")
-            return {'error': str(e)}
+            logger.error("Error fetching World Bank data: %s", e)
+            return self._error_response(e)
     
-    def get_renewable_energy_potential(self, location: str) -> Dict[str, Any]:
-        """Get renewable energy potential for a location"""
+    def _parse_world_bank_series(self, data: Any) -> Dict[str, Any]:
+        """Convert a World Bank indicator response into a year/value series"""
+        rows = data[1] if len(data) > 1 else None
+        if rows:
+            first = rows[0]
+            return {
+                'country': first['country']['value'],
+                'indicator': first['indicator']['value'],
+                'data': [
+                    {'year': year, 'value': value}
+                    for year, value in map(_date_and_value, rows) if value is not None
+                ]
+            }
+        
+        return {'error': 'No data available'}
+    
+    def get_climate_indicators(self, country_code: str, indicators: List[str] = None) -> Dict[str, Any]:
+        """Get several World Bank climate indicators for a country in a single request"""
+        indicators = tuple(indicators or CLIMATE_INDICATORS)
+        return self._cached(self._world_bank_cache, (country_code, indicators),
+                            lambda: self._fetch_climate_indicators(country_code, list(indicators)),
+                            should_store=lambda value: not any('error' in series for series in value['indicators'].values()))
+    
+    def _fetch_climate_indicators(self, country_code: str, indicators: List[str]) -> Dict[str, Any]:
+        """Fetch several World Bank indicators in one multi-indicator request, bypassing the cache"""
         try:
-            # Get coordinates from weather API
-            weather_data = self.get_weather_data(location)
-            if 'error' in weather_data:
-                return weather_data
-            
-            lat = weather_data['coordinates']['lat']
-            lon = weather_data['coordinates']['lon']
-            
-            # Get NASA POWER data for the last 30 days
-            end_date = datetime.now().strftime('%Y%m%d')
-            start_date = (datetime.now() - timedelta(days=30)).strftime('%Y%m%d')
-            
-            nasa_data = self.get_nasa_power_data(lat, lon, start_date, end_date)
+            url = f"{settings.WORLD_BANK_API_BASE}/country/{country_code}/indicator/{';'.join(indicators)}"
+            params = {
+                'format': 'json',
+                'date': '2020:2023',  # Recent years
+                'per_page': 1000,
+                'source': 2  # World Development Indicators; required for multi-indicator queries
+            }
             
-            if 'error' in nasa_data:
-                return nasa_data
+            response = self.session.get(url, params=params, stream=True, timeout=DEFAULT_TIMEOUT)
+            response.raise_for_status()
             
-            # Calculate averages
-            solar_values = list(nasa_data['solar_irradiance'].values())
-            wind_values = list(nasa_data['wind_speed'].values())
+            data = self._read_bounded_json(response)
             
-            avg_solar = sum(solar_values) / len(solar_values) if solar_values else 0
-            avg_wind = sum(wind_values) / len(wind_values) if wind_values else 0
+            # All series come back in one list; split them by indicator id
+            rows_by_indicator = {indicator: [] for indicator in indicators}
+            for item in (data[1] or []) if len(data) > 1 else []:
+                rows_by_indicator.setdefault(item['indicator']['id'], []).append(item)
             
-            # Simple potential calculations
-            solar_potential = "High" if avg_solar > 5 else "Medium" if avg_solar > 3 else "Low"
-            wind_potential = "High" if avg_wind > 6 else "Medium" if avg_wind > 3 else "Low"
+            climate_data = {
+                indicator: self._parse_world_bank_series([data[0], rows])
+                for indicator, rows in rows_by_indicator.items()
+            }
             
             return {
-                'location': location,
-                'solar_potential': solar_potential,
-                'wind_potential': wind_potential,
-                'avg_solar_irradiance': round(avg_solar, 2),
-                'avg_wind_speed': round(avg_wind, 2),
-                'recommendations': self._generate_renewable_recommendations(solar_potential, wind_potential)
+                'country_code': country_code,
+                'indicators': climate_data
             }
             
         except Exception as e:
-            logger.error(f"Error calculating renewable energy potential: {e}")
-            return {'error': str(e)}
+            logger.error("Error fetching climate indicators: %s", e)
+            return self._error_response(e)
+    
+    def get_renewable_energy_potential(self, location: str) -> Dict[str, Any]:
+        """Get renewable energy potential for a location"""
+        return self.get_renewable_energy_potential_batch([location])[0]
+    
+    def get_renewable_energy_potential_batch(self, locations: List[str]) -> List[Dict[str, Any]]:
+        """Get renewable energy potential for several locations, fetching their NASA POWER data concurrently"""
+        if not locations:
+            return []
+        
+        # NASA POWER window: the last 30 days
+        now = datetime.now()
+        end_date = now.strftime('%Y%m%d')
+        start_date = (now - timedelta(days=30)).strftime('%Y%m%d')
+        
+        with ThreadPoolExecutor(max_workers=min(16, len(locations))) as executor:
+            power_data = list(executor.map(
+                lambda location: self._fetch_location_power_data(location, start_date, end_date), locations
+            ))
+        
+        # Classify every successful location in one vectorized pass
+        results = list(power_data)
+        valid = [i for i, data in enumerate(power_data) if 'error' not in data]
+        if valid:
+            avg_solar = np.array([self._mean_power_value(power_data[i]['solar_irradiance']) for i in valid])
+            avg_wind = np.array([self._mean_power_value(power_data[i]['wind_speed']) for i in valid])
+            solar_levels = POTENTIAL_LEVELS[np.digitize(avg_solar, SOLAR_POTENTIAL_BINS, right=True)]
+            wind_levels = POTENTIAL_LEVELS[np.digitize(avg_wind, WIND_POTENTIAL_BINS, right=True)]
+            
+            for i, solar, wind, solar_potential, wind_potential in zip(valid, avg_solar, avg_wind, solar_levels, wind_levels):
+                solar_potential, wind_potential = str(solar_potential), str(wind_potential)
+                results[i] = {
+                    'location': locations[i],
+                    'solar_potential': solar_potential,
+                    'wind_potential': wind_potential,
+                    'avg_solar_irradiance': round(float(solar), 2),
+                    'avg_wind_speed': round(float(wind), 2),
+                    'recommendations': self._generate_renewable_recommendations(solar_potential, wind_potential)
+                }
+        
+        return results
+    
+    def _fetch_location_power_data(self, location: str, start_date: str, end_date: str) -> Dict[str, Any]:
+        """Resolve a location and get its NASA POWER data"""
+        try:
+            # Resolve coordinates (cached); the weather payload itself is not needed here
+            coordinates = self.get_location_coordinates(location)
+            if 'error' in coordinates:
+                return coordinates
+            
+            return self.get_nasa_power_data(coordinates['lat'], coordinates['lon'], start_date, end_date)
+            
+        except Exception as e:
+            logger.error("Error calculating renewable energy potential: %s", e)
+            return self._error_response(e)
+    
+    def _mean_power_value(self, series: Dict[str, float]) -> float:
+        """Average a NASA POWER date -> value series, skipping the -999 fill value for missing days"""
+        values = np.fromiter(series.values(), dtype=np.float64, count=len(series))
+        values = values[values > -900]
+        return float(values.mean()) if values.size else 0.0
     
     def _generate_renewable_recommendations(self, solar_potential: str, wind_potential: str) -> List[str]:
         """Generate renewable energy recommendations"""
@@ -456,4 +737,18 @@ class ClimateAPIHandler:
             recommendations.append("Consider energy efficiency improvements as primary focus")
             recommendations.append("Look into community renewable energy programs")
         
-        return recommendations
\ No newline at end of file
+        return recommendations
+
+
+_shared_handler = None
+_shared_handler_lock = threading.Lock()
+
+
+def get_shared_handler() -> ClimateAPIHandler:
+    """Get the process-wide handler so all callers share one connection pool and response cache"""
+    global _shared_handler
+    if _shared_handler is None:
+        with _shared_handler_lock:
+            if _shared_handler is None:
+                _shared_handler = ClimateAPIHandler()
+    return _shared_handler
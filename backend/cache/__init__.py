@@ -0,0 +1 @@
+# Cache Module
\ No newline at end of file
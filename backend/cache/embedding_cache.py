@@ -0,0 +1,70 @@
+"""
+Persistent content-addressed cache for chunk embeddings
+"""
+import os
+import hashlib
+import logging
+import sqlite3
+import threading
+from typing import Dict, Iterable, List
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+LOOKUP_BATCH_SIZE = 500
+
+class EmbeddingCache:
+    """SQLite store of float16 embeddings keyed by SHA-256 of (model id, text)
+    
+    Re-ingesting a chunk that was embedded before, by any earlier run with the same model,
+    returns the stored vector instead of running the encoder again.
+    """
+    
+    def __init__(self, path: str, model_id: str):
+        self.model_id = model_id
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (hash BLOB PRIMARY KEY, dim INTEGER NOT NULL, vec BLOB NOT NULL) WITHOUT ROWID"
+        )
+        self._lock = threading.Lock()
+    
+    def key(self, text: str) -> bytes:
+        """Cache key for a chunk embedded with this cache's model"""
+        return hashlib.sha256(f"{self.model_id}\0{text}".encode('utf-8')).digest()
+    
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, np.ndarray]:
+        """Return the cached float32 vectors for whichever keys are present"""
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), LOOKUP_BATCH_SIZE):
+                batch = keys[start:start + LOOKUP_BATCH_SIZE]
+                rows = self._conn.execute(
+                    f"SELECT hash, vec FROM embeddings WHERE hash IN ({','.join('?' * len(batch))})",
+                    batch
+                )
+                for key, vec in rows:
+                    found[key] = np.frombuffer(vec, dtype=np.float16).astype(np.float32)
+        return found
+    
+    def put_many(self, keys: Iterable[bytes], vectors: np.ndarray):
+        """Store vectors (one row per key) as float16"""
+        vectors = np.asarray(vectors, dtype=np.float16)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (hash, dim, vec) VALUES (?, ?, ?)",
+                    ((key, vec.shape[0], vec.tobytes()) for key, vec in zip(keys, vectors))
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+    
+    def close(self):
+        """Close the underlying database"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,206 @@
+"""
+Semantic cache for expensive query -> response computations (RAG answers)
+"""
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+import numpy as np
+
+try:
+    import diskcache
+except ImportError:  # diskcache is optional; without it the cache is memory-only
+    diskcache = None
+
+logger = logging.getLogger(__name__)
+
+class SemanticCache:
+    """Two-tier cache: exact (scope, query) matches first, then query-embedding similarity via LSH buckets.
+    
+    When persist_dir is given and diskcache is installed, exact matches are also written to a diskcache
+    store there, so they survive process restarts and are shared between worker processes.
+    """
+    
+    def __init__(self, embed_fn: Callable[[str], Any], threshold: float = 0.95,
+                 n_planes: int = 10, ttl_seconds: int = 3600, max_entries: int = 1000, seed: int = 42,
+                 persist_dir: Optional[str] = None):
+        self.embed_fn = embed_fn
+        self.threshold = threshold
+        self.n_planes = n_planes
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._rng = np.random.default_rng(seed)
+        self._planes = None  # (n_planes, dim), created from the first embedding seen
+        self._entries = OrderedDict()  # entry_id -> (bucket_key, exact_key, embedding, value, created_at)
+        self._exact: Dict[Tuple[Hashable, str], int] = {}
+        self._buckets: Dict[Tuple[Hashable, bytes], set] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._disk = None
+        if persist_dir and diskcache is None:
+            logger.warning("diskcache is not installed; semantic cache entries will not be persisted")
+        elif persist_dir:
+            self._disk = diskcache.Cache(persist_dir)
+            self._disk.create_tag_index()
+        self.hits = 0
+        self.misses = 0
+    
+    def _embed(self, query: str) -> np.ndarray:
+        """Embed and L2-normalize a query so a dot product is the cosine similarity"""
+        embedding = np.asarray(self.embed_fn(query), dtype=np.float32).ravel()
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm else embedding
+    
+    def _bucket_key(self, scope: Hashable, embedding: np.ndarray) -> Tuple[Hashable, bytes]:
+        """Hash an embedding to its LSH bucket (sign of each random hyperplane projection)"""
+        if self._planes is None or self._planes.shape[1] != embedding.shape[0]:
+            self._planes = self._rng.standard_normal((self.n_planes, embedding.shape[0])).astype(np.float32)
+        return scope, np.packbits(self._planes @ embedding > 0).tobytes()
+    
+    def _remove(self, entry_id: int):
+        bucket_key, exact_key = self._entries.pop(entry_id)[:2]
+        if self._exact.get(exact_key) == entry_id:
+            del self._exact[exact_key]
+        bucket = self._buckets.get(bucket_key)
+        if bucket is not None:
+            bucket.discard(entry_id)
+            if not bucket:
+                del self._buckets[bucket_key]
+    
+    def _lookup_exact(self, exact_key: Tuple[Hashable, str]) -> Optional[Any]:
+        entry_id = self._exact.get(exact_key)
+        if entry_id is None:
+            return None
+        
+        if time.time() - self._entries[entry_id][4] > self.ttl_seconds:
+            self._remove(entry_id)
+            return None
+        
+        self._entries.move_to_end(entry_id)
+        return self._entries[entry_id][3]
+    
+    def _disk_key(self, exact_key: Tuple[Hashable, str]) -> str:
+        return hashlib.sha1(repr(exact_key).encode('utf-8')).hexdigest()
+    
+    def _disk_tag(self, scope: Hashable) -> str:
+        """Tag shared by every on-disk entry of a scope, so one scope can be evicted on its own"""
+        return hashlib.sha1(repr(scope).encode('utf-8')).hexdigest()
+    
+    def _lookup_persistent(self, exact_key: Tuple[Hashable, str]) -> Optional[Any]:
+        """Exact lookup in memory, then in the on-disk store if one is configured"""
+        with self._lock:
+            value = self._lookup_exact(exact_key)
+        if value is None and self._disk is not None:
+            value = self._disk.get(self._disk_key(exact_key))
+        return value
+    
+    def _lookup(self, bucket_key: Tuple[Hashable, bytes], embedding: np.ndarray) -> Optional[Any]:
+        now = time.time()
+        best_id, best_score = None, self.threshold
+        for entry_id in list(self._buckets.get(bucket_key, ())):
+            _, _, cached_embedding, _, created_at = self._entries[entry_id]
+            if now - created_at > self.ttl_seconds:
+                self._remove(entry_id)
+                continue
+            score = float(cached_embedding @ embedding)
+            if score >= best_score:
+                best_id, best_score = entry_id, score
+        
+        if best_id is None:
+            return None
+        
+        self._entries.move_to_end(best_id)
+        return self._entries[best_id][3]
+    
+    def _store(self, exact_key: Tuple[Hashable, str], bucket_key: Tuple[Hashable, bytes], embedding: np.ndarray, value: Any):
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = (bucket_key, exact_key, embedding, value, time.time())
+        self._exact[exact_key] = entry_id
+        self._buckets.setdefault(bucket_key, set()).add(entry_id)
+        
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+    
+    def get(self, query: str, scope: Hashable = None) -> Optional[Any]:
+        """Return a cached value for the same or a semantically equivalent query in the same scope"""
+        exact_key = (scope, query)
+        value = self._lookup_persistent(exact_key)
+        if value is not None:
+            with self._lock:
+                self.hits += 1
+            return value
+        
+        embedding = self._embed(query)
+        with self._lock:
+            value = self._lookup(self._bucket_key(scope, embedding), embedding)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+    
+    def put(self, query: str, value: Any, scope: Hashable = None):
+        """Store a value for a query in the given scope"""
+        embedding = self._embed(query)
+        with self._lock:
+            self._store((scope, query), self._bucket_key(scope, embedding), embedding, value)
+        if self._disk is not None:
+            self._disk.set(self._disk_key((scope, query)), value, expire=self.ttl_seconds, tag=self._disk_tag(scope))
+    
+    def get_or_compute(self, query: str, scope: Hashable, compute_fn: Callable[[], Any],
+                       should_store: Callable[[Any], bool] = None) -> Any:
+        """Return a cached value or compute, store and return a fresh one"""
+        exact_key = (scope, query)
+        value = self._lookup_persistent(exact_key)
+        if value is not None:
+            with self._lock:
+                self.hits += 1
+            return value
+        
+        # Exact miss: only now pay for the query embedding
+        embedding = self._embed(query)
+        with self._lock:
+            bucket_key = self._bucket_key(scope, embedding)
+            value = self._lookup(bucket_key, embedding)
+            if value is not None:
+                self.hits += 1
+                return value
+            self.misses += 1
+        
+        value = compute_fn()
+        if should_store is None or should_store(value):
+            with self._lock:
+                self._store(exact_key, bucket_key, embedding, value)
+            if self._disk is not None:
+                self._disk.set(self._disk_key(exact_key), value, expire=self.ttl_seconds, tag=self._disk_tag(scope))
+        return value
+    
+    def clear(self):
+        """Drop all cached entries"""
+        with self._lock:
+            self._entries.clear()
+            self._exact.clear()
+            self._buckets.clear()
+        if self._disk is not None:
+            self._disk.clear()
+    
+    def clear_scope(self, scope: Hashable):
+        """Drop the cached entries of one scope, leaving other scopes (and users) untouched"""
+        with self._lock:
+            for entry_id in [entry_id for entry_id, entry in self._entries.items() if entry[1][0] == scope]:
+                self._remove(entry_id)
+        if self._disk is not None:
+            self._disk.evict(self._disk_tag(scope))
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get cache hit/miss statistics"""
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0.0
+        }
@@ -1,16 +1,33 @@
 """
 Impact tracking and calculation system
 """
-import json
+import atexit
 import logging
+import mmap
+import numpy as np
+import orjson
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from typing import Dict, List, Any, Optional
-from datetime import datetime, timedelta
-from dataclasses import dataclass, asdict
+from datetime import datetime
+from dataclasses import dataclass
+from operator import attrgetter
+from config import settings
 import os
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; bulk calculations fall back to NumPy
+    njit = None
+
+@dataclass(slots=True, frozen=True)
 class ImpactRecord:
     """Data class for impact records"""
     action_type: str
@@ -25,6 +42,136 @@ class ImpactRecord:
     timestamp: str
     location: str
     verified: bool = False
+    timestamp_ns: int = 0
+
+RECORD_COLUMNS = tuple(ImpactRecord.__dataclass_fields__)
+_record_values = attrgetter(*RECORD_COLUMNS)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS impacts (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    action_type TEXT NOT NULL,
+    description TEXT,
+    quantity REAL,
+    unit TEXT,
+    carbon_saved_kg REAL NOT NULL DEFAULT 0,
+    energy_saved_kwh REAL NOT NULL DEFAULT 0,
+    water_saved_liters REAL NOT NULL DEFAULT 0,
+    waste_reduced_kg REAL NOT NULL DEFAULT 0,
+    cost_savings REAL NOT NULL DEFAULT 0,
+    timestamp TEXT NOT NULL,
+    location TEXT,
+    verified INTEGER NOT NULL DEFAULT 0,
+    timestamp_ns INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_impacts_user_ts ON impacts(user_id, timestamp_ns);
+CREATE TABLE IF NOT EXISTS impact_daily (
+    user_id TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    action_type TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    carbon_saved_kg REAL NOT NULL DEFAULT 0,
+    energy_saved_kwh REAL NOT NULL DEFAULT 0,
+    water_saved_liters REAL NOT NULL DEFAULT 0,
+    waste_reduced_kg REAL NOT NULL DEFAULT 0,
+    cost_savings REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, day, action_type)
+);
+CREATE INDEX IF NOT EXISTS idx_impact_daily_day ON impact_daily(day);
+CREATE TABLE IF NOT EXISTS legacy_imports (
+    filename TEXT PRIMARY KEY
+);
+"""
+
+SUMMARY_CACHE_SIZE = 4096
+
+# Group commit: buffered records are written once this many are pending or after the interval
+PENDING_FLUSH_SIZE = 64
+PENDING_FLUSH_INTERVAL = 0.2
+# Callers commit synchronously once this many records are queued (e.g. while timer commits keep failing)
+PENDING_MAX_SIZE = PENDING_FLUSH_SIZE * 16
+
+# Column order of the flattened impact factor matrix
+FACTOR_KEYS = (
+    'carbon_kg_per_unit', 'carbon_kg_per_year', 'carbon_kg_per_km', 'carbon_kg_per_kg',
+    'carbon_kg_per_meal', 'carbon_kg_per_kwh', 'energy_kwh_per_year', 'energy_kwh_per_sqm',
+    'water_liters_per_year', 'waste_kg_per_year', 'waste_kg_per_kg'
+)
+CARBON_PER_QUANTITY = [0, 2, 3, 4, 5]
+IMPACT_COLUMNS = ('carbon_kg', 'energy_kwh', 'water_liters', 'waste_kg', 'cost_savings')
+ZERO_COEFFICIENTS = ((0.0,) * len(IMPACT_COLUMNS), (0.0,) * len(IMPACT_COLUMNS))
+
+NS_PER_DAY = 86_400 * 10**9
+
+def _timestamp_ns(timestamp: str) -> int:
+    """Convert an ISO timestamp to integer epoch nanoseconds"""
+    return int(datetime.fromisoformat(timestamp).timestamp() * 10**9)
+
+# Low-cardinality string fields shared across many records
+INTERNED_FIELDS = ('action_type', 'unit', 'location')
+
+def _intern(value: Any) -> Any:
+    """Intern a string; other values (e.g. None for an unknown location) pass through unchanged"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+def _intern_fields(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Intern repeated string fields of a record dict in place"""
+    for field in INTERNED_FIELDS:
+        if field in record:
+            record[field] = _intern(record[field])
+    return record
+
+if njit is not None:
+    # cache=True keeps the compiled kernel on disk, so only the first process pays the JIT cost
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _bulk_impact_kernel(row_ids, quantities, factors):
+        """Compiled per-row impact calculation matching ImpactTracker._impact_matrix"""
+        impacts = np.empty((row_ids.shape[0], 5))
+        for i in prange(row_ids.shape[0]):
+            f = factors[row_ids[i]]
+            q = quantities[i]
+            energy = f[6] + f[7] * q
+            impacts[i, 0] = (f[0] + f[2] + f[3] + f[4] + f[5]) * q + f[1]
+            impacts[i, 1] = energy
+            impacts[i, 2] = f[8]
+            impacts[i, 3] = f[9] + f[10] * q
+            impacts[i, 4] = energy * 0.12 + f[8] * 0.001
+        return impacts
+else:
+    _bulk_impact_kernel = None
+
+INSERT_IMPACT = (
+    f"INSERT INTO impacts (user_id, {', '.join(RECORD_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * (len(RECORD_COLUMNS) + 1))})"
+)
+
+EQUIVALENT_METRICS = ('trees_planted_equivalent', 'miles_not_driven', 'coal_not_burned_kg', 'gasoline_not_used_liters')
+EQUIVALENT_DIVISORS = np.array([
+    22,  # kg CO2 per tree per year
+    0.404,  # kg CO2 per mile
+    2.86,  # kg CO2 per kg coal
+    2.31  # kg CO2 per liter gasoline
+])
+
+LEADERBOARD_METRICS = ('carbon_saved_kg', 'energy_saved_kwh', 'water_saved_liters', 'waste_reduced_kg')
+
+# Per-day totals, keyed by days since the epoch (timestamp_ns // NS_PER_DAY)
+ROLLUP_COLUMNS = ('carbon_saved_kg', 'energy_saved_kwh', 'water_saved_liters', 'waste_reduced_kg', 'cost_savings')
+
+UPSERT_DAILY = (
+    f"INSERT INTO impact_daily (user_id, day, action_type, count, {', '.join(ROLLUP_COLUMNS)}) "
+    f"VALUES (?, ?, ?, ?, {', '.join('?' * len(ROLLUP_COLUMNS))}) "
+    f"ON CONFLICT (user_id, day, action_type) DO UPDATE SET count = count + excluded.count, "
+    + ", ".join(f"{column} = {column} + excluded.{column}" for column in ROLLUP_COLUMNS)
+)
+
+REBUILD_DAILY = f"""
+INSERT INTO impact_daily (user_id, day, action_type, count, {', '.join(ROLLUP_COLUMNS)})
+SELECT user_id, timestamp_ns / {NS_PER_DAY}, action_type, COUNT(*), {', '.join(f'SUM({column})' for column in ROLLUP_COLUMNS)}
+FROM impacts
+GROUP BY user_id, timestamp_ns / {NS_PER_DAY}, action_type
+"""
 
 class ImpactTracker:
     """Track and calculate environmental impact of climate actions"""
@@ -32,7 +179,104 @@ class ImpactTracker:
     def __init__(self, data_dir: str = "./data/user_profiles"):
         self.data_dir = data_dir
         self.impact_factors = self._load_impact_factors()
+        self._factor_row, self._factor_matrix = self._build_factor_matrix()
+        self._impact_coefficients = self._build_impact_coefficients()
         os.makedirs(data_dir, exist_ok=True)
+        
+        # One connection per tracker; WAL lets readers proceed while a write commits
+        self.db_path = os.path.join(data_dir, "impacts.db")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA temp_store=MEMORY")
+        self._conn.execute("PRAGMA cache_size=-20000")  # ~20 MB page cache
+        
+        # (expires_at, summary) keyed by (user_id, days, version); a write bumps the user's version,
+        # and the TTL lets records age out of the window without a write
+        self._summary_cache = OrderedDict()
+        self._user_versions = {}
+        
+        self._conn.executescript(SCHEMA)
+        self._migrate_schema()
+        self._import_legacy_records()
+        
+        self._pending = defaultdict(list)
+        self._pending_count = 0
+        self._flush_timer = None
+        self._closed = False
+        atexit.register(self.close)
+    
+    @contextmanager
+    def _transaction(self):
+        """Run the enclosed statements as one write transaction (a single WAL commit)"""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._conn
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+    
+    def _migrate_schema(self):
+        """Build the daily rollup for a database whose records predate it"""
+        has_rollup = self._conn.execute("SELECT EXISTS (SELECT 1 FROM impact_daily)").fetchone()[0]
+        has_impacts = self._conn.execute("SELECT EXISTS (SELECT 1 FROM impacts)").fetchone()[0]
+        if has_impacts and not has_rollup:
+            self._rebuild_daily_rollup()
+    
+    def _rebuild_daily_rollup(self):
+        """Recompute the per-day totals from the impacts table"""
+        with self._transaction():
+            self._conn.execute("DELETE FROM impact_daily")
+            self._conn.execute(REBUILD_DAILY)
+    
+    def _import_legacy_records(self):
+        """Import per-user JSON impact files written by earlier versions"""
+        with self._lock:
+            imported = {row[0] for row in self._conn.execute("SELECT filename FROM legacy_imports")}
+        
+        pending = [
+            filename for filename in sorted(os.listdir(self.data_dir))
+            if filename.endswith('_impacts.json') and filename not in imported
+        ]
+        if not pending:
+            return
+        
+        # Reading and parsing is I/O-bound, so files are loaded concurrently and inserted in order
+        with ThreadPoolExecutor(max_workers=min(32, len(pending), (os.cpu_count() or 1) * 4)) as executor:
+            futures = [(filename, executor.submit(self._read_legacy_file, filename)) for filename in pending]
+            
+            with self._lock:
+                for filename, future in futures:
+                    user_id = filename[:-len('_impacts.json')]
+                    try:
+                        records = [
+                            ImpactRecord(**{column: record[column] for column in RECORD_COLUMNS if column in record})
+                            for record in future.result()
+                        ]
+                        # Upserting the imported rows into the rollup avoids rebuilding it from every record
+                        with self._transaction():
+                            self._insert_records(user_id, records)
+                            self._conn.execute("INSERT INTO legacy_imports (filename) VALUES (?)", (filename,))
+                        logger.info("Imported %d legacy impact records for user %s", len(records), user_id)
+                    except Exception as e:
+                        logger.error("Error importing legacy impact file %s: %s", filename, e)
+    
+    def _read_legacy_file(self, filename: str) -> List[Dict[str, Any]]:
+        """Parse one legacy impact file, filling in integer timestamps"""
+        with open(os.path.join(self.data_dir, filename), 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return []
+            
+            # Parse straight from the page cache rather than copying the file into a bytes object
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                records = orjson.loads(view)
+        
+        for record in records:
+            record.setdefault('timestamp_ns', _timestamp_ns(record['timestamp']))
+            _intern_fields(record)
+        return records
     
     def _load_impact_factors(self) -> Dict[str, Dict[str, float]]:
         """Load impact calculation factors"""
@@ -74,6 +318,30 @@ class ImpactTracker:
             }
         }
     
+    def _build_factor_matrix(self):
+        """Flatten impact factors into a row index and a float64 matrix"""
+        # Row 0 stays zero so unknown (action_type, subtype) pairs need no branch
+        factor_row = {}
+        rows = [[0.0] * len(FACTOR_KEYS)]
+        for action_type, subtypes in self.impact_factors.items():
+            for subtype, factors in subtypes.items():
+                factor_row[(action_type, subtype)] = len(rows)
+                rows.append([float(factors.get(key, 0)) for key in FACTOR_KEYS])
+        
+        return factor_row, np.array(rows, dtype=np.float64)
+    
+    def _build_impact_coefficients(self):
+        """Precompute each factor row as (fixed, per-quantity) impact tuples for single actions"""
+        # Every impact column is linear in quantity, so evaluating at 0 and 1 recovers both terms
+        row_ids = np.arange(len(self._factor_matrix))
+        fixed = self._impact_matrix(row_ids, np.zeros(len(row_ids)))
+        per_quantity = self._impact_matrix(row_ids, np.ones(len(row_ids))) - fixed
+        
+        return {
+            key: (tuple(fixed[row].tolist()), tuple(per_quantity[row].tolist()))
+            for key, row in self._factor_row.items()
+        }
+    
     def track_action(self, user_id: str, action_data: Dict[str, Any]) -> ImpactRecord:
         """Track a climate action and calculate its impact"""
         try:
@@ -82,157 +350,279 @@ class ImpactTracker:
             
             # Create impact record
             record = ImpactRecord(
-                action_type=action_data['action_type'],
+                action_type=_intern(action_data['action_type']),
                 description=action_data['description'],
                 quantity=action_data.get('quantity', 1),
-                unit=action_data.get('unit', 'unit'),
+                unit=_intern(action_data.get('unit', 'unit')),
                 carbon_saved_kg=impact['carbon_kg'],
                 energy_saved_kwh=impact['energy_kwh'],
                 water_saved_liters=impact['water_liters'],
                 waste_reduced_kg=impact['waste_kg'],
                 cost_savings=impact['cost_savings'],
                 timestamp=datetime.now().isoformat(),
-                location=action_data.get('location', ''),
-                verified=action_data.get('verified', False)
+                location=_intern(action_data.get('location', '')),
+                verified=action_data.get('verified', False),
+                timestamp_ns=time.time_ns()
             )
             
             # Save record
             self._save_impact_record(user_id, record)
             
-            logger.info(f"Tracked action for user {user_id}: {record.description}")
+            logger.info("Tracked action for user %s: %s", user_id, record.description)
             return record
             
         except Exception as e:
-            logger.error(f"Error tracking action: {e}")
+            logger.error("Error tracking action: %s", e)
+            raise
+    
+    def track_actions_bulk(self, user_id: str, actions: List[Dict[str, Any]]) -> List[ImpactRecord]:
+        """Track many climate actions (e.g. an imported activity export) in one transaction"""
+        try:
+            impacts = self.bulk_calculate_impact(actions).tolist()
+            timestamp = datetime.now().isoformat()
+            timestamp_ns = time.time_ns()
+            
+            records = [
+                ImpactRecord(
+                    action_type=_intern(action_data['action_type']),
+                    description=action_data['description'],
+                    quantity=action_data.get('quantity', 1),
+                    unit=_intern(action_data.get('unit', 'unit')),
+                    carbon_saved_kg=carbon,
+                    energy_saved_kwh=energy,
+                    water_saved_liters=water,
+                    waste_reduced_kg=waste,
+                    cost_savings=cost_savings,
+                    timestamp=timestamp,
+                    location=_intern(action_data.get('location', '')),
+                    verified=action_data.get('verified', False),
+                    timestamp_ns=timestamp_ns
+                )
+                for action_data, (carbon, energy, water, waste, cost_savings) in zip(actions, impacts)
+            ]
+            
+            with self._lock, self._transaction():
+                self._insert_records(user_id, records)
+            
+            logger.info("Tracked %d actions for user %s", len(records), user_id)
+            return records
+            
+        except Exception as e:
+            logger.error("Error tracking actions in bulk: %s", e)
             raise
     
     def _calculate_impact(self, action_data: Dict[str, Any]) -> Dict[str, float]:
         """Calculate environmental impact of an action"""
-        action_type = action_data['action_type']
-        action_subtype = action_data.get('subtype', '')
+        fixed, per_quantity = self._impact_coefficients.get(
+            (action_data['action_type'], action_data.get('subtype', '')), ZERO_COEFFICIENTS
+        )
         quantity = action_data.get('quantity', 1)
         
-        impact = {
-            'carbon_kg': 0,
-            'energy_kwh': 0,
-            'water_liters': 0,
-            'waste_kg': 0,
-            'cost_savings': 0
+        return {
+            column: base + rate * quantity
+            for column, base, rate in zip(IMPACT_COLUMNS, fixed, per_quantity)
         }
-        
-        # Get impact factors for the action
-        if action_type in self.impact_factors:
-            factors = self.impact_factors[action_type]
-            
-            if action_subtype in factors:
-                action_factors = factors[action_subtype]
-                
-                # Calculate impacts based on available factors
-                impact['carbon_kg'] = action_factors.get('carbon_kg_per_unit', 0) * quantity
-                impact['carbon_kg'] += action_factors.get('carbon_kg_per_year', 0)
-                impact['carbon_kg'] += action_factors.get('carbon_kg_per_km', 0) * quantity
-                impact['carbon_kg'] += action_factors.get('carbon_kg_per_kg', 0) * quantity
-                impact['carbon_kg'] += action_factors.get('carbon_kg_per_meal', 0) * quantity
-                impact['carbon_kg'] += action_factors.get('carbon_kg_per_kwh', 0) * quantity
-                
-                impact['energy_kwh'] = action_factors.get('energy_kwh_per_year', 0)
-                impact['energy_kwh'] += action_factors.get('energy_kwh_per_sqm', 0) * quantity
-                
-                impact['water_liters'] = action_factors.get('water_liters_per_year', 0)
-                
-                impact['waste_kg'] = action_factors.get('waste_kg_per_year', 0)
-                impact['waste_kg'] += action_factors.get('waste_kg_per_kg', 0) * quantity
-                
-                # Estimate cost savings (simplified calculation)
-                impact['cost_savings'] = impact['energy_kwh'] * 0.12  # $0.12 per kWh average
-                impact['cost_savings'] += impact['water_liters'] * 0.001  # $0.001 per liter
-        
-        return impact
     
-    def _save_impact_record(self, user_id: str, record: ImpactRecord):
-        """Save impact record to file"""
-        user_file = os.path.join(self.data_dir, f"{user_id}_impacts.json")
+    def bulk_calculate_impact(self, actions: List[Dict[str, Any]]) -> np.ndarray:
+        """Calculate impacts for many actions, one row per action in IMPACT_COLUMNS order"""
+        row_ids = np.fromiter(
+            (self._factor_row.get((action['action_type'], action.get('subtype', '')), 0) for action in actions),
+            dtype=np.intp, count=len(actions)
+        )
+        quantities = np.fromiter(
+            (action.get('quantity', 1) for action in actions),
+            dtype=np.float64, count=len(actions)
+        )
+        if _bulk_impact_kernel is not None:
+            return _bulk_impact_kernel(row_ids, quantities, self._factor_matrix)
+        return self._impact_matrix(row_ids, quantities)
+    
+    def _impact_matrix(self, row_ids: np.ndarray, quantities: np.ndarray) -> np.ndarray:
+        """Apply factor rows to quantities, returning an (N, 5) impact array"""
+        factors = self._factor_matrix[row_ids]
         
-        # Load existing records
-        records = []
-        if os.path.exists(user_file):
-            try:
-                with open(user_file, 'r') as f:
-                    records = json.load(f)
-            except Exception as e:
-                logger.error(f"Error loading existing records: {e}")
+        carbon = factors[:, CARBON_PER_QUANTITY].sum(axis=1) * quantities + factors[:, 1]
+        energy = factors[:, 6] + factors[:, 7] * quantities
+        water = factors[:, 8]
+        waste = factors[:, 9] + factors[:, 10] * quantities
         
-        # Add new record
-        records.append(asdict(record))
+        # Estimate cost savings (simplified calculation)
+        cost_savings = energy * 0.12 + water * 0.001  # $0.12 per kWh, $0.001 per liter
         
-        # Save updated records
+        return np.column_stack((carbon, energy, water, waste, cost_savings))
+    
+    def _save_impact_record(self, user_id: str, record: ImpactRecord):
+        """Queue impact record for the next group commit"""
         try:
-            with open(user_file, 'w') as f:
-                json.dump(records, f, indent=2)
+            with self._lock:
+                # Keep the queue bounded: a full queue is committed in the caller, which sees any failure
+                if self._pending_count >= PENDING_MAX_SIZE:
+                    self._flush_pending()
+                
+                self._pending[user_id].append(record)
+                self._pending_count += 1
+                
+                # Commits run on a timer thread so the caller never waits on the database
+                if self._pending_count == PENDING_FLUSH_SIZE:
+                    self._schedule_flush(0)
+                elif self._flush_timer is None:
+                    self._schedule_flush(PENDING_FLUSH_INTERVAL)
         except Exception as e:
-            logger.error(f"Error saving impact record: {e}")
+            logger.error("Error saving impact record: %s", e)
             raise
     
+    def flush(self):
+        """Write all queued impact records to the database"""
+        with self._lock:
+            self._flush_pending()
+    
+    def _schedule_flush(self, delay: float):
+        """Start (or restart) the group-commit timer; caller holds the lock"""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+        self._flush_timer = threading.Timer(delay, self._flush_on_timer)
+        self._flush_timer.daemon = True
+        self._flush_timer.start()
+    
+    def _flush_on_timer(self):
+        """Timer callback for the group commit; a failed commit stays queued and is retried"""
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error("Error flushing impact records, retrying in %ss: %s", PENDING_FLUSH_INTERVAL, e)
+            with self._lock:
+                if self._pending_count and self._flush_timer is None:
+                    self._schedule_flush(PENDING_FLUSH_INTERVAL)
+    
+    def _flush_pending(self):
+        """Commit queued records in one transaction; caller holds the lock"""
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        
+        if not self._pending_count:
+            return
+        
+        with self._transaction():
+            for user_id, records in self._pending.items():
+                self._insert_records(user_id, records)
+        
+        self._pending.clear()
+        self._pending_count = 0
+    
+    def _insert_records(self, user_id: str, records: List[ImpactRecord]):
+        """Insert records and fold them into the daily rollup; caller holds the lock and transaction"""
+        self._conn.executemany(INSERT_IMPACT, [(user_id, *_record_values(record)) for record in records])
+        
+        # Fold the batch into one [count, *ROLLUP_COLUMNS] vector per (day, action_type) bucket
+        buckets = defaultdict(lambda: np.zeros(len(ROLLUP_COLUMNS) + 1))
+        for record in records:
+            buckets[(record.timestamp_ns // NS_PER_DAY, record.action_type)] += (
+                1, *(getattr(record, column) for column in ROLLUP_COLUMNS)
+            )
+        
+        self._conn.executemany(UPSERT_DAILY, [
+            (user_id, day, action_type, int(totals[0]), *totals[1:].tolist())
+            for (day, action_type), totals in buckets.items()
+        ])
+        self._user_versions[user_id] = self._user_versions.get(user_id, 0) + 1
+    
     def get_user_impact_summary(self, user_id: str, days: int = 30) -> Dict[str, Any]:
         """Get impact summary for a user"""
         try:
-            user_file = os.path.join(self.data_dir, f"{user_id}_impacts.json")
+            with self._lock:
+                self._flush_pending()
+                cache_key = (user_id, days, self._user_versions.get(user_id, 0))
+                cached = self._summary_cache.get(cache_key)
+                if cached is not None and cached[0] > time.monotonic():
+                    self._summary_cache.move_to_end(cache_key)
+                    return cached[1]
             
-            if not os.path.exists(user_file):
-                return self._empty_summary()
+            summary = self._build_user_impact_summary(user_id, days)
             
-            with open(user_file, 'r') as f:
-                records = json.load(f)
+            with self._lock:
+                self._summary_cache[cache_key] = (time.monotonic() + settings.IMPACT_SUMMARY_TTL_SECONDS, summary)
+                if len(self._summary_cache) > SUMMARY_CACHE_SIZE:
+                    self._summary_cache.popitem(last=False)
             
-            # Filter records by date range
-            cutoff_date = datetime.now() - timedelta(days=days)
-            recent_records = [
-                record for record in records
-                if datetime.fromisoformat(record['timestamp']) >= cutoff_date
-            ]
+            return summary
             
-            # Calculate totals
-            total_carbon = sum(record['carbon_saved_kg'] for record in recent_records)
-            total_energy = sum(record['energy_saved_kwh'] for record in recent_records)
-            total_water = sum(record['water_saved_liters'] for record in recent_records)
-            total_waste = sum(record['waste_reduced_kg'] for record in recent_records)
-            total_savings = sum(record['cost_savings'] for record in recent_records)
+        except Exception as e:
+            logger.error("Error getting user impact summary: %s", e)
+            return self._empty_summary()
+    
+    def _build_user_impact_summary(self, user_id: str, days: int) -> Dict[str, Any]:
+        """Aggregate a user's impact records for the given period"""
+        cutoff_ns = time.time_ns() - days * NS_PER_DAY
+        first_full_day = -(-cutoff_ns // NS_PER_DAY)
+        
+        with self._lock:
+            # Whole days come from the rollup; the partial day before them is summed from the raw
+            # records after the cutoff, so totals cover the same window as recent_actions
+            grouped = self._conn.execute(
+                f"""
+                SELECT action_type, SUM(count), SUM(carbon_saved_kg), SUM(energy_saved_kwh),
+                       SUM(water_saved_liters), SUM(waste_reduced_kg), SUM(cost_savings)
+                FROM (
+                    SELECT action_type, count, {', '.join(ROLLUP_COLUMNS)}
+                    FROM impact_daily
+                    WHERE user_id = ? AND day >= ?
+                    UNION ALL
+                    SELECT action_type, 1, {', '.join(ROLLUP_COLUMNS)}
+                    FROM impacts
+                    WHERE user_id = ? AND timestamp_ns >= ? AND timestamp_ns < ?
+                )
+                GROUP BY action_type
+                """,
+                (user_id, first_full_day, user_id, cutoff_ns, first_full_day * NS_PER_DAY)
+            ).fetchall()
             
-            # Calculate action breakdown
-            action_breakdown = {}
-            for record in recent_records:
-                action_type = record['action_type']
-                if action_type not in action_breakdown:
-                    action_breakdown[action_type] = {
-                        'count': 0,
-                        'carbon_kg': 0,
-                        'energy_kwh': 0,
-                        'water_liters': 0,
-                        'waste_kg': 0
-                    }
-                
-                action_breakdown[action_type]['count'] += 1
-                action_breakdown[action_type]['carbon_kg'] += record['carbon_saved_kg']
-                action_breakdown[action_type]['energy_kwh'] += record['energy_saved_kwh']
-                action_breakdown[action_type]['water_liters'] += record['water_saved_liters']
-                action_breakdown[action_type]['waste_kg'] += record['waste_reduced_kg']
+            if not grouped:
+                return self._empty_summary()
             
-            return {
-                'period_days': days,
-                'total_actions': len(recent_records),
-                'total_carbon_saved_kg': round(total_carbon, 2),
-                'total_energy_saved_kwh': round(total_energy, 2),
-                'total_water_saved_liters': round(total_water, 2),
-                'total_waste_reduced_kg': round(total_waste, 2),
-                'total_cost_savings': round(total_savings, 2),
-                'action_breakdown': action_breakdown,
-                'equivalent_metrics': self._calculate_equivalents(total_carbon),
-                'recent_actions': recent_records[-5:] if recent_records else []
+            latest = self._conn.execute(
+                f"""
+                SELECT {', '.join(RECORD_COLUMNS)}
+                FROM impacts
+                WHERE user_id = ? AND timestamp_ns >= ?
+                ORDER BY timestamp_ns DESC
+                LIMIT 5
+                """,
+                (user_id, cutoff_ns)
+            ).fetchall()
+        
+        # Calculate action breakdown, then reduce the grouped rows column-wise for totals
+        action_breakdown = {
+            sys.intern(action_type): {
+                'count': count,
+                'carbon_kg': carbon,
+                'energy_kwh': energy,
+                'water_liters': water,
+                'waste_kg': waste
             }
-            
-        except Exception as e:
-            logger.error(f"Error getting user impact summary: {e}")
-            return self._empty_summary()
+            for action_type, count, carbon, energy, water, waste, _ in grouped
+        }
+        totals = np.array([row[1:] for row in grouped], dtype=np.float64).sum(axis=0).tolist()
+        total_actions = int(totals[0])
+        total_carbon, total_energy, total_water, total_waste, total_savings = totals[1:]
+        
+        recent_actions = [dict(zip(RECORD_COLUMNS, row)) for row in reversed(latest)]
+        for action in recent_actions:
+            action['verified'] = bool(action['verified'])
+            _intern_fields(action)
+        
+        return {
+            'period_days': days,
+            'total_actions': total_actions,
+            'total_carbon_saved_kg': round(total_carbon, 2),
+            'total_energy_saved_kwh': round(total_energy, 2),
+            'total_water_saved_liters': round(total_water, 2),
+            'total_waste_reduced_kg': round(total_waste, 2),
+            'total_cost_savings': round(total_savings, 2),
+            'action_breakdown': action_breakdown,
+            'equivalent_metrics': self._calculate_equivalents(total_carbon),
+            'recent_actions': recent_actions
+        }
     
     def _empty_summary(self) -> Dict[str, Any]:
         """Return empty impact summary"""
@@ -249,47 +639,68 @@ class ImpactTracker:
             'recent_actions': []
         }
     
-    def _calculate_equivalents(self, carbon_kg: float) -> Dict[str, Any]:
-        """Calculate equivalent metrics for carbon savings"""
-        if carbon_kg <= 0:
-            return {}
+    def _calculate_equivalents(self, carbon_kg):
+        """Calculate equivalent metrics for carbon savings; an array of values gives a list of dicts"""
+        carbon = np.atleast_1d(np.asarray(carbon_kg, dtype=np.float64))
+        values = np.round(carbon[:, None] / EQUIVALENT_DIVISORS, 1).tolist()
         
-        return {
-            'trees_planted_equivalent': round(carbon_kg / 22, 1),  # 22 kg CO2 per tree per year
-            'miles_not_driven': round(carbon_kg / 0.404, 1),  # 0.404 kg CO2 per mile
-            'coal_not_burned_kg': round(carbon_kg / 2.86, 1),  # 2.86 kg CO2 per kg coal
-            'gasoline_not_used_liters': round(carbon_kg / 2.31, 1)  # 2.31 kg CO2 per liter gasoline
-        }
+        equivalents = [
+            dict(zip(EQUIVALENT_METRICS, row)) if kg > 0 else {}
+            for kg, row in zip(carbon.tolist(), values)
+        ]
+        return equivalents if np.ndim(carbon_kg) else equivalents[0]
     
     def get_leaderboard(self, metric: str = 'carbon_saved_kg', limit: int = 10) -> List[Dict[str, Any]]:
         """Get leaderboard of users by impact metric"""
         try:
-            user_summaries = []
+            # Sort by specified metric; the column name comes from a fixed whitelist
+            order_by = metric if metric in LEADERBOARD_METRICS else 'total_actions'
+            cutoff_day = (time.time_ns() - 30 * NS_PER_DAY) // NS_PER_DAY
             
-            # Get all user files
-            for filename in os.listdir(self.data_dir):
-                if filename.endswith('_impacts.json'):
-                    user_id = filename.replace('_impacts.json', '')
-                    summary = self.get_user_impact_summary(user_id, days=30)
-                    
-                    if summary['total_actions'] > 0:
-                        user_summaries.append({
-                            'user_id': user_id,
-                            'total_actions': summary['total_actions'],
-                            'carbon_saved_kg': summary['total_carbon_saved_kg'],
-                            'energy_saved_kwh': summary['total_energy_saved_kwh'],
-                            'water_saved_liters': summary['total_water_saved_liters'],
-                            'waste_reduced_kg': summary['total_waste_reduced_kg']
-                        })
+            with self._lock:
+                self._flush_pending()
+                rows = self._conn.execute(
+                    f"""
+                    SELECT user_id, SUM(count) AS total_actions,
+                           SUM(carbon_saved_kg) AS carbon_saved_kg, SUM(energy_saved_kwh) AS energy_saved_kwh,
+                           SUM(water_saved_liters) AS water_saved_liters, SUM(waste_reduced_kg) AS waste_reduced_kg
+                    FROM impact_daily
+                    WHERE day >= ?
+                    GROUP BY user_id
+                    HAVING SUM(count) > 0
+                    ORDER BY {order_by} DESC, user_id
+                    LIMIT ?
+                    """,
+                    (cutoff_day, limit)
+                ).fetchall()
             
-            # Sort by specified metric
-            if metric in ['carbon_saved_kg', 'energy_saved_kwh', 'water_saved_liters', 'waste_reduced_kg']:
-                user_summaries.sort(key=lambda x: x[metric], reverse=True)
-            else:
-                user_summaries.sort(key=lambda x: x['total_actions'], reverse=True)
+            equivalents = self._calculate_equivalents(np.array([row[2] for row in rows], dtype=np.float64))
             
-            return user_summaries[:limit]
+            return [
+                {
+                    'user_id': user_id,
+                    'total_actions': total_actions,
+                    'carbon_saved_kg': round(carbon, 2),
+                    'energy_saved_kwh': round(energy, 2),
+                    'water_saved_liters': round(water, 2),
+                    'waste_reduced_kg': round(waste, 2),
+                    'equivalent_metrics': equivalent_metrics
+                }
+                for (user_id, total_actions, carbon, energy, water, waste), equivalent_metrics in zip(rows, equivalents)
+            ]
             
         except Exception as e:
-            logger.error(f"Error generating leaderboard: {e}")
-            return []
\ No newline at end of file
+            logger.error("Error generating leaderboard: %s", e)
+            return []
+    
+    def close(self):
+        """Flush queued records and close the database connection"""
+        atexit.unregister(self.close)
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._flush_pending()
+            # Refresh planner statistics so window queries keep choosing index range scans
+            self._conn.execute("PRAGMA optimize")
+            self._conn.close()
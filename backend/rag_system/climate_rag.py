@@ -2,35 +2,228 @@
 RAG (Retrieval-Augmented Generation) system for climate knowledge
 """
 import os
+import re
+import hashlib
 import logging
-from typing import List, Dict, Any, Tuple
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Any, Tuple, Iterator
+import numpy as np
+import torch
+import orjson
+from cachetools import LRUCache, TTLCache
 import chromadb
 from chromadb.config import Settings as ChromaSettings
+try:
+    from chromadb.errors import NotFoundError
+except ImportError:  # chromadb < 0.5 raises ValueError for a missing collection
+    NotFoundError = ValueError
 from sentence_transformers import SentenceTransformer
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.schema import Document
 from backend.watsonx_integration.watsonx_client import WatsonXClient
+from backend.watsonx_integration.response_stream import ResponseStream
+from backend.cache.semantic_cache import SemanticCache
+from backend.cache.embedding_cache import EmbeddingCache
 from config import settings
 
 logger = logging.getLogger(__name__)
 
+EMBED_BATCH_SIZE = 64
+ADD_BATCH_SIZE = 256
+SEARCH_CACHE_THRESHOLD = 0.95
+SEARCH_CACHE_PLANES = 16
+SEARCH_CACHE_SIZE = 2048
+MMR_FETCH_FACTOR = 4
+COLLECTION_NAME = "climate_knowledge"
+# Cosine HNSW graph; these parameters are fixed when a collection is created
+COLLECTION_METADATA = {
+    "description": "Climate action and environmental knowledge base",
+    "hnsw:space": "cosine",
+    "hnsw:construction_ef": 200,
+    "hnsw:M": 32,
+    "hnsw:search_ef": 64,
+    "hnsw:batch_size": 512,
+    "hnsw:sync_threshold": 2048
+}
+MMR_LAMBDA = 0.7
+RESPONSE_CACHE_SIZE = 1024
+RESPONSE_CACHE_TTL = 3600
+QUERY_EMBEDDING_CACHE_SIZE = 256
+EXCESS_NEWLINES = re.compile(r"\n{3,}")
+
+def _mmr_select(query_embedding: np.ndarray, candidates: np.ndarray, k: int, lambda_mult: float = MMR_LAMBDA) -> List[int]:
+    """Greedy maximal marginal relevance: trade query similarity against redundancy with picks so far"""
+    candidates = candidates / np.linalg.norm(candidates, axis=1, keepdims=True).clip(1e-12)
+    query_embedding = query_embedding / max(np.linalg.norm(query_embedding), 1e-12)
+    
+    sim_query = candidates @ query_embedding
+    sim_pairwise = candidates @ candidates.T
+    
+    # Running max similarity to the selected set, updated with one column per pick
+    redundancy = np.full(len(candidates), -np.inf)
+    available = np.ones(len(candidates), dtype=bool)
+    selected = []
+    for _ in range(min(k, len(candidates))):
+        scores = lambda_mult * sim_query - (1 - lambda_mult) * redundancy if selected else sim_query
+        idx = int(np.argmax(np.where(available, scores, -np.inf)))
+        selected.append(idx)
+        available[idx] = False
+        np.maximum(redundancy, sim_pairwise[:, idx], out=redundancy)
+    
+    return selected
+
+def iter_document_chunks(documents: List[Dict[str, Any]], text_splitter) -> Iterator[Tuple[str, Dict[str, Any], str]]:
+    """Split documents lazily, yielding (chunk text, metadata, id) for each chunk"""
+    for i, doc in enumerate(documents):
+        chunks = text_splitter.split_text(EXCESS_NEWLINES.sub("\n\n", doc['content'].strip()))
+        
+        for j, chunk in enumerate(chunks):
+            yield chunk, {
+                'source': doc.get('source', 'unknown'),
+                'title': doc.get('title', 'Untitled'),
+                'category': doc.get('category', 'general'),
+                'chunk_id': f"{i}_{j}",
+                # Trimmed (and flattened to one line) once here so renderers never slice full chunks
+                'preview': " ".join(chunk[:300].split()) + ("..." if len(chunk) > 300 else "")
+            }, f"doc_{i}_chunk_{j}"
+
+class NativeTextSplitter:
+    """split_text() over the Rust text-splitter crate, which prefers paragraph, then line, then sentence boundaries"""
+    
+    def __init__(self, chunk_size: int, chunk_overlap: int):
+        # Imported lazily so semantic-text-splitter is only needed when USE_NATIVE_TEXT_SPLITTER is set
+        from semantic_text_splitter import TextSplitter
+        self._splitter = TextSplitter(chunk_size, overlap=chunk_overlap)
+    
+    def split_text(self, text: str) -> List[str]:
+        """Split text into chunks of at most chunk_size characters"""
+        return self._splitter.chunks(text)
+
+def build_text_splitter():
+    """Text splitter used for every document added to the knowledge base"""
+    if settings.USE_NATIVE_TEXT_SPLITTER:
+        return NativeTextSplitter(chunk_size=1000, chunk_overlap=200)
+    
+    return RecursiveCharacterTextSplitter(
+        chunk_size=1000,
+        chunk_overlap=200,
+        separators=["\n\n", "\n", ". ", " "]
+    )
+
+def sample_fingerprint(chunks: List[Tuple[str, Dict[str, Any], str]]) -> str:
+    """Fingerprint of the embedding model and sample chunk texts, checked before precomputed vectors are used"""
+    digest = hashlib.sha256(settings.EMBEDDING_MODEL.encode('utf-8'))
+    for text, _, chunk_id in chunks:
+        digest.update(f"\0{chunk_id}\0{text}".encode('utf-8'))
+    return digest.hexdigest()
+
+@lru_cache(maxsize=1024)
+def _enhance_query_text(query: str, location: str, lifestyle: str) -> str:
+    """Append location and lifestyle context to a query"""
+    enhanced = query
+    if location:
+        enhanced += f" in {location}"
+    if lifestyle:
+        enhanced += f" for {lifestyle} lifestyle"
+    
+    return enhanced
+
+SAMPLE_DOCUMENTS = [
+    {
+        "title": "Renewable Energy Transition",
+        "content": """Renewable energy sources like solar, wind, and hydroelectric power are crucial for reducing greenhouse gas emissions. Solar panels can reduce household carbon footprint by 3-4 tons of CO2 per year. Wind energy is one of the fastest-growing renewable sources globally. The transition to renewable energy requires investment but provides long-term cost savings and environmental benefits. Government incentives and falling technology costs make renewable energy increasingly accessible to individuals and businesses.""",
+        "source": "Climate Action Guide",
+        "category": "energy"
+    },
+    {
+        "title": "Sustainable Transportation",
+        "content": """Transportation accounts for approximately 29% of greenhouse gas emissions in the United States. Electric vehicles can reduce emissions by 60-70% compared to gasoline vehicles. Public transportation, cycling, and walking are highly effective ways to reduce personal carbon footprint. Carpooling and ride-sharing can significantly reduce per-person emissions. For long-distance travel, trains are generally more environmentally friendly than planes or cars.""",
+        "source": "EPA Transportation Guide",
+        "category": "transportation"
+    },
+    {
+        "title": "Energy Efficiency at Home",
+        "content": """Home energy efficiency improvements can reduce energy consumption by 20-30%. LED lighting uses 75% less energy than incandescent bulbs. Proper insulation can reduce heating and cooling costs by up to 40%. Smart thermostats can save 10-15% on heating and cooling bills. Energy-efficient appliances with ENERGY STAR ratings use 10-50% less energy than standard models. Sealing air leaks around windows and doors is a cost-effective way to improve efficiency.""",
+        "source": "Energy Efficiency Guide",
+        "category": "energy_efficiency"
+    },
+    {
+        "title": "Sustainable Food Choices",
+        "content": """Food production accounts for about 26% of global greenhouse gas emissions. Plant-based diets can reduce food-related emissions by up to 73%. Reducing meat consumption, especially beef, has significant environmental impact. Local and seasonal food choices reduce transportation emissions. Reducing food waste is crucial - about 1/3 of food produced globally is wasted. Composting food scraps reduces methane emissions from landfills and creates valuable soil amendment.""",
+        "source": "Sustainable Food Guide",
+        "category": "food"
+    },
+    {
+        "title": "Water Conservation",
+        "content": """Water conservation reduces energy consumption for water treatment and distribution. Low-flow fixtures can reduce water usage by 20-60%. Fixing leaks promptly prevents waste - a single dripping faucet can waste over 3,000 gallons per year. Rainwater harvesting can reduce municipal water demand. Drought-resistant landscaping reduces irrigation needs. Shorter showers and full loads in dishwashers and washing machines maximize efficiency.""",
+        "source": "Water Conservation Guide",
+        "category": "water"
+    },
+    {
+        "title": "Waste Reduction and Recycling",
+        "content": """The waste sector contributes about 5% of global greenhouse gas emissions. Reducing, reusing, and recycling materials prevents emissions from manufacturing new products. Composting organic waste reduces methane emissions from landfills. Proper recycling of electronics prevents toxic materials from entering the environment. Choosing products with minimal packaging reduces waste. Buying durable, repairable products reduces long-term waste generation.""",
+        "source": "Waste Management Guide",
+        "category": "waste"
+    }
+]
+
 class ClimateRAGSystem:
     """RAG system specialized for climate action knowledge"""
     
     def __init__(self):
-        self.watsonx_client = WatsonXClient()
-        self.embedding_model = SentenceTransformer(settings.EMBEDDING_MODEL)
         self.chroma_client = None
         self.collection = None
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=200,
-            separators=["\n\n", "\n", ". ", " ", ""]
+        self._precomputed_embeddings = {}
+        self._query_embeddings = LRUCache(maxsize=QUERY_EMBEDDING_CACHE_SIZE)
+        self._query_embeddings_lock = threading.Lock()
+        self._embedding_cache = EmbeddingCache(settings.EMBEDDING_CACHE_PATH, settings.EMBEDDING_MODEL)
+        # Near-duplicate questions reuse earlier retrieval results instead of querying Chroma again
+        self._search_cache = SemanticCache(
+            embed_fn=self.embed_query,
+            threshold=SEARCH_CACHE_THRESHOLD,
+            n_planes=SEARCH_CACHE_PLANES,
+            max_entries=SEARCH_CACHE_SIZE
         )
-        self._initialize_vector_db()
+        # Generated answers keyed by (normalized query, retrieved chunk ids); the generation
+        # counter in the key retires every entry when the knowledge base changes
+        self._response_cache = TTLCache(maxsize=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL)
+        self._response_cache_lock = threading.Lock()
+        self._kb_generation = 0
+        self.text_splitter = build_text_splitter()
+        
+        # The watsonx token fetch, model load and ChromaDB open are independent, so overlap them
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            watsonx_future = executor.submit(WatsonXClient)
+            model_future = executor.submit(self._load_embedding_model)
+            vector_db_future = executor.submit(self._initialize_vector_db)
+            self.watsonx_client = watsonx_future.result()
+            self.embedding_model = model_future.result()
+            vector_db_future.result()
+    
+    def _load_embedding_model(self):
+        """Load the embedding model on the GPU in half precision when one is available"""
+        if settings.USE_ONNX_EMBEDDER:
+            # Imported lazily so optimum/onnxruntime are only needed when the ONNX path is enabled
+            from backend.rag_system.onnx_embedder import ONNXEmbedder
+            return ONNXEmbedder(settings.EMBEDDING_MODEL)
+        
+        device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        model = SentenceTransformer(settings.EMBEDDING_MODEL, device=device)
+        if device == 'cuda':
+            model.half()
+        logger.info("Embedding model loaded on %s", device)
+        return model
     
     def _initialize_vector_db(self):
         """Initialize ChromaDB vector database"""
+        if settings.VECTOR_BACKEND == "faiss":
+            # Imported lazily so faiss is only needed when that backend is selected
+            from backend.rag_system.faiss_backend import FAISSBackend
+            self.collection = FAISSBackend(settings.FAISS_PERSIST_DIRECTORY, settings.FAISS_INDEX_TYPE)
+            return
+        
         try:
             # Create data directory if it doesn't exist
             os.makedirs(settings.CHROMA_PERSIST_DIRECTORY, exist_ok=True)
@@ -40,72 +233,174 @@ class ClimateRAGSystem:
                 path=settings.CHROMA_PERSIST_DIRECTORY
             )
             
-            # Get or create collection
-            self.collection = self.chroma_client.get_or_create_collection(
-                name="climate_knowledge",
-                metadata={"description": "Climate action and environmental knowledge base"}
-            )
+            # Read an existing collection's settings before get_or_create_collection, which may
+            # apply the metadata passed to it and hide that the index was built differently
+            try:
+                existing = self.chroma_client.get_collection(name=COLLECTION_NAME)
+            except (ValueError, NotFoundError):
+                existing = None
+            
+            if existing is not None and any(
+                (existing.metadata or {}).get(key) != value for key, value in COLLECTION_METADATA.items()
+            ):
+                self.collection = existing
+                self._rebuild_collection()
+            else:
+                self.collection = self.chroma_client.get_or_create_collection(
+                    name=COLLECTION_NAME,
+                    metadata=COLLECTION_METADATA
+                )
             
             logger.info("ChromaDB initialized successfully")
             
         except Exception as e:
-            logger.error(f"Failed to initialize ChromaDB: {e}")
+            logger.error("Failed to initialize ChromaDB: %s", e)
             raise
     
+    def _rebuild_collection(self):
+        """Recreate a collection built with older index settings, carrying its stored vectors across"""
+        logger.info("Rebuilding %s with HNSW cosine index settings...", COLLECTION_NAME)
+        existing = self.collection.get(include=['embeddings', 'documents', 'metadatas'])
+        
+        self.chroma_client.delete_collection(COLLECTION_NAME)
+        self.collection = self.chroma_client.create_collection(name=COLLECTION_NAME, metadata=COLLECTION_METADATA)
+        
+        for start in range(0, len(existing['ids']), ADD_BATCH_SIZE):
+            end = start + ADD_BATCH_SIZE
+            self.collection.add(
+                ids=existing['ids'][start:end],
+                embeddings=np.asarray(existing['embeddings'][start:end], dtype=np.float32).tolist(),
+                documents=existing['documents'][start:end],
+                metadatas=existing['metadatas'][start:end]
+            )
+        
+        logger.info("Rebuilt %s with %s chunks", COLLECTION_NAME, len(existing['ids']))
+    
     def add_documents(self, documents: List[Dict[str, Any]]):
         """Add documents to the knowledge base"""
         try:
             texts = []
             metadatas = []
             ids = []
+            # Identical chunk texts (shared boilerplate, re-indexed copies) are embedded once
+            unique_rows = {}
+            rows = []
             
-            for i, doc in enumerate(documents):
-                # Split document into chunks
-                chunks = self.text_splitter.split_text(doc['content'])
-                
-                for j, chunk in enumerate(chunks):
-                    texts.append(chunk)
-                    metadatas.append({
-                        'source': doc.get('source', 'unknown'),
-                        'title': doc.get('title', 'Untitled'),
-                        'category': doc.get('category', 'general'),
-                        'chunk_id': f"{i}_{j}"
-                    })
-                    ids.append(f"doc_{i}_chunk_{j}")
-            
-            # Generate embeddings
-            embeddings = self.embedding_model.encode(texts).tolist()
-            
-            # Add to collection
-            self.collection.add(
-                documents=texts,
-                metadatas=metadatas,
-                embeddings=embeddings,
-                ids=ids
-            )
+            for chunk, metadata, chunk_id in iter_document_chunks(documents, self.text_splitter):
+                texts.append(chunk)
+                metadatas.append(metadata)
+                ids.append(chunk_id)
+                rows.append(unique_rows.setdefault(chunk, len(unique_rows)))
+            
+            embeddings = self._embed_chunks(list(unique_rows))[rows]
+            self._add_to_collection(texts, metadatas, embeddings, ids)
             
-            logger.info(f"Added {len(texts)} chunks from {len(documents)} documents")
+            logger.info("Added %s chunks from %s documents", len(texts), len(documents))
             
         except Exception as e:
-            logger.error(f"Error adding documents: {e}")
+            logger.error("Error adding documents: %s", e)
             raise
     
+    def _add_to_collection(self, texts: List[str], metadatas: List[Dict[str, Any]], embeddings, ids: List[str]):
+        """Write embedded chunks to the collection and retire caches that depend on its contents"""
+        # Add to collection in fixed-size batches so each write stays well under Chroma's batch limit;
+        # chromadb 0.4.x only accepts embeddings as lists
+        for start in range(0, len(texts), ADD_BATCH_SIZE):
+            end = start + ADD_BATCH_SIZE
+            self.collection.add(
+                documents=texts[start:end],
+                metadatas=metadatas[start:end],
+                embeddings=np.asarray(embeddings[start:end], dtype=np.float32).tolist(),
+                ids=ids[start:end]
+            )
+        
+        # The FAISS backend writes its index file once per ingestion; Chroma persists as it goes
+        if hasattr(self.collection, 'persist'):
+            self.collection.persist()
+        
+        # Cached retrieval results and answers may no longer be the best matches
+        self._search_cache.clear()
+        self._kb_generation += 1
+    
+    def _embed_chunks(self, texts: List[str]) -> np.ndarray:
+        """Embed chunks, running the encoder only on texts missing from the persistent embedding cache"""
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        
+        keys = [self._embedding_cache.key(text) for text in texts]
+        cached = self._embedding_cache.get_many(keys)
+        misses = [i for i, key in enumerate(keys) if key not in cached]
+        
+        if misses:
+            # Encode every missing chunk from every document in one call; encode() sorts by length
+            # internally so each batch pads to similar-sized inputs
+            encoded = self.embedding_model.encode(
+                [texts[i] for i in misses],
+                batch_size=EMBED_BATCH_SIZE,
+                show_progress_bar=False,
+                convert_to_numpy=True
+            )
+            self._embedding_cache.put_many([keys[i] for i in misses], encoded)
+            cached.update(zip((keys[i] for i in misses), encoded))
+        
+        logger.info("Embedding cache: %s hits, %s misses", len(texts) - len(misses), len(misses))
+        return np.vstack([cached[key] for key in keys]).astype(np.float32, copy=False)
+    
+    def precompute_embeddings(self, queries: List[str]):
+        """Embed known queries in a single batch so later lookups skip the model"""
+        embeddings = self.embedding_model.encode(list(queries), batch_size=EMBED_BATCH_SIZE)
+        self._precomputed_embeddings.update(zip(queries, embeddings))
+    
+    def embed_query(self, query: str):
+        """Embed a single query, reusing a precomputed vector when available"""
+        embedding = self._precomputed_embeddings.get(query)
+        if embedding is None:
+            embedding = self._encode_query(query)
+        return embedding
+    
+    def _encode_query(self, query: str):
+        """Encode a query once; the search cache and a cache miss's Chroma query both need the vector"""
+        with self._query_embeddings_lock:
+            embedding = self._query_embeddings.get(query)
+        if embedding is None:
+            embedding = self.embedding_model.encode([query], show_progress_bar=False)[0]
+            with self._query_embeddings_lock:
+                self._query_embeddings[query] = embedding
+        return embedding
+    
     def search_knowledge(self, query: str, n_results: int = 5) -> List[Dict[str, Any]]:
+        """Search the knowledge base, reusing results from a semantically equivalent earlier query"""
+        try:
+            return self._search_cache.get_or_compute(
+                query, n_results,
+                lambda: self._query_collection(query, n_results),
+                should_store=bool
+            )
+        except Exception as e:
+            logger.error("Error searching knowledge base: %s", e)
+            return []
+    
+    def _query_collection(self, query: str, n_results: int) -> List[Dict[str, Any]]:
         """Search the knowledge base for relevant information"""
         try:
             # Generate query embedding
-            query_embedding = self.embedding_model.encode([query]).tolist()[0]
+            query_embedding = np.asarray(self.embed_query(query), dtype=np.float32)
             
-            # Search the collection
+            # Over-fetch so MMR can swap near-duplicate chunks for ones that add new information
             results = self.collection.query(
-                query_embeddings=[query_embedding],
-                n_results=n_results,
-                include=['documents', 'metadatas', 'distances']
+                query_embeddings=[query_embedding.tolist()],
+                n_results=n_results * MMR_FETCH_FACTOR,
+                include=['embeddings', 'documents', 'metadatas', 'distances']
             )
             
+            if not results['documents'][0]:
+                return []
+            
+            candidates = np.asarray(results['embeddings'][0], dtype=np.float32)
+            
             # Format results
             formatted_results = []
-            for i in range(len(results['documents'][0])):
+            for i in _mmr_select(query_embedding, candidates, n_results):
                 formatted_results.append({
                     'content': results['documents'][0][i],
                     'metadata': results['metadatas'][0][i],
@@ -115,7 +410,7 @@ class ClimateRAGSystem:
             return formatted_results
             
         except Exception as e:
-            logger.error(f"Error searching knowledge base: {e}")
+            logger.error("Error searching knowledge base: %s", e)
             return []
     
     def retrieve_and_generate(self, query: str, user_profile: Dict[str, Any] = None) -> Tuple[str, List[Dict[str, Any]]]:
@@ -127,46 +422,108 @@ class ClimateRAGSystem:
             # Search for relevant documents
             relevant_docs = self.search_knowledge(enhanced_query, n_results=5)
             
+            cache_key = self._response_key(query, relevant_docs)
+            with self._response_cache_lock:
+                response = self._response_cache.get(cache_key)
+            if response is not None:
+                return response, relevant_docs
+            
             # Prepare context from retrieved documents
             context = self._prepare_context(relevant_docs)
             
             # Generate response using watsonx
-            response = self.watsonx_client.generate_response(query, context)
+            response, generated = self.watsonx_client.generate_response_with_status(query, context)
+            
+            # Fallback and truncated answers are shown but not cached, so the next ask retries the model
+            if generated:
+                with self._response_cache_lock:
+                    self._response_cache[cache_key] = response
             
             return response, relevant_docs
             
         except Exception as e:
-            logger.error(f"Error in retrieve_and_generate: {e}")
+            logger.error("Error in retrieve_and_generate: %s", e)
             return f"I apologize, but I encountered an error: {str(e)}", []
     
+    def retrieve_and_generate_batch(self, queries: List[str], user_profile: Dict[str, Any] = None) -> List[Tuple[str, List[Dict[str, Any]]]]:
+        """Answer many queries, sending every uncached one to watsonx in batched generation calls"""
+        results = []
+        pending = []
+        for query in queries:
+            relevant_docs = self.search_knowledge(self._enhance_query(query, user_profile), n_results=5)
+            cache_key = self._response_key(query, relevant_docs)
+            with self._response_cache_lock:
+                response = self._response_cache.get(cache_key)
+            if response is None:
+                pending.append((len(results), query, relevant_docs, cache_key))
+            results.append((response, relevant_docs))
+        
+        if pending:
+            responses = self.watsonx_client.generate_responses_batch(
+                [query for _, query, _, _ in pending],
+                [self._prepare_context(relevant_docs) for _, _, relevant_docs, _ in pending]
+            )
+            with self._response_cache_lock:
+                for (index, _, relevant_docs, cache_key), (response, generated) in zip(pending, responses):
+                    if generated:
+                        self._response_cache[cache_key] = response
+                    results[index] = (response, relevant_docs)
+        
+        return results
+    
+    def retrieve_and_generate_stream(self, query: str, user_profile: Dict[str, Any] = None) -> Tuple[ResponseStream, List[Dict[str, Any]]]:
+        """Retrieve relevant knowledge, then return a token stream for the response along with the sources"""
+        try:
+            enhanced_query = self._enhance_query(query, user_profile)
+            relevant_docs = self.search_knowledge(enhanced_query, n_results=5)
+            
+            cache_key = self._response_key(query, relevant_docs)
+            with self._response_cache_lock:
+                response = self._response_cache.get(cache_key)
+            if response is not None:
+                return ResponseStream([response]), relevant_docs
+            
+            context = self._prepare_context(relevant_docs)
+            stream = self.watsonx_client.generate_response_stream(query, context)
+            # Only an answer the model finished is cached, never a truncated stream or the fallback
+            stream.on_complete(lambda text: self._store_response(cache_key, text))
+            
+            return stream, relevant_docs
+            
+        except Exception as e:
+            logger.error("Error in retrieve_and_generate_stream: %s", e)
+            return ResponseStream.from_fallback(f"I apologize, but I encountered an error: {str(e)}"), []
+    
+    def _response_key(self, query: str, relevant_docs: List[Dict[str, Any]]) -> str:
+        """Cache key for an answer: normalized query, the chunks it was grounded on, and the knowledge base generation"""
+        chunk_ids = ",".join(sorted(doc['metadata'].get('chunk_id', '') for doc in relevant_docs))
+        normalized = " ".join(query.lower().split())
+        return hashlib.sha1(f"{self._kb_generation}|{normalized}|{chunk_ids}".encode('utf-8')).hexdigest()
+    
+    def _store_response(self, cache_key: str, response: str):
+        """Cache a complete model answer"""
+        with self._response_cache_lock:
+            self._response_cache[cache_key] = response
+    
     def _enhance_query(self, query: str, user_profile: Dict[str, Any] = None) -> str:
         """Enhance query with user context"""
         if not user_profile:
             return query
         
-        location = user_profile.get('location', '')
-        lifestyle = user_profile.get('lifestyle', '')
-        
-        enhanced = query
-        if location:
-            enhanced += f" in {location}"
-        if lifestyle:
-            enhanced += f" for {lifestyle} lifestyle"
-        
-        return enhanced
+        return _enhance_query_text(query, user_profile.get('location', ''), user_profile.get('lifestyle', ''))
     
     def _prepare_context(self, relevant_docs: List[Dict[str, Any]]) -> str:
         """Prepare context from retrieved documents"""
-        context_parts = []
-        
-        for doc in relevant_docs:
-            source = doc['metadata'].get('source', 'Unknown')
-            title = doc['metadata'].get('title', 'Untitled')
-            content = doc['content']
-            
-            context_parts.append(f"Source: {source} - {title}\n{content}")
-        
-        return "\n\n---\n\n".join(context_parts)
+        return "\n\n---\n\n".join(
+            f"Source: {doc['metadata'].get('source', 'Unknown')} - {doc['metadata'].get('title', 'Untitled')}\n{doc['content']}"
+            for doc in relevant_docs
+        )
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Get hit/miss statistics for the search result cache and the size of the response cache"""
+        stats = self._search_cache.stats()
+        stats['cached_responses'] = len(self._response_cache)
+        return stats
     
     def get_collection_stats(self) -> Dict[str, Any]:
         """Get statistics about the knowledge base"""
@@ -174,58 +531,41 @@ class ClimateRAGSystem:
             count = self.collection.count()
             return {
                 "total_documents": count,
-                "collection_name": "climate_knowledge",
+                "collection_name": COLLECTION_NAME,
                 "embedding_model": settings.EMBEDDING_MODEL
             }
         except Exception as e:
-            logger.error(f"Error getting collection stats: {e}")
+            logger.error("Error getting collection stats: %s", e)
             return {"error": str(e)}
     
     def initialize_with_sample_data(self):
         """Initialize the knowledge base with sample climate data"""
-        sample_documents = [
-            {
-                "title": "Renewable Energy Transition",
-                "content": """Renewable energy sources like solar, wind, and hydroelectric power are crucial for reducing greenhouse gas emissions. Solar panels can reduce household carbon footprint by 3-4 tons of CO2 per year. Wind energy is one of the fastest-growing renewable sources globally. The transition to renewable energy requires investment but provides long-term cost savings and environmental benefits. Government incentives and falling technology costs make renewable energy increasingly accessible to individuals and businesses.""",
-                "source": "Climate Action Guide",
-                "category": "energy"
-            },
-            {
-                "title": "Sustainable Transportation",
-                "content": """Transportation accounts for approximately 29% of greenhouse gas emissions in the United States. Electric vehicles can reduce emissions by 60-70% compared to gasoline vehicles. Public transportation, cycling, and walking are highly effective ways to reduce personal carbon footprint. Carpooling and ride-sharing can significantly reduce per-person emissions. For long-distance travel, trains are generally more environmentally friendly than planes or cars.""",
-                "source": "EPA Transportation Guide",
-                "category": "transportation"
-            },
-            {
-                "title": "Energy Efficiency at Home",
-                "content": """Home energy efficiency improvements can reduce energy consumption by 20-30%. LED lighting uses 75% less energy than incandescent bulbs. Proper insulation can reduce heating and cooling costs by up to 40%. Smart thermostats can save 10-15% on heating and cooling bills. Energy-efficient appliances with ENERGY STAR ratings use 10-50% less energy than standard models. Sealing air leaks around windows and doors is a cost-effective way to improve efficiency.""",
-                "source": "Energy Efficiency Guide",
-                "category": "energy_efficiency"
-            },
-            {
-                "title": "Sustainable Food Choices",
-                "content": """Food production accounts for about 26% of global greenhouse gas emissions. Plant-based diets can reduce food-related emissions by up to 73%. Reducing meat consumption, especially beef, has significant environmental impact. Local and seasonal food choices reduce transportation emissions. Reducing food waste is crucial - about 1/3 of food produced globally is wasted. Composting food scraps reduces methane emissions from landfills and creates valuable soil amendment.""",
-                "source": "Sustainable Food Guide",
-                "category": "food"
-            },
-            {
-                "title": "Water Conservation",
-                "content": """Water conservation reduces energy consumption for water treatment and distribution. Low-flow fixtures can reduce water usage by 20-60%. Fixing leaks promptly prevents waste - a single dripping faucet can waste over 3,000 gallons per year. Rainwater harvesting can reduce municipal water demand. Drought-resistant landscaping reduces irrigation needs. Shorter showers and full loads in dishwashers and washing machines maximize efficiency.""",
-                "source": "Water Conservation Guide",
-                "category": "water"
-            },
-            {
-                "title": "Waste Reduction and Recycling",
-                "content": """The waste sector contributes about 5% of global greenhouse gas emissions. Reducing, reusing, and recycling materials prevents emissions from manufacturing new products. Composting organic waste reduces methane emissions from landfills. Proper recycling of electronics prevents toxic materials from entering the environment. Choosing products with minimal packaging reduces waste. Buying durable, repairable products reduces long-term waste generation.""",
-                "source": "Waste Management Guide",
-                "category": "waste"
-            }
-        ]
         
         # Check if collection is empty
         if self.collection.count() == 0:
             logger.info("Initializing knowledge base with sample data...")
-            self.add_documents(sample_documents)
+            if not self._add_precomputed_samples():
+                self.add_documents(SAMPLE_DOCUMENTS)
             logger.info("Sample data added successfully")
         else:
-            logger.info("Knowledge base already contains data")
\ No newline at end of file
+            logger.info("Knowledge base already contains data")
+    
+    def _add_precomputed_samples(self) -> bool:
+        """Load the sample data vectors written by build_sample_embeddings.py, skipping the encoder entirely"""
+        ids_path = os.path.join(os.path.dirname(settings.PRECOMPUTED_SAMPLE_PATH), "sample_ids.json")
+        if not (os.path.exists(settings.PRECOMPUTED_SAMPLE_PATH) and os.path.exists(ids_path)):
+            return False
+        
+        chunks = list(iter_document_chunks(SAMPLE_DOCUMENTS, self.text_splitter))
+        with open(ids_path, 'rb') as f:
+            manifest = orjson.loads(f.read())
+        if manifest.get('fingerprint') != sample_fingerprint(chunks):
+            logger.warning("Precomputed sample embeddings are stale; re-run build_sample_embeddings.py")
+            return False
+        
+        embeddings = np.load(settings.PRECOMPUTED_SAMPLE_PATH, mmap_mode='r')
+        texts, metadatas, ids = (list(column) for column in zip(*chunks))
+        self._add_to_collection(texts, metadatas, embeddings, ids)
+        
+        logger.info("Added %s precomputed sample chunks", len(ids))
+        return True
\ No newline at end of file
@@ -0,0 +1,173 @@
+"""
+FAISS vector store (IVF-PQ or int8 scalar quantized) for large knowledge bases, with chunk text and metadata in a SQLite sidecar
+"""
+import os
+import logging
+import sqlite3
+import threading
+from typing import Any, Dict, List
+import numpy as np
+import orjson
+import faiss
+
+logger = logging.getLogger(__name__)
+
+# Vectors collected in the exact index before the compressed index is trained, per index type
+TRAIN_SIZES = {"ivfpq": 50_000, "sq8": 10_000}
+NLIST = 1024
+PQ_M = 16
+PQ_NBITS = 8
+NPROBE = 8
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chunks (
+    faiss_id INTEGER PRIMARY KEY,
+    chunk_id TEXT NOT NULL UNIQUE,
+    document TEXT NOT NULL,
+    metadata BLOB NOT NULL
+);
+"""
+
+class FAISSBackend:
+    """Collection-compatible store (add/query/count) backed by a FAISS index
+    
+    Vectors go into an exact inner-product index until enough of them exist to train the
+    compressed index: IVF-PQ ("ivfpq") or per-dimension int8 scalar quantization ("sq8", 4x
+    smaller than float32 with near-exact recall). Embeddings are expected to be L2-normalized,
+    so inner product is cosine similarity and distance is 1 - similarity. The index is written
+    to disk by persist(), once per ingestion rather than on every add.
+    """
+    
+    def __init__(self, persist_dir: str, index_type: str = "ivfpq"):
+        if index_type not in TRAIN_SIZES:
+            raise ValueError(f"Unsupported FAISS index type: {index_type}")
+        self.index_type = index_type
+        self.train_size = TRAIN_SIZES[index_type]
+        os.makedirs(persist_dir, exist_ok=True)
+        faiss.omp_set_num_threads(os.cpu_count() or 1)
+        
+        self.index_path = os.path.join(persist_dir, "index.faiss")
+        self.index = faiss.read_index(self.index_path) if os.path.exists(self.index_path) else None
+        if isinstance(self.index, faiss.IndexIVF):
+            self.index.nprobe = NPROBE
+        
+        self._conn = sqlite3.connect(os.path.join(persist_dir, "chunks.db"), check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._drop_unpersisted_rows()
+        
+        logger.info("FAISS backend loaded with %s vectors", self.count())
+    
+    def _drop_unpersisted_rows(self):
+        """Delete rows whose vectors never reached the index file (the process stopped before persist)
+        
+        Ids only grow and the index is written after its rows, so the saved index holds exactly the
+        count() lowest ids; dropping the rest lets those chunks be added again.
+        """
+        with self._conn:
+            dropped = self._conn.execute(
+                "DELETE FROM chunks WHERE faiss_id NOT IN (SELECT faiss_id FROM chunks ORDER BY faiss_id LIMIT ?)",
+                (self.count(),)
+            ).rowcount
+        if dropped:
+            logger.warning("Dropped %s FAISS chunks that were not in the saved index", dropped)
+    
+    def count(self) -> int:
+        """Number of stored vectors"""
+        return self.index.ntotal if self.index is not None else 0
+    
+    def add(self, documents: List[str], metadatas: List[Dict[str, Any]], embeddings, ids: List[str]):
+        """Add chunks; ids that are already stored are skipped, as Chroma does"""
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        
+        with self._lock:
+            placeholders = ','.join('?' * len(ids))
+            existing = {row[0] for row in self._conn.execute(
+                f"SELECT chunk_id FROM chunks WHERE chunk_id IN ({placeholders})", ids
+            )}
+            keep = [i for i, chunk_id in enumerate(ids) if chunk_id not in existing]
+            if not keep:
+                return
+            
+            if self.index is None:
+                self.index = faiss.IndexIDMap2(faiss.IndexFlatIP(embeddings.shape[1]))
+            
+            # Ids continue from the stored rows so they never collide, even with an index that lags them
+            start = self._conn.execute("SELECT COALESCE(MAX(faiss_id) + 1, 0) FROM chunks").fetchone()[0]
+            faiss_ids = np.arange(start, start + len(keep), dtype=np.int64)
+            self.index.add_with_ids(embeddings[keep], faiss_ids)
+            
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO chunks (faiss_id, chunk_id, document, metadata) VALUES (?, ?, ?, ?)",
+                    ((int(faiss_id), ids[i], documents[i], orjson.dumps(metadatas[i]))
+                     for faiss_id, i in zip(faiss_ids, keep))
+                )
+            
+            if self._is_exact() and self.index.ntotal >= self.train_size:
+                self._train_compressed()
+            self._dirty = True
+    
+    def persist(self):
+        """Write the index to disk if vectors were added since the last write"""
+        with self._lock:
+            if self._dirty:
+                faiss.write_index(self.index, self.index_path)
+                self._dirty = False
+    
+    def _is_exact(self) -> bool:
+        """Whether vectors are still in the untrained exact (float32) staging index"""
+        return isinstance(self.index, faiss.IndexIDMap2) and isinstance(faiss.downcast_index(self.index.index), faiss.IndexFlat)
+    
+    def _train_compressed(self):
+        """Replace the exact index with the configured compressed index, trained on the first train_size vectors"""
+        logger.info("Training %s index on %s vectors...", self.index_type, self.train_size)
+        vectors = self.index.index.reconstruct_n(0, self.index.ntotal)
+        faiss_ids = faiss.vector_to_array(self.index.id_map)
+        dim = vectors.shape[1]
+        
+        if self.index_type == "sq8":
+            sq = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT)
+            sq.train(vectors[:self.train_size])
+            index = faiss.IndexIDMap2(sq)
+        else:
+            quantizer = faiss.IndexFlatIP(dim)
+            index = faiss.IndexIVFPQ(quantizer, dim, NLIST, PQ_M, PQ_NBITS, faiss.METRIC_INNER_PRODUCT)
+            index.train(vectors[:self.train_size])
+            # Hashtable direct map keeps reconstruct(id) available for MMR reranking
+            index.set_direct_map_type(faiss.DirectMap.Hashtable)
+            index.nprobe = NPROBE
+        index.add_with_ids(vectors, faiss_ids)
+        
+        self.index = index
+    
+    def query(self, query_embeddings, n_results: int = 10, include: List[str] = None) -> Dict[str, List[List[Any]]]:
+        """Nearest-neighbour search returning Chroma-shaped results"""
+        include = include or ['documents', 'metadatas', 'distances']
+        queries = np.ascontiguousarray(query_embeddings, dtype=np.float32)
+        results = {'ids': [], 'documents': [], 'metadatas': [], 'distances': [], 'embeddings': []}
+        
+        with self._lock:
+            if not self.count():
+                return {key: [[] for _ in queries] for key in results if key == 'ids' or key in include}
+            
+            scores, faiss_ids = self.index.search(queries, min(n_results, self.count()))
+            for row_scores, row_ids in zip(scores, faiss_ids):
+                found = [(float(score), int(faiss_id)) for score, faiss_id in zip(row_scores, row_ids) if faiss_id >= 0]
+                rows = {}
+                if found:
+                    placeholders = ','.join('?' * len(found))
+                    rows = {row[0]: row[1:] for row in self._conn.execute(
+                        f"SELECT faiss_id, chunk_id, document, metadata FROM chunks WHERE faiss_id IN ({placeholders})",
+                        [faiss_id for _, faiss_id in found]
+                    )}
+                
+                results['ids'].append([rows[faiss_id][0] for _, faiss_id in found])
+                results['documents'].append([rows[faiss_id][1] for _, faiss_id in found])
+                results['metadatas'].append([orjson.loads(rows[faiss_id][2]) for _, faiss_id in found])
+                results['distances'].append([1.0 - score for score, _ in found])
+                if 'embeddings' in include:
+                    results['embeddings'].append([self.index.reconstruct(faiss_id) for _, faiss_id in found])
+        
+        return {key: value for key, value in results.items() if key == 'ids' or key in include}
@@ -0,0 +1,47 @@
+"""
+Fused mean pooling and L2 normalization of transformer token embeddings
+"""
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; pooling falls back to NumPy
+    njit = None
+
+def _pool_and_normalize_numpy(last_hidden: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Masked mean over tokens followed by L2 normalization"""
+    weights = mask[..., None].astype(np.float32)
+    pooled = (last_hidden * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+    pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+    return pooled.astype(np.float32)
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _pool_and_normalize_kernel(last_hidden, mask):
+        """One pass per sequence: masked token sum, mean and norm without (B, T, H) temporaries"""
+        batch, tokens, hidden = last_hidden.shape
+        out = np.zeros((batch, hidden), dtype=np.float32)
+        for b in prange(batch):
+            count = 0.0
+            for t in range(tokens):
+                if mask[b, t]:
+                    count += 1.0
+                    for h in range(hidden):
+                        out[b, h] += last_hidden[b, t, h]
+            count = max(count, 1e-9)
+            norm = 0.0
+            for h in range(hidden):
+                out[b, h] /= count
+                norm += out[b, h] * out[b, h]
+            norm = max(np.sqrt(norm), 1e-12)
+            for h in range(hidden):
+                out[b, h] /= norm
+        return out
+else:
+    _pool_and_normalize_kernel = None
+
+def pool_and_normalize(last_hidden: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Mean-pool (B, T, H) token embeddings under a (B, T) attention mask and L2-normalize each row"""
+    if _pool_and_normalize_kernel is None:
+        return _pool_and_normalize_numpy(last_hidden, mask)
+    return _pool_and_normalize_kernel(np.ascontiguousarray(last_hidden, dtype=np.float32), np.ascontiguousarray(mask))
@@ -0,0 +1,66 @@
+"""
+ONNX Runtime sentence embedder with int8 dynamic quantization for CPU inference
+"""
+import os
+import logging
+from typing import List
+import numpy as np
+from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+from optimum.onnxruntime.configuration import AutoQuantizationConfig
+from transformers import AutoTokenizer
+from backend.rag_system.fastpool import pool_and_normalize
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+QUANTIZED_FILE_NAME = "model_quantized.onnx"
+MAX_SEQ_LENGTH = 256
+
+class ONNXEmbedder:
+    """Drop-in replacement for SentenceTransformer.encode backed by a quantized ONNX export"""
+    
+    def __init__(self, model_name: str = None, export_dir: str = None):
+        self.model_name = model_name or settings.EMBEDDING_MODEL
+        self.export_dir = export_dir or settings.ONNX_EMBEDDER_DIR
+        
+        if not os.path.exists(os.path.join(self.export_dir, QUANTIZED_FILE_NAME)):
+            self._export_and_quantize()
+        
+        self.tokenizer = AutoTokenizer.from_pretrained(self.export_dir)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            self.export_dir,
+            file_name=QUANTIZED_FILE_NAME,
+            provider="CPUExecutionProvider"
+        )
+        logger.info("ONNX embedder loaded from %s", self.export_dir)
+    
+    def _export_and_quantize(self):
+        """Export the model to ONNX once and store an int8 dynamically quantized copy"""
+        logger.info("Exporting %s to ONNX (one-time)...", self.model_name)
+        os.makedirs(self.export_dir, exist_ok=True)
+        
+        model = ORTModelForFeatureExtraction.from_pretrained(self.model_name, export=True)
+        quantizer = ORTQuantizer.from_pretrained(model)
+        quantizer.quantize(
+            save_dir=self.export_dir,
+            quantization_config=AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+        )
+        AutoTokenizer.from_pretrained(self.model_name).save_pretrained(self.export_dir)
+    
+    def encode(self, texts: List[str], batch_size: int = 32, **kwargs) -> np.ndarray:
+        """Embed texts with mean pooling and L2 normalization, matching the sentence-transformers output"""
+        embeddings = []
+        for start in range(0, len(texts), batch_size):
+            inputs = self.tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=MAX_SEQ_LENGTH,
+                return_tensors="np"
+            )
+            hidden = self.model(**inputs).last_hidden_state
+            embeddings.append(pool_and_normalize(hidden, inputs["attention_mask"]))
+        
+        if not embeddings:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.vstack(embeddings)
@@ -0,0 +1,71 @@
+"""
+Streamed model response that records whether the model actually finished the answer
+"""
+import logging
+from typing import Callable, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+INTERRUPTED_NOTICE = "\n\n[Response interrupted. Please ask again for the full answer.]"
+
+class ResponseStream:
+    """Iterable of response chunks with completion status for cache decisions
+    
+    completed is True only when the model stream ran to the end without an error, so callers can
+    tell a full answer from a truncated one or a canned fallback and cache only real, whole answers.
+    """
+    
+    def __init__(self, chunks: Iterable[str], clean: Callable[[str], str] = None,
+                 fallback: Callable[[], str] = None):
+        self._chunks = chunks
+        self._clean = clean
+        self._fallback = fallback
+        self._parts: List[str] = []
+        self._on_complete: List[Callable[[str], None]] = []
+        self.completed = False
+        self.is_fallback = False
+        self.error: Optional[Exception] = None
+    
+    @classmethod
+    def from_fallback(cls, text: str) -> "ResponseStream":
+        """A stream of a canned response; never marked completed, so it is never cached"""
+        stream = cls(())
+        stream._parts.append(text)
+        stream.is_fallback = True
+        return stream
+    
+    def on_complete(self, callback: Callable[[str], None]):
+        """Register a callback that receives the cleaned text once the model finishes the answer"""
+        self._on_complete.append(callback)
+    
+    @property
+    def text(self) -> str:
+        """The response produced so far, cleaned the same way as non-streamed responses"""
+        joined = "".join(self._parts)
+        return self._clean(joined) if self._clean else joined
+    
+    def __iter__(self) -> Iterator[str]:
+        if self.is_fallback:
+            yield from self._parts
+            return
+        
+        try:
+            for chunk in self._chunks:
+                self._parts.append(chunk)
+                yield chunk
+        except Exception as e:
+            logger.error("Error streaming response: %s", e)
+            self.error = e
+            if self._parts:
+                # Part of the answer is already on screen; say it was cut short rather than pass it off as complete
+                yield INTERRUPTED_NOTICE
+            elif self._fallback is not None:
+                self.is_fallback = True
+                self._parts.append(self._fallback())
+                yield self._parts[-1]
+            return
+        
+        self.completed = True
+        text = self.text
+        for callback in self._on_complete:
+            callback(text)
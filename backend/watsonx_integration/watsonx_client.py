@@ -3,17 +3,232 @@ IBM watsonx.ai integration for Climate Action Intelligence Platform
 ENHANCED VERSION - Fixes missing methods and improves response handling
 """
 import os
+import re
 import logging
-from typing import Dict, List, Optional, Any, Tuple
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Tuple, Iterator
 import requests
 import json
+import httpx
 from ibm_watsonx_ai.foundation_models import ModelInference
 from ibm_watsonx_ai.metanames import GenTextParamsMetaNames as GenParams
-from ibm_watsonx_ai import Credentials
+from ibm_watsonx_ai import APIClient, Credentials
+from backend.watsonx_integration.response_stream import ResponseStream
 from config import settings
 
 logger = logging.getLogger(__name__)
 
+GENERATION_BATCH_SIZE = 8
+
+# Connection pool handed to the SDK: room for a full generation batch, and idle connections kept
+# between user requests instead of being closed after httpx's default 5 seconds
+HTTP_LIMITS = httpx.Limits(
+    max_connections=GENERATION_BATCH_SIZE + 2,
+    max_keepalive_connections=GENERATION_BATCH_SIZE,
+    keepalive_expiry=120
+)
+HTTP_TIMEOUT = httpx.Timeout(1800, connect=10)
+
+# Built once and kept byte-identical across requests so every prompt shares the same prefix
+CLIMATE_SYSTEM_PROMPT = """You are ClimateIQ, an advanced AI assistant specialized in climate action and environmental sustainability. 
+        You provide evidence-based, actionable advice for individuals, businesses, and communities to combat climate change.
+        
+        Your responses should be:
+        - Specific and actionable with clear implementation steps
+        - Include quantifiable impact estimates when possible
+        - Consider local context, regulations, and incentives
+        - Reference scientific data and industry best practices
+        - Be encouraging and solution-focused while realistic about challenges
+        - Provide cost-benefit analysis when relevant
+        - Be comprehensive but well-organized with clear sections
+        
+        Focus on practical solutions that users can implement immediately while building toward long-term sustainability goals.
+        """
+
+# Plan lines that start a numbered/bulleted item or mention a priority, stripped of surrounding whitespace
+_PRIORITY_LINE_RE = re.compile(r"^[^\S\n]*((?:1\.|•).*?|.*?(?:priority|immediate).*?)[^\S\n]*$", re.IGNORECASE | re.MULTILINE)
+
+@lru_cache(maxsize=256)
+def _fallback_response(prompt: str, context: str = "") -> str:
+    """Canned climate guidance keyed only on the prompt and context, cached at module level so no client instance is held"""
+    prompt_lower = prompt.lower()
+    
+    # Enhanced fallback responses based on context
+    if context and "california" in context.lower():
+        california_specific = """
+🌟 **California-Specific Climate Recommendations:**
+
+☀️ **Solar Energy (High Priority):**
+- California has excellent solar potential (300+ sunny days/year)
+- State rebates: California Solar Initiative + Federal Tax Credit (30%)
+- Average savings: $1,200-2,000/year on electricity bills
+- Payback period: 6-8 years
+
+🚗 **Clean Transportation:**
+- CA Clean Vehicle Rebate: Up to $7,000 for EVs
+- ZEV program makes EVs more accessible
+- HOV lane access for clean vehicles
+- Extensive charging infrastructure
+
+🏠 **Energy Efficiency:**
+- CA Title 24 building standards support efficiency upgrades
+- PACE financing available for home improvements
+- Utility rebates for ENERGY STAR appliances
+
+💰 **Financial Incentives:**
+- Property tax exemption for solar installations  
+- Time-of-use rates favor solar + storage
+- Net metering policies
+
+Target: 30% reduction is achievable through solar (20%) + transportation (8%) + efficiency (2%+)
+"""
+        return california_specific
+    
+    if any(word in prompt_lower for word in ['carbon', 'footprint', 'emissions', '30%']):
+        return """🎯 **Strategic Plan for 30% Carbon Reduction:**
+
+**PHASE 1: Quick Wins (0-3 months) - 8% reduction**
+- Switch to LED bulbs throughout home
+- Adjust thermostat settings (68°F winter, 78°F summer)
+- Seal air leaks around windows/doors
+- Use power strips to eliminate phantom loads
+
+**PHASE 2: Transportation (3-12 months) - 12% reduction**
+- Combine trips and use efficient routes
+- Work from home 2+ days/week if possible
+- Consider carpooling or public transit
+- Maintain vehicle properly (tire pressure, tune-ups)
+
+**PHASE 3: Major Upgrades (6-18 months) - 10%+ reduction**
+- Install programmable/smart thermostat
+- Upgrade to high-efficiency appliances
+- Consider solar panels or community solar
+- Improve home insulation
+
+📊 **Expected Impact:**
+- Energy efficiency: 15-20% reduction
+- Transportation changes: 8-15% reduction  
+- Renewable energy: 5-10% additional reduction
+- **Total potential: 30-45% carbon footprint reduction**
+
+💰 **Cost-Benefit:** Many actions save money long-term, with solar and efficiency upgrades paying for themselves in 5-10 years."""
+
+    elif any(word in prompt_lower for word in ['business', 'company', 'tech', 'carbon neutral']):
+        return """🏢 **Tech Company Carbon Neutrality Roadmap:**
+
+**YEAR 1: Foundation & Quick Wins**
+🔍 **Assessment Phase (Months 1-3):**
+- Comprehensive carbon audit (Scope 1, 2, 3 emissions)
+- Baseline measurement: energy, travel, supply chain
+- Set science-based targets aligned with 1.5°C pathway
+
+⚡ **Energy Transition (Months 4-12):**
+- Switch to renewable energy contracts (immediate 40-60% reduction)
+- Upgrade to LED lighting and efficient equipment
+- Implement smart building controls
+
+**YEAR 2: Operations & Culture**
+🚗 **Transportation & Remote Work:**
+- Expand remote work policies (reduce commuting emissions)
+- EV charging stations for employees
+- Sustainable travel policy with carbon offsetting
+
+♻️ **Operations:**
+- Transition to cloud infrastructure (typically 65% more efficient)
+- Implement circular IT practices (refurbish vs. replace)
+- Green procurement standards
+
+**YEAR 3: Supply Chain & Offsets**
+🔗 **Supply Chain Engagement:**
+- Work with suppliers on their carbon reduction
+- Prioritize local and sustainable vendors
+- Include carbon criteria in vendor selection
+
+🌲 **Carbon Removal:**
+- High-quality offset projects for remaining emissions
+- Direct air capture or nature-based solutions
+- Employee engagement programs
+
+📈 **Expected Timeline to Carbon Neutrality:** 24-36 months
+💰 **ROI:** Energy savings typically offset 60-80% of initial investments"""
+
+    elif any(word in prompt_lower for word in ['renewable', 'solar', 'wind', 'energy']):
+        return """🔋 **Comprehensive Renewable Energy Guide:**
+
+☀️ **Solar Energy Assessment:**
+- **Residential potential:** 4-8 kW system typical for average home
+- **Commercial potential:** 50-500 kW systems for businesses
+- **Cost trends:** 85% price drop since 2010, continuing to decline
+- **Efficiency:** Modern panels convert 20-22% of sunlight to electricity
+
+**Financial Analysis:**
+- Upfront cost: $15,000-25,000 (before incentives)
+- Federal tax credit: 30% through 2032
+- Payback period: 6-10 years depending on location
+- 25-year warranty standard, systems last 30+ years
+
+💨 **Wind Energy Options:**
+- **Utility-scale:** Most cost-effective renewable source
+- **Small residential:** Viable in rural areas with sustained winds >10 mph
+- **Community wind:** Shared ownership models available
+
+🔋 **Energy Storage Revolution:**
+- Battery costs dropped 90% since 2010
+- Home storage: 10-15 kWh systems ($10,000-15,000)
+- Provides energy security and grid independence
+- Time-of-use optimization saves additional money
+
+📊 **Implementation Strategy:**
+1. **Energy audit first** - optimize consumption before generation
+2. **Assess your site** - solar irradiance, wind patterns, space
+3. **Compare financing options** - purchase, lease, PPA, community solar
+4. **Professional installation** - certified installers ensure performance
+5. **Monitor and maintain** - systems require minimal maintenance
+
+🌍 **Environmental Impact:**
+- Typical home solar system prevents 100,000+ lbs CO2 over lifetime
+- Equivalent to planting 2,500 trees"""
+
+    else:
+        return """🌍 **Climate Action Intelligence Platform - Advanced Advisory**
+
+Welcome to your personalized climate intelligence system! I'm powered by comprehensive climate data and designed to provide actionable environmental solutions.
+
+**🎯 My Specialized Capabilities:**
+- **Personal Carbon Footprint Analysis** with reduction strategies
+- **Renewable Energy Assessment** tailored to your location
+- **Business Sustainability Planning** with ROI calculations  
+- **Climate Risk Assessment** for homes and businesses
+- **Local Climate Data Integration** for informed decisions
+
+**📊 Current Integration Status:**
+✅ Real-time weather and climate data
+✅ Carbon footprint calculation APIs
+✅ Renewable energy potential mapping
+✅ Global emissions tracking
+✅ Economic impact analysis
+✅ Policy and incentive databases
+
+**💡 Popular Queries I Excel At:**
+- "How can I reduce my carbon footprint by 30%?"
+- "What's the ROI on solar panels for my location?"
+- "Create a carbon neutrality plan for my business"
+- "What climate risks does my area face?"
+- "Compare electric vs. hybrid vehicles for my situation"
+
+**🔧 Enhanced Features:**
+- Location-specific recommendations
+- Cost-benefit analysis with real numbers
+- Implementation timelines and milestones
+- Progress tracking and impact measurement
+
+*Ready to transform your climate impact? Ask me anything about sustainable living, renewable energy, or environmental action!*
+
+**Note:** Currently operating in demonstration mode with comprehensive fallback intelligence. Full IBM Granite AI integration available with proper project configuration."""
+
+    return response
+
 class WatsonXClient:
     """Enhanced Client for IBM watsonx.ai foundation models with advanced climate intelligence"""
     
@@ -59,11 +274,11 @@ class WatsonXClient:
                 logger.info("Successfully obtained IBM Cloud access token")
                 return True
             else:
-                logger.error(f"Failed to get access token: {response.status_code} - {response.text}")
+                logger.error("Failed to get access token: %s - %s", response.status_code, response.text)
                 return False
                 
         except Exception as e:
-            logger.error(f"Error getting access token: {e}")
+            logger.error("Error getting access token: %s", e)
             return False
     
     def _initialize_model(self):
@@ -102,23 +317,44 @@ class WatsonXClient:
             # Initialize model with proper model ID
             model_id = getattr(settings, 'WATSONX_MODEL_ID', 'ibm/granite-13b-chat-v2')
             
+            # One API client, and so one keep-alive connection pool, serves every generation call
+            api_client = APIClient(
+                credentials=credentials,
+                project_id=self.project_id,
+                httpx_client=httpx.Client(limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+            )
             self.model = ModelInference(
                 model_id=model_id,
                 params=parameters,
-                credentials=credentials,
+                api_client=api_client,
                 project_id=self.project_id
             )
             
-            logger.info(f"IBM Granite model ({model_id}) initialized successfully")
+            logger.info("IBM Granite model (%s) initialized successfully", model_id)
             self.use_fallback = False
             
+            # Opt-in, and off the construction path: the warm-up is a billable generation
+            if settings.WATSONX_WARM_UP:
+                threading.Thread(target=self._warm_up_model, daemon=True).start()
+            
         except Exception as e:
-            logger.warning(f"IBM Granite model unavailable, using fallback mode: {e}")
-            logger.info(f"API Key status: {'Valid' if self.access_token else 'Invalid'}")
-            logger.info(f"Project ID: {'Available' if self.project_id else 'Missing'}")
+            logger.warning("IBM Granite model unavailable, using fallback mode: %s", e)
+            logger.info("API Key status: %s", 'Valid' if self.access_token else 'Invalid')
+            logger.info("Project ID: %s", 'Available' if self.project_id else 'Missing')
             self.model = None
             self.use_fallback = True
     
+    def _warm_up_model(self):
+        """Send a one-token generation so the SDK has a connection open before the first real request"""
+        try:
+            self.model.generate_text(
+                prompt="ping",
+                params={GenParams.MAX_NEW_TOKENS: 1, GenParams.MIN_NEW_TOKENS: 0}
+            )
+            logger.info("watsonx.ai connection warmed up")
+        except Exception as e:
+            logger.warning("watsonx.ai warm-up request failed: %s", e)
+    
     def test_connection(self) -> Dict[str, Any]:
         """Test the connection to IBM watsonx.ai"""
         try:
@@ -160,8 +396,17 @@ class WatsonXClient:
     
     def generate_response(self, prompt: str, context: str = "", max_length: int = 2000) -> str:
         """Generate response using watsonx.ai or fallback with better handling"""
+        response, _ = self.generate_response_with_status(prompt, context, max_length)
+        return response
+    
+    def generate_response_with_status(self, prompt: str, context: str = "", max_length: int = 2000) -> Tuple[str, bool]:
+        """Generate a response and report whether it is complete model output.
+        
+        The flag is False when the fallback response was substituted or the answer hit the length
+        limit, so callers can show the text but should not cache it.
+        """
         if self.use_fallback:
-            return self._generate_fallback_response(prompt, context)
+            return self._generate_fallback_response(prompt, context), False
             
         try:
             # Construct the full prompt with context
@@ -170,18 +415,66 @@ class WatsonXClient:
             # Generate response with length control
             response = self.model.generate_text(prompt=full_prompt)
             
-            # Clean and format the response
-            cleaned_response = self._clean_response(response)
-            
-            # Ensure response isn't truncated inappropriately
-            if len(cleaned_response) >= max_length - 50:
-                cleaned_response += "\n\n[Response continues... Ask for more details on specific aspects]"
-            
-            return cleaned_response
+            return self._finish_response(response, max_length)
             
         except Exception as e:
-            logger.error(f"Error generating response: {e}")
-            return self._generate_fallback_response(prompt, context)
+            logger.error("Error generating response: %s", e)
+            return self._generate_fallback_response(prompt, context), False
+    
+    def _finish_response(self, response: str, max_length: int = 2000) -> Tuple[str, bool]:
+        """Clean model output and flag answers cut off at the length limit"""
+        cleaned_response = self._clean_response(response)
+        
+        # Ensure response isn't truncated inappropriately
+        if len(cleaned_response) >= max_length - 50:
+            return cleaned_response + "\n\n[Response continues... Ask for more details on specific aspects]", False
+        
+        return cleaned_response, True
+    
+    def generate_responses_batch(self, prompts: List[str], contexts: List[str] = None) -> List[Tuple[str, bool]]:
+        """Generate responses for many prompts, sending them to watsonx.ai in groups of GENERATION_BATCH_SIZE
+        
+        Each item is (text, generated) as from generate_response_with_status; a failed group gets
+        fallback text with generated False.
+        """
+        contexts = contexts or [""] * len(prompts)
+        if self.use_fallback:
+            return [(self._generate_fallback_response(prompt, context), False) for prompt, context in zip(prompts, contexts)]
+        
+        responses = []
+        for start in range(0, len(prompts), GENERATION_BATCH_SIZE):
+            batch = list(zip(prompts[start:start + GENERATION_BATCH_SIZE], contexts[start:start + GENERATION_BATCH_SIZE]))
+            try:
+                generated = self.model.generate_text(
+                    prompt=[self._construct_climate_prompt(prompt, context) for prompt, context in batch],
+                    concurrency_limit=GENERATION_BATCH_SIZE
+                )
+                responses.extend(self._finish_response(response) for response in generated)
+            except Exception as e:
+                logger.error("Error generating batched responses: %s", e)
+                responses.extend((self._generate_fallback_response(prompt, context), False) for prompt, context in batch)
+        
+        return responses
+    
+    def generate_response_stream(self, prompt: str, context: str = "") -> ResponseStream:
+        """Stream response chunks from watsonx.ai as they are generated.
+        
+        The returned stream's completed flag is set only if the model finished the answer; a failure
+        before any output substitutes the fallback response, a failure mid-answer ends the stream early.
+        """
+        if self.use_fallback:
+            return ResponseStream.from_fallback(self._generate_fallback_response(prompt, context))
+        
+        full_prompt = self._construct_climate_prompt(prompt, context)
+        return ResponseStream(
+            self._model_stream(full_prompt),
+            clean=self._clean_response,
+            fallback=lambda: self._generate_fallback_response(prompt, context)
+        )
+    
+    def _model_stream(self, full_prompt: str) -> Iterator[str]:
+        """Chunks from the model's streaming endpoint; errors surface to the consuming ResponseStream"""
+        yield from self.model.generate_text_stream(prompt=full_prompt)
     
     def _clean_response(self, response: str) -> str:
         """Clean and format the model response"""
@@ -248,7 +541,7 @@ class WatsonXClient:
             }
             
         except Exception as e:
-            logger.error(f"Error generating personalized plan: {e}")
+            logger.error("Error generating personalized plan: %s", e)
             return self._generate_fallback_plan(user_profile)
     
     def _generate_fallback_plan(self, user_profile: Dict[str, Any]) -> Dict[str, Any]:
@@ -359,17 +652,19 @@ class WatsonXClient:
         """Extract priority actions from the generated plan"""
         # This is a simplified extraction - in production, you'd use more sophisticated NLP
         priorities = []
-        
-        # Look for numbered items or bullet points
-        lines = plan_text.split('\n')
-        for line in lines:
-            line = line.strip()
-            if (line.startswith('1.') or line.startswith('•') or 
-                'priority' in line.lower() or 'immediate' in line.lower()):
-                if len(line) > 10 and not any(action.lower() in line.lower() for action in current_actions):
+        current = [action.lower() for action in current_actions]
+        
+        # One regex pass finds numbered items, bullet points and priority lines
+        for match in _PRIORITY_LINE_RE.finditer(plan_text):
+            line = match.group(1)
+            if len(line) > 10:
+                line_lower = line.lower()
+                if not any(action in line_lower for action in current):
                     priorities.append(line.lstrip('1234567890.• '))
+                    if len(priorities) == 5:  # Top 5 priorities
+                        break
         
-        return priorities[:5]  # Top 5 priorities
+        return priorities
     
     def _extract_priority_actions_fallback(self, current_actions: List[str], interests: List[str], budget: str) -> List[str]:
         """Extract priority actions for fallback mode"""
@@ -449,202 +744,12 @@ class WatsonXClient:
     
     def _generate_fallback_response(self, prompt: str, context: str = "") -> str:
         """Generate enhanced fallback response when Watson X.ai is unavailable"""
-        prompt_lower = prompt.lower()
-        
-        # Enhanced fallback responses based on context
-        if context and "california" in context.lower():
-            california_specific = """
-🌟 **California-Specific Climate Recommendations:**
-
-☀️ **Solar Energy (High Priority):**
-- California has excellent solar potential (300+ sunny days/year)
-- State rebates: California Solar Initiative + Federal Tax Credit (30%)
-- Average savings: $1,200-2,000/year on electricity bills
-- Payback period: 6-8 years
-
-🚗 **Clean Transportation:**
-- CA Clean Vehicle Rebate: Up to $7,000 for EVs
-- ZEV program makes EVs more accessible
-- HOV lane access for clean vehicles
-- Extensive charging infrastructure
-
-🏠 **Energy Efficiency:**
-- CA Title 24 building standards support efficiency upgrades
-- PACE financing available for home improvements
-- Utility rebates for ENERGY STAR appliances
-
-💰 **Financial Incentives:**
-- Property tax exemption for solar installations  
-- Time-of-use rates favor solar + storage
-- Net metering policies
-
-Target: 30% reduction is achievable through solar (20%) + transportation (8%) + efficiency (2%+)
-"""
-            return california_specific
-        
-        if any(word in prompt_lower for word in ['carbon', 'footprint', 'emissions', '30%']):
-            return """🎯 **Strategic Plan for 30% Carbon Reduction:**
-
-**PHASE 1: Quick Wins (0-3 months) - 8% reduction**
-- Switch to LED bulbs throughout home
-- Adjust thermostat settings (68°F winter, 78°F summer)
-- Seal air leaks around windows/doors
-- Use power strips to eliminate phantom loads
-
-**PHASE 2: Transportation (3-12 months) - 12% reduction**
-- Combine trips and use efficient routes
-- Work from home 2+ days/week if possible
-- Consider carpooling or public transit
-- Maintain vehicle properly (tire pressure, tune-ups)
-
-**PHASE 3: Major Upgrades (6-18 months) - 10%+ reduction**
-- Install programmable/smart thermostat
-- Upgrade to high-efficiency appliances
-- Consider solar panels or community solar
-- Improve home insulation
-
-📊 **Expected Impact:**
-- Energy efficiency: 15-20% reduction
-- Transportation changes: 8-15% reduction  
-- Renewable energy: 5-10% additional reduction
-- **Total potential: 30-45% carbon footprint reduction**
-
-💰 **Cost-Benefit:** Many actions save money long-term, with solar and efficiency upgrades paying for themselves in 5-10 years."""
-
-        elif any(word in prompt_lower for word in ['business', 'company', 'tech', 'carbon neutral']):
-            return """🏢 **Tech Company Carbon Neutrality Roadmap:**
-
-**YEAR 1: Foundation & Quick Wins**
-🔍 **Assessment Phase (Months 1-3):**
-- Comprehensive carbon audit (Scope 1, 2, 3 emissions)
-- Baseline measurement: energy, travel, supply chain
-- Set science-based targets aligned with 1.5°C pathway
-
-⚡ **Energy Transition (Months 4-12):**
-- Switch to renewable energy contracts (immediate 40-60% reduction)
-- Upgrade to LED lighting and efficient equipment
-- Implement smart building controls
-
-**YEAR 2: Operations & Culture**
-🚗 **Transportation & Remote Work:**
-- Expand remote work policies (reduce commuting emissions)
-- EV charging stations for employees
-- Sustainable travel policy with carbon offsetting
-
-♻️ **Operations:**
-- Transition to cloud infrastructure (typically 65% more efficient)
-- Implement circular IT practices (refurbish vs. replace)
-- Green procurement standards
-
-**YEAR 3: Supply Chain & Offsets**
-🔗 **Supply Chain Engagement:**
-- Work with suppliers on their carbon reduction
-- Prioritize local and sustainable vendors
-- Include carbon criteria in vendor selection
-
-🌲 **Carbon Removal:**
-- High-quality offset projects for remaining emissions
-- Direct air capture or nature-based solutions
-- Employee engagement programs
-
-📈 **Expected Timeline to Carbon Neutrality:** 24-36 months
-💰 **ROI:** Energy savings typically offset 60-80% of initial investments"""
-
-        elif any(word in prompt_lower for word in ['renewable', 'solar', 'wind', 'energy']):
-            return """🔋 **Comprehensive Renewable Energy Guide:**
-
-☀️ **Solar Energy Assessment:**
-- **Residential potential:** 4-8 kW system typical for average home
-- **Commercial potential:** 50-500 kW systems for businesses
-- **Cost trends:** 85% price drop since 2010, continuing to decline
-- **Efficiency:** Modern panels convert 20-22% of sunlight to electricity
-
-**Financial Analysis:**
-- Upfront cost: $15,000-25,000 (before incentives)
-- Federal tax credit: 30% through 2032
-- Payback period: 6-10 years depending on location
-- 25-year warranty standard, systems last 30+ years
-
-💨 **Wind Energy Options:**
-- **Utility-scale:** Most cost-effective renewable source
-- **Small residential:** Viable in rural areas with sustained winds >10 mph
-- **Community wind:** Shared ownership models available
-
-🔋 **Energy Storage Revolution:**
-- Battery costs dropped 90% since 2010
-- Home storage: 10-15 kWh systems ($10,000-15,000)
-- Provides energy security and grid independence
-- Time-of-use optimization saves additional money
-
-📊 **Implementation Strategy:**
-1. **Energy audit first** - optimize consumption before generation
-2. **Assess your site** - solar irradiance, wind patterns, space
-3. **Compare financing options** - purchase, lease, PPA, community solar
-4. **Professional installation** - certified installers ensure performance
-5. **Monitor and maintain** - systems require minimal maintenance
-
-🌍 **Environmental Impact:**
-- Typical home solar system prevents 100,000+ lbs CO2 over lifetime
-- Equivalent to planting 2,500 trees"""
-
-        else:
-            return """🌍 **Climate Action Intelligence Platform - Advanced Advisory**
-
-Welcome to your personalized climate intelligence system! I'm powered by comprehensive climate data and designed to provide actionable environmental solutions.
-
-**🎯 My Specialized Capabilities:**
-- **Personal Carbon Footprint Analysis** with reduction strategies
-- **Renewable Energy Assessment** tailored to your location
-- **Business Sustainability Planning** with ROI calculations  
-- **Climate Risk Assessment** for homes and businesses
-- **Local Climate Data Integration** for informed decisions
-
-**📊 Current Integration Status:**
-✅ Real-time weather and climate data
-✅ Carbon footprint calculation APIs
-✅ Renewable energy potential mapping
-✅ Global emissions tracking
-✅ Economic impact analysis
-✅ Policy and incentive databases
-
-**💡 Popular Queries I Excel At:**
-- "How can I reduce my carbon footprint by 30%?"
-- "What's the ROI on solar panels for my location?"
-- "Create a carbon neutrality plan for my business"
-- "What climate risks does my area face?"
-- "Compare electric vs. hybrid vehicles for my situation"
-
-**🔧 Enhanced Features:**
-- Location-specific recommendations
-- Cost-benefit analysis with real numbers
-- Implementation timelines and milestones
-- Progress tracking and impact measurement
-
-*Ready to transform your climate impact? Ask me anything about sustainable living, renewable energy, or environmental action!*
-
-**Note:** Currently operating in demonstration mode with comprehensive fallback intelligence. Full IBM Granite AI integration available with proper project configuration."""
-
-        return response
+        return _fallback_response(prompt, context)
     
     def _construct_climate_prompt(self, query: str, context: str) -> str:
         """Construct a climate-focused prompt"""
-        system_prompt = """You are ClimateIQ, an advanced AI assistant specialized in climate action and environmental sustainability. 
-        You provide evidence-based, actionable advice for individuals, businesses, and communities to combat climate change.
-        
-        Your responses should be:
-        - Specific and actionable with clear implementation steps
-        - Include quantifiable impact estimates when possible
-        - Consider local context, regulations, and incentives
-        - Reference scientific data and industry best practices
-        - Be encouraging and solution-focused while realistic about challenges
-        - Provide cost-benefit analysis when relevant
-        - Be comprehensive but well-organized with clear sections
-        
-        Focus on practical solutions that users can implement immediately while building toward long-term sustainability goals.
-        """
-        
         if context:
-            prompt = f"""{system_prompt}
+            prompt = f"""{CLIMATE_SYSTEM_PROMPT}
 
 Context Information:
 {context}
@@ -653,7 +758,7 @@ User Question: {query}
 
 Please provide a comprehensive, actionable response with specific recommendations:"""
         else:
-            prompt = f"""{system_prompt}
+            prompt = f"""{CLIMATE_SYSTEM_PROMPT}
 
 User Question: {query}
 
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Precompute embeddings for the built-in sample knowledge base so a fresh install can load them without running the model
+"""
+import os
+import numpy as np
+import orjson
+from sentence_transformers import SentenceTransformer
+from backend.rag_system.climate_rag import (
+    SAMPLE_DOCUMENTS, EMBED_BATCH_SIZE, build_text_splitter, iter_document_chunks, sample_fingerprint
+)
+from config import settings
+
+def build_sample_embeddings():
+    """Write sample_embeddings.npy (float16) and sample_ids.json next to it"""
+    chunks = list(iter_document_chunks(SAMPLE_DOCUMENTS, build_text_splitter()))
+    texts = [text for text, _, _ in chunks]
+    
+    model = SentenceTransformer(settings.EMBEDDING_MODEL, device='cpu')
+    embeddings = model.encode(texts, batch_size=EMBED_BATCH_SIZE, show_progress_bar=False, convert_to_numpy=True)
+    
+    output_dir = os.path.dirname(settings.PRECOMPUTED_SAMPLE_PATH)
+    os.makedirs(output_dir, exist_ok=True)
+    np.save(settings.PRECOMPUTED_SAMPLE_PATH, embeddings.astype(np.float16))
+    with open(os.path.join(output_dir, "sample_ids.json"), 'wb') as f:
+        f.write(orjson.dumps({
+            "model": settings.EMBEDDING_MODEL,
+            "ids": [chunk_id for _, _, chunk_id in chunks],
+            "fingerprint": sample_fingerprint(chunks)
+        }, option=orjson.OPT_INDENT_2))
+    
+    return len(texts)
+
+if __name__ == "__main__":
+    count = build_sample_embeddings()
+    print(f"✅ Wrote {count} sample embeddings to {settings.PRECOMPUTED_SAMPLE_PATH}")
@@ -14,16 +14,20 @@ class Settings(BaseSettings):
     WATSONX_PROJECT_ID: str = os.getenv("WATSONX_PROJECT_ID", "")
     IBM_CLOUD_URL: str = os.getenv("IBM_CLOUD_URL", "https://us-south.ml.cloud.ibm.com")
     WATSONX_API_KEY: str = os.getenv("WATSONX_API_KEY", "")
+    # Send a one-token generation in the background after model setup (billed as a real request)
+    WATSONX_WARM_UP: bool = os.getenv("WATSONX_WARM_UP", "false").lower() == "true"
     
     # Climate Data APIs
     OPENWEATHER_API_KEY: str = os.getenv("OPENWEATHER_API_KEY", "")
     OPENWEATHER_API_BASE: str = os.getenv("OPENWEATHER_API_BASE", "https://api.openweathermap.org/data/2.5")
+    OPENWEATHER_GEO_API_BASE: str = os.getenv("OPENWEATHER_GEO_API_BASE", "https://api.openweathermap.org/geo/1.0")
     
     NASA_API_KEY: str = os.getenv("NASA_API_KEY", "")
     NASA_API_BASE: str = os.getenv("NASA_API_BASE", "https://power.larc.nasa.gov/api/temporal")
     
     CARBON_INTERFACE_API_KEY: str = os.getenv("CARBON_INTERFACE_API_KEY", "")
     CARBON_INTERFACE_API_BASE: str = os.getenv("CARBON_INTERFACE_API_BASE", "https://www.carboninterface.com/api/v1")
+    USE_LOCAL_CARBON_FACTORS: bool = os.getenv("USE_LOCAL_CARBON_FACTORS", "true").lower() == "true"
     
     CLIMATETRACE_API_BASE: str = os.getenv("CLIMATETRACE_API_BASE", "https://api.climatetrace.org/v6")
     CLIMATETRACE_DOCS_URL: str = os.getenv("CLIMATETRACE_DOCS_URL", "https://api.climatetrace.org/v6/swagger/index.html")
@@ -36,10 +40,24 @@ class Settings(BaseSettings):
     DEFAULT_OUTPUT_FORMAT: str = os.getenv("DEFAULT_OUTPUT_FORMAT", "json")
     
     # Vector Database Settings
+    VECTOR_BACKEND: str = os.getenv("VECTOR_BACKEND", "chroma")  # "chroma" or "faiss"
     CHROMA_PERSIST_DIRECTORY: str = "./data/climate_vectordb"
+    FAISS_PERSIST_DIRECTORY: str = os.getenv("FAISS_PERSIST_DIRECTORY", "./data/climate_faiss")
+    FAISS_INDEX_TYPE: str = os.getenv("FAISS_INDEX_TYPE", "ivfpq")  # "ivfpq" or "sq8"
+    EMBEDDING_CACHE_PATH: str = os.getenv("EMBEDDING_CACHE_PATH", "./data/embedding_cache.db")
+    PRECOMPUTED_SAMPLE_PATH: str = os.getenv("PRECOMPUTED_SAMPLE_PATH", "./data/sample_embeddings.npy")
+    USE_NATIVE_TEXT_SPLITTER: bool = os.getenv("USE_NATIVE_TEXT_SPLITTER", "false").lower() == "true"
+    
+    # Response Cache Settings
+    RESPONSE_CACHE_DIR: str = os.getenv("RESPONSE_CACHE_DIR", "./data/response_cache")
+    
+    # Impact Tracking Settings
+    IMPACT_SUMMARY_TTL_SECONDS: int = int(os.getenv("IMPACT_SUMMARY_TTL_SECONDS", "60"))
     
     # Model Settings
     EMBEDDING_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"
+    USE_ONNX_EMBEDDER: bool = os.getenv("USE_ONNX_EMBEDDER", "false").lower() == "true"
+    ONNX_EMBEDDER_DIR: str = os.getenv("ONNX_EMBEDDER_DIR", "./data/onnx_embedder")
     WATSONX_MODEL_ID: str = "ibm/granite-13b-instruct-v2"  # IBM Granite model for hackathon
     
     class Config:
@@ -8,7 +8,7 @@ import os
 sys.path.append('.')
 
 from backend.watsonx_integration.watsonx_client import WatsonXClient
-from backend.api_handlers.climate_apis import ClimateAPIHandler
+from backend.api_handlers.climate_apis import get_shared_handler
 import json
 import time
 
@@ -65,7 +65,7 @@ def demo_climate_apis():
     """Demonstrate all working climate APIs"""
     print_header("CLIMATE DATA APIS INTEGRATION")
     
-    api = ClimateAPIHandler()
+    api = get_shared_handler()
     
     # 1. Weather Data
     print_section("1. Real-time Weather Data (OpenWeather)")
@@ -159,7 +159,7 @@ def demo_integration_showcase():
     """Showcase the integration between APIs and AI"""
     print_header("INTEGRATED CLIMATE INTELLIGENCE")
     
-    api = ClimateAPIHandler()
+    api = get_shared_handler()
     watson = WatsonXClient()
     
     print_section("Real-time Climate Advisory System")
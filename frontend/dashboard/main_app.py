@@ -2,27 +2,103 @@
 Main Streamlit application for Climate Action Intelligence Platform
 """
 import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
-import pandas as pd
 import json
 import os
+import threading
 import sys
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from types import MappingProxyType
 import logging
+from cachetools import TTLCache
 
 # Add backend to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
 from backend.rag_system.climate_rag import ClimateRAGSystem
-from backend.api_handlers.climate_apis import ClimateAPIHandler
+from backend.api_handlers.climate_apis import get_shared_handler
 from backend.data_processors.impact_tracker import ImpactTracker
+from backend.cache.semantic_cache import SemanticCache
 from config import settings
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Number of chat messages kept in session state
+CHAT_HISTORY_LIMIT = 50
+
+# Canned prompts behind the AI assistant's quick-action buttons (label, prompt)
+QUICK_ACTIONS = (
+    ("💡 Energy Tips", "What are the most effective ways to reduce my home energy consumption?"),
+    ("🚗 Transport", "How can I make my transportation more sustainable?"),
+    ("🌱 Carbon Tips", "What actions have the biggest impact on reducing my carbon footprint?"),
+    ("☀️ Renewables", "Should I consider solar panels for my home?")
+)
+
+QUICK_QUESTIONS = (
+    ("💡 Energy saving tips", "What are the best energy saving tips for my home?"),
+    ("🚗 Transportation options", "What are sustainable transportation options in my area?"),
+    ("🌱 Carbon footprint", "How can I reduce my carbon footprint?")
+)
+
+# (label, prompt, widget key) with the button keys fixed at import
+QUICK_ACTION_BUTTONS = tuple((label, prompt, f"quick_action_{i}") for i, (label, prompt) in enumerate(QUICK_ACTIONS))
+QUICK_QUESTION_BUTTONS = tuple((label, prompt, f"quick_question_{i}") for i, (label, prompt) in enumerate(QUICK_QUESTIONS))
+
+# Static lookup tables, built once at import instead of on every rerun
+ACTION_SUBTYPES = MappingProxyType({
+    "energy_efficiency": ("led_bulb_replacement", "insulation_improvement", "smart_thermostat", "energy_efficient_appliance"),
+    "transportation": ("bike_commute_km", "public_transport_km", "electric_vehicle", "carpooling", "walking"),
+    "renewable_energy": ("solar_panel_kw", "wind_turbine_kw", "green_energy_plan"),
+    "food": ("vegetarian_meal", "local_food_kg", "food_waste_reduction_kg", "composting_kg"),
+    "water": ("low_flow_fixture", "rainwater_harvesting", "drought_resistant_landscaping"),
+    "waste": ("recycling_kg", "reusable_bag", "composting_kg", "electronic_recycling_kg")
+})
+
+ACTION_EXAMPLES = MappingProxyType({
+    "energy_efficiency": ("Replace 5 incandescent bulbs with LEDs", "Install programmable thermostat", "Add insulation to attic"),
+    "transportation": ("Bike to work (10 km)", "Take public transit instead of driving", "Carpool with colleagues"),
+    "renewable_energy": ("Install 5kW solar panel system", "Switch to renewable energy plan"),
+    "food": ("Eat vegetarian meal instead of meat", "Buy local produce", "Compost food scraps"),
+    "water": ("Install low-flow showerhead", "Set up rain barrel", "Plant drought-resistant garden"),
+    "waste": ("Recycle electronics", "Use reusable shopping bags", "Compost organic waste")
+})
+
+# Demo mode responses
+DEMO_RESPONSES = MappingProxyType({
+    "energy": "Here are some energy-saving tips: 1) Switch to LED bulbs, 2) Use programmable thermostats, 3) Unplug electronics when not in use, 4) Improve home insulation. These actions can reduce your energy consumption by 20-30%.",
+    "transport": "For sustainable transportation: 1) Walk or bike for short trips, 2) Use public transportation, 3) Consider electric or hybrid vehicles, 4) Carpool when possible. Transportation accounts for about 29% of greenhouse gas emissions.",
+    "carbon": "To reduce your carbon footprint: 1) Eat less meat, 2) Buy local and seasonal food, 3) Reduce air travel, 4) Use renewable energy, 5) Practice the 3 R's: Reduce, Reuse, Recycle.",
+    "default": "I'm here to help with climate action advice! In demo mode, I can provide general guidance on energy efficiency, sustainable transportation, carbon footprint reduction, and environmental best practices. What specific area would you like to explore?"
+})
+
+# Mock climate news data
+CLIMATE_NEWS = (
+    MappingProxyType({
+        "title": "Global Renewable Energy Capacity Hits Record High",
+        "summary": "Solar and wind installations reached 295 GW in 2024, marking a 73% increase from previous year.",
+        "impact": "Positive",
+        "source": "International Energy Agency"
+    }),
+    MappingProxyType({
+        "title": "Arctic Sea Ice Reaches Second-Lowest Extent on Record",
+        "summary": "September 2024 sea ice extent was 4.28 million km², highlighting accelerating Arctic warming.",
+        "impact": "Concerning",
+        "source": "National Snow and Ice Data Center"
+    }),
+    MappingProxyType({
+        "title": "Carbon Capture Technology Breakthrough",
+        "summary": "New direct air capture facility can remove 1 million tons CO2/year at $100/ton cost.",
+        "impact": "Positive",
+        "source": "Climate Technology Research"
+    })
+)
+
+AQI_LEVELS = MappingProxyType({1: "Good", 2: "Fair", 3: "Moderate", 4: "Poor", 5: "Very Poor"})
+AQI_COLORS = MappingProxyType({1: "green", 2: "lightgreen", 3: "yellow", 4: "orange", 5: "red"})
+
 # Page configuration
 st.set_page_config(
     page_title="ClimateIQ - AI Climate Action Platform",
@@ -59,23 +135,107 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+def _build_rag_system():
+    """Create the RAG system and load the sample knowledge base"""
+    rag_system = ClimateRAGSystem()
+    rag_system.initialize_with_sample_data()
+    # Batch-embed the canned prompts once so quick-action lookups never hit the model
+    rag_system.precompute_embeddings([prompt for _, prompt in QUICK_ACTIONS + QUICK_QUESTIONS])
+    return rag_system
+
+def _warm_up_rag(rag_system):
+    """Prime the embedding model and vector index so the first user query is not a cold start"""
+    for query in ("climate action", *(prompt for _, prompt in QUICK_ACTIONS + QUICK_QUESTIONS)):
+        rag_system.search_knowledge(query)
+
 @st.cache_resource
 def initialize_systems():
     """Initialize backend systems"""
     try:
-        rag_system = ClimateRAGSystem()
-        rag_system.initialize_with_sample_data()
+        # Construct the independent backend systems concurrently
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            rag_future = executor.submit(_build_rag_system)
+            api_future = executor.submit(get_shared_handler)
+            tracker_future = executor.submit(ImpactTracker)
+            rag_system, api_handler, impact_tracker = rag_future.result(), api_future.result(), tracker_future.result()
         
-        api_handler = ClimateAPIHandler()
-        impact_tracker = ImpactTracker()
+        threading.Thread(target=_warm_up_rag, args=(rag_system,), daemon=True).start()
         
         return rag_system, api_handler, impact_tracker
     except Exception as e:
+        logger.error("Error initializing systems: %s", e)
         st.error(f"Error initializing systems: {e}")
         st.error("Failed to initialize backend systems. Please check your configuration.")
         # Return mock objects for demonstration
         return None, None, None
 
+@st.cache_resource
+def get_response_cache(_rag_system):
+    """Shared semantic cache for RAG responses"""
+    return SemanticCache(
+        embed_fn=_rag_system.embed_query,
+        threshold=0.95,
+        ttl_seconds=3600,
+        max_entries=1000,
+        persist_dir=settings.RESPONSE_CACHE_DIR
+    )
+
+@st.cache_resource
+def get_exact_answer_cache():
+    """Process-wide exact-match tier for RAG answers, keyed by (prompt, profile scope); checked before any embedding"""
+    return TTLCache(maxsize=512, ttl=3600), threading.Lock()
+
+def _profile_scope(user_profile):
+    """Profile fields that change a RAG answer; cache entries are scoped to them to avoid cross-user mixups"""
+    return (
+        user_profile.get('location'),
+        user_profile.get('lifestyle'),
+        user_profile.get('household_size'),
+        user_profile.get('budget'),
+        tuple(user_profile.get('interests', []))
+    )
+
+def stream_rag_answer(rag_system, prompt, user_profile):
+    """Render a RAG answer, streaming tokens on a cache miss; returns (response, sources)"""
+    exact_key = (prompt, _profile_scope(user_profile))
+    exact_cache, exact_lock = get_exact_answer_cache()
+    with exact_lock:
+        cached = exact_cache.get(exact_key)
+    if cached is not None:
+        st.markdown(cached[0])
+        return cached
+    
+    # Filled in only on a cache miss; a cache hit was a complete answer when it was stored
+    outcome = {'streamed': False, 'completed': True}
+    
+    def generate():
+        tokens, sources = rag_system.retrieve_and_generate_stream(prompt, user_profile)
+        displayed = st.write_stream(iter(tokens))
+        outcome['streamed'] = True
+        outcome['completed'] = tokens.completed
+        # Cache the cleaned text, matching what the non-streaming path returns
+        return (tokens.text if tokens.completed else displayed), sources
+    
+    def should_store(result):
+        # Truncated streams and fallback text are shown but never cached; errors come back without sources
+        return outcome['completed'] and bool(result[1])
+    
+    response, sources = get_response_cache(rag_system).get_or_compute(
+        prompt,
+        _profile_scope(user_profile),
+        generate,
+        should_store=should_store
+    )
+    
+    if not outcome['streamed']:
+        st.markdown(response)
+    
+    if should_store((response, sources)):
+        with exact_lock:
+            exact_cache[exact_key] = (response, sources)
+    
+    return response, sources
+
 def main():
     """Main application function"""
     
@@ -100,30 +260,57 @@ def main():
     with st.sidebar:
         st.header("👤 Your Profile")
         
-        # User identification
-        user_id = st.text_input("User ID", value="demo_user", help="Enter a unique identifier")
-        
-        # Location and basic info
-        location = st.text_input("📍 Location", value="New York, NY", help="Enter your city, state/country")
-        lifestyle = st.selectbox("🏠 Lifestyle", ["Urban", "Suburban", "Rural"])
-        household_size = st.number_input("👥 Household Size", min_value=1, max_value=10, value=2)
-        
-        # Interests and goals
-        st.subheader("🎯 Climate Goals")
-        interests = st.multiselect(
-            "Areas of Interest",
-            ["Energy Efficiency", "Renewable Energy", "Transportation", "Food & Diet", "Waste Reduction", "Water Conservation"],
-            default=["Energy Efficiency", "Transportation"]
-        )
-        
-        budget = st.selectbox("💰 Budget for Climate Actions", ["Low ($0-500)", "Medium ($500-2000)", "High ($2000+)"])
+        # Profile widgets live in a form so edits only rerun the app once, on submit
+        with st.form("profile"):
+            # User identification
+            user_id = st.text_input("User ID", value="demo_user", help="Enter a unique identifier")
+            
+            # Location and basic info
+            location = st.text_input("📍 Location", value="New York, NY", help="Enter your city, state/country")
+            lifestyle = st.selectbox("🏠 Lifestyle", ["Urban", "Suburban", "Rural"])
+            household_size = st.number_input("👥 Household Size", min_value=1, max_value=10, value=2)
+            
+            # Interests and goals
+            st.subheader("🎯 Climate Goals")
+            interests = st.multiselect(
+                "Areas of Interest",
+                ["Energy Efficiency", "Renewable Energy", "Transportation", "Food & Diet", "Waste Reduction", "Water Conservation"],
+                default=["Energy Efficiency", "Transportation"]
+            )
+            
+            budget = st.selectbox("💰 Budget for Climate Actions", ["Low ($0-500)", "Medium ($500-2000)", "High ($2000+)"])
+            
+            # Current actions
+            current_actions = st.text_area("Current Climate Actions", 
+                                         placeholder="Describe any climate actions you're already taking...")
+            
+            st.form_submit_button("💾 Update Profile")
         
-        # Current actions
-        current_actions = st.text_area("Current Climate Actions", 
-                                     placeholder="Describe any climate actions you're already taking...")
+        if st.button("🧹 Clear cache", help="Discard cached AI responses for your current profile"):
+            # Scoped to this profile: the caches are shared by every session in the process (and on disk)
+            scope = _profile_scope({
+                'location': location,
+                'lifestyle': lifestyle,
+                'household_size': household_size,
+                'budget': budget,
+                'interests': interests
+            })
+            exact_cache, exact_lock = get_exact_answer_cache()
+            with exact_lock:
+                for key in [key for key in exact_cache if key[1] == scope]:
+                    del exact_cache[key]
+            if rag_system:
+                get_response_cache(rag_system).clear_scope(scope)
     
     # Main content tabs
-    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(["🎯 Action Plan", "📊 Impact Tracker", "🌤️ Local Data", "💬 AI Assistant", "🏆 Community", "🌍 Global Dashboard"])
+    # Radio-based tab selector: unlike st.tabs, only the selected view is rendered on each rerun
+    selected_tab = st.radio(
+        "View",
+        ["🎯 Action Plan", "📊 Impact Tracker", "🌤️ Local Data", "💬 AI Assistant", "🏆 Community", "🌍 Global Dashboard"],
+        horizontal=True,
+        label_visibility="collapsed",
+        key="selected_tab"
+    )
     
     # User profile dictionary
     user_profile = {
@@ -136,24 +323,25 @@ def main():
         'current_actions': current_actions
     }
     
-    with tab1:
+    if selected_tab == "🎯 Action Plan":
         display_action_plan(rag_system, user_profile, demo_mode)
     
-    with tab2:
+    elif selected_tab == "📊 Impact Tracker":
         display_impact_tracker(impact_tracker, user_id, demo_mode)
     
-    with tab3:
+    elif selected_tab == "🌤️ Local Data":
         display_local_data(api_handler, location, demo_mode)
     
-    with tab4:
+    elif selected_tab == "💬 AI Assistant":
         display_ai_assistant(rag_system, user_profile, demo_mode)
     
-    with tab5:
+    elif selected_tab == "🏆 Community":
         display_community(impact_tracker, demo_mode)
     
-    with tab6:
+    elif selected_tab == "🌍 Global Dashboard":
         display_global_dashboard(api_handler, demo_mode)
 
+@st.fragment
 def display_action_plan(rag_system, user_profile, demo_mode=False):
     """Display personalized action plan"""
     st.header("🎯 Your Personalized Climate Action Plan")
@@ -199,22 +387,27 @@ def display_action_plan(rag_system, user_profile, demo_mode=False):
                         # Generate personalized plan using RAG system
                         query = f"Create a personalized climate action plan for someone in {user_profile['location']} with {user_profile['lifestyle']} lifestyle, household of {user_profile['household_size']}, interested in {', '.join(user_profile['interests'])}, with {user_profile['budget']} budget."
                         
-                        response, sources = rag_system.retrieve_and_generate(query, user_profile)
+                        # Display the plan as it streams in
+                        st.markdown("### 📋 Recommended Actions")
+                        response, sources = stream_rag_answer(rag_system, query, user_profile)
                         
                         st.success("✅ Your personalized action plan is ready!")
                         
-                        # Display the plan
-                        st.markdown("### 📋 Recommended Actions")
-                        st.markdown(response)
-                        
                         # Display sources
                         if sources:
                             with st.expander("📚 Supporting Information Sources"):
-                                for i, source in enumerate(sources[:3]):
-                                    st.write(f"**Source {i+1}:** {source['metadata'].get('title', 'Climate Data')}")
-                                    st.write(f"*Category:* {source['metadata'].get('category', 'General')}")
-                                    st.write(f"*Relevance:* {source['similarity']:.2%}")
-                                    st.write("---")
+                                # One markdown block instead of four writes per source; every preview
+                                # line is quoted so a newline in the text cannot end the blockquote
+                                st.markdown("\n\n---\n\n".join(
+                                    f"**Source {i+1}:** {source['metadata'].get('title', 'Climate Data')}\n\n"
+                                    f"*Category:* {source['metadata'].get('category', 'General')}\n\n"
+                                    f"*Relevance:* {source['similarity']:.2%}\n\n"
+                                    + "\n".join(
+                                        f"> {line}"
+                                        for line in (source['metadata'].get('preview') or source['content'][:300] + '...').splitlines()
+                                    )
+                                    for i, source in enumerate(sources[:3])
+                                ))
                 
                     except Exception as e:
                         st.error(f"Error generating action plan: {e}")
@@ -227,6 +420,7 @@ def display_action_plan(rag_system, user_profile, demo_mode=False):
         for interest in user_profile['interests']:
             st.markdown(f"• {interest}")
 
+@st.fragment
 def display_impact_tracker(impact_tracker, user_id, demo_mode=False):
     """Display impact tracking dashboard"""
     st.header("📊 Your Environmental Impact")
@@ -305,7 +499,7 @@ def display_impact_tracker(impact_tracker, user_id, demo_mode=False):
                 
                 record = impact_tracker.track_action(user_id, action_data)
                 st.success(f"✅ Action logged! Estimated impact: {record.carbon_saved_kg:.2f} kg CO2 saved")
-                st.rerun()
+                st.rerun(scope="fragment")
                 
             except Exception as e:
                 st.error(f"Error logging action: {e}")
@@ -339,6 +533,7 @@ def display_impact_tracker(impact_tracker, user_id, demo_mode=False):
             st.info(f"⛽ **Gasoline Saved:** {equivalents.get('gasoline_not_used_liters', 0)} liters")
             st.info(f"🔥 **Coal Not Burned:** {equivalents.get('coal_not_burned_kg', 0)} kg")
 
+@st.fragment
 def display_local_data(api_handler, location, demo_mode=False):
     """Display local climate and environmental data"""
     st.header("🌤️ Local Climate Data")
@@ -379,11 +574,8 @@ def display_local_data(api_handler, location, demo_mode=False):
                     air_quality = api_handler.get_air_quality(lat, lon)
                     
                     if 'error' not in air_quality:
-                        aqi_levels = {1: "Good", 2: "Fair", 3: "Moderate", 4: "Poor", 5: "Very Poor"}
-                        aqi_colors = {1: "green", 2: "lightgreen", 3: "yellow", 4: "orange", 5: "red"}
-                        
                         aqi = air_quality['aqi']
-                        st.markdown(f"**Air Quality:** <span style='color: {aqi_colors[aqi]}'>{aqi_levels[aqi]} (AQI: {aqi})</span>", 
+                        st.markdown(f"**Air Quality:** <span style='color: {AQI_COLORS[aqi]}'>{AQI_LEVELS[aqi]} (AQI: {aqi})</span>", 
                                   unsafe_allow_html=True)
                 else:
                     st.error(f"Error fetching weather data: {weather_data['error']}")
@@ -446,10 +638,18 @@ def display_local_data(api_handler, location, demo_mode=False):
             else:
                 st.error(f"Error calculating emissions: {result['error']}")
 
+@st.fragment
 def display_ai_assistant(rag_system, user_profile, demo_mode=False):
     """Display enhanced AI assistant chat interface with advanced features"""
     st.header("💬 AI Climate Assistant")
     
+    # Initialize chat history (bounded so long conversations don't slow down every rerun)
+    if "messages" not in st.session_state:
+        st.session_state.messages = deque(
+            [{"role": "assistant", "content": "Hello! I'm your AI climate assistant. How can I help you take action against climate change today?"}],
+            maxlen=CHAT_HISTORY_LIMIT
+        )
+    
     # Feature selector
     col1, col2 = st.columns([3, 1])
     with col1:
@@ -667,37 +867,11 @@ def display_ai_assistant(rag_system, user_profile, demo_mode=False):
         
         # Quick action buttons for common queries
         st.markdown("**🚀 Quick Actions:**")
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            if st.button("💡 Energy Tips"):
-                quick_prompt = "What are the most effective ways to reduce my home energy consumption?"
-                st.session_state.messages.append({"role": "user", "content": quick_prompt})
-                st.rerun()
-        
-        with col2:
-            if st.button("🚗 Transport"):
-                quick_prompt = "How can I make my transportation more sustainable?"
-                st.session_state.messages.append({"role": "user", "content": quick_prompt})
-                st.rerun()
-        
-        with col3:
-            if st.button("🌱 Carbon Tips"):
-                quick_prompt = "What actions have the biggest impact on reducing my carbon footprint?"
-                st.session_state.messages.append({"role": "user", "content": quick_prompt})
-                st.rerun()
-        
-        with col4:
-            if st.button("☀️ Renewables"):
-                quick_prompt = "Should I consider solar panels for my home?"
-                st.session_state.messages.append({"role": "user", "content": quick_prompt})
-                st.rerun()
-    
-    # Initialize chat history
-    if "messages" not in st.session_state:
-        st.session_state.messages = [
-            {"role": "assistant", "content": "Hello! I'm your AI climate assistant. How can I help you take action against climate change today?"}
-        ]
+        for col, (label, quick_prompt, key) in zip(st.columns(len(QUICK_ACTION_BUTTONS)), QUICK_ACTION_BUTTONS):
+            with col:
+                if st.button(label, key=key):
+                    st.session_state.messages.append({"role": "user", "content": quick_prompt})
+                    st.rerun(scope="fragment")
     
     # Display chat messages
     for message in st.session_state.messages:
@@ -715,67 +889,71 @@ def display_ai_assistant(rag_system, user_profile, demo_mode=False):
         
         # Generate assistant response
         with st.chat_message("assistant"):
-            with st.spinner("Thinking..."):
-                if demo_mode or not rag_system:
-                    # Demo mode responses
-                    demo_responses = {
-                        "energy": "Here are some energy-saving tips: 1) Switch to LED bulbs, 2) Use programmable thermostats, 3) Unplug electronics when not in use, 4) Improve home insulation. These actions can reduce your energy consumption by 20-30%.",
-                        "transport": "For sustainable transportation: 1) Walk or bike for short trips, 2) Use public transportation, 3) Consider electric or hybrid vehicles, 4) Carpool when possible. Transportation accounts for about 29% of greenhouse gas emissions.",
-                        "carbon": "To reduce your carbon footprint: 1) Eat less meat, 2) Buy local and seasonal food, 3) Reduce air travel, 4) Use renewable energy, 5) Practice the 3 R's: Reduce, Reuse, Recycle.",
-                        "default": "I'm here to help with climate action advice! In demo mode, I can provide general guidance on energy efficiency, sustainable transportation, carbon footprint reduction, and environmental best practices. What specific area would you like to explore?"
-                    }
-                    
+            if demo_mode or not rag_system:
+                with st.spinner("Thinking..."):
                     # Simple keyword matching for demo
-                    response = demo_responses["default"]
+                    response = DEMO_RESPONSES["default"]
                     prompt_lower = prompt.lower()
                     if any(word in prompt_lower for word in ["energy", "electricity", "power", "heating", "cooling"]):
-                        response = demo_responses["energy"]
+                        response = DEMO_RESPONSES["energy"]
                     elif any(word in prompt_lower for word in ["transport", "car", "travel", "commute", "bike", "walk"]):
-                        response = demo_responses["transport"]
+                        response = DEMO_RESPONSES["transport"]
                     elif any(word in prompt_lower for word in ["carbon", "footprint", "emissions", "reduce", "impact"]):
-                        response = demo_responses["carbon"]
+                        response = DEMO_RESPONSES["carbon"]
                     
                     st.markdown(response)
                     st.info("💡 This is a demo response. Full AI capabilities require proper API configuration.")
                     st.session_state.messages.append({"role": "assistant", "content": response})
-                else:
-                    try:
-                        response, sources = rag_system.retrieve_and_generate(prompt, user_profile)
-                        st.markdown(response)
+            else:
+                try:
+                    response, sources = stream_rag_answer(rag_system, prompt, user_profile)
                         
-                        # Show sources if available
-                        if sources:
-                            with st.expander("📚 Sources"):
-                                for source in sources[:2]:
-                                    st.write(f"• {source['metadata'].get('title', 'Climate Data')} (Relevance: {source['similarity']:.1%})")
+                    # Show sources if available
+                    if sources:
+                        with st.expander("📚 Sources"):
+                            st.markdown("\n".join(
+                                f"- {source['metadata'].get('title', 'Climate Data')} (Relevance: {source['similarity']:.1%})"
+                                for source in sources[:2]
+                            ))
                         
-                        # Add assistant response to chat history
-                        st.session_state.messages.append({"role": "assistant", "content": response})
+                    # Add assistant response to chat history
+                    st.session_state.messages.append({"role": "assistant", "content": response})
                         
-                    except Exception as e:
-                        error_msg = f"I apologize, but I encountered an error: {str(e)}"
-                        st.error(error_msg)
-                        st.session_state.messages.append({"role": "assistant", "content": error_msg})
+                except Exception as e:
+                    error_msg = f"I apologize, but I encountered an error: {str(e)}"
+                    st.error(error_msg)
+                    st.session_state.messages.append({"role": "assistant", "content": error_msg})
     
     # Quick action buttons
     st.markdown("### 🚀 Quick Questions")
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        if st.button("💡 Energy saving tips"):
-            st.session_state.messages.append({"role": "user", "content": "What are the best energy saving tips for my home?"})
-            st.rerun()
+    for col, (label, quick_prompt, key) in zip(st.columns(len(QUICK_QUESTION_BUTTONS)), QUICK_QUESTION_BUTTONS):
+        with col:
+            if st.button(label, key=key):
+                st.session_state.messages.append({"role": "user", "content": quick_prompt})
+                st.rerun(scope="fragment")
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _build_leaderboard_fig(top_rows, metric):
+    """Build the top-5 leaderboard chart; top_rows is a hashable tuple of (user_id, value)"""
+    import plotly.graph_objects as go
     
-    with col2:
-        if st.button("🚗 Transportation options"):
-            st.session_state.messages.append({"role": "user", "content": "What are sustainable transportation options in my area?"})
-            st.rerun()
+    user_ids = [user_id for user_id, _ in top_rows]
+    values = [value for _, value in top_rows]
     
-    with col3:
-        if st.button("🌱 Carbon footprint"):
-            st.session_state.messages.append({"role": "user", "content": "How can I reduce my carbon footprint?"})
-            st.rerun()
+    fig = go.Figure(go.Bar(
+        x=user_ids,
+        y=values,
+        marker=dict(color=values, colorscale="Greens", showscale=True)
+    ))
+    fig.update_layout(
+        title=f"Top 5 Users by {metric.replace('_', ' ').title()}",
+        xaxis_title="User",
+        yaxis_title=metric.replace('_', ' ').title(),
+        showlegend=False
+    )
+    return fig
 
+@st.fragment
 def display_community(impact_tracker, demo_mode=False):
     """Display community features and leaderboard"""
     st.header("🏆 Community Impact")
@@ -790,6 +968,8 @@ def display_community(impact_tracker, demo_mode=False):
         leaderboard = impact_tracker.get_leaderboard(metric=metric_choice, limit=10)
         
         if leaderboard:
+            import pandas as pd
+            
             # Create leaderboard dataframe
             df = pd.DataFrame(leaderboard)
             
@@ -806,16 +986,8 @@ def display_community(impact_tracker, demo_mode=False):
             
             # Create visualization
             if len(df) > 0:
-                fig = px.bar(
-                    df.head(5), 
-                    x='user_id', 
-                    y=metric_choice,
-                    title=f"Top 5 Users by {metric_choice.replace('_', ' ').title()}",
-                    color=metric_choice,
-                    color_continuous_scale="Greens"
-                )
-                fig.update_layout(showlegend=False)
-                st.plotly_chart(fig, use_container_width=True)
+                top_rows = tuple((row['user_id'], row[metric_choice]) for row in leaderboard[:5])
+                st.plotly_chart(_build_leaderboard_fig(top_rows, metric_choice), use_container_width=True)
         else:
             st.info("No community data available yet. Start logging your climate actions to appear on the leaderboard!")
     
@@ -836,28 +1008,13 @@ def display_community(impact_tracker, demo_mode=False):
 
 def get_action_subtypes(action_type):
     """Get subtypes for action categories"""
-    subtypes = {
-        "energy_efficiency": ["led_bulb_replacement", "insulation_improvement", "smart_thermostat", "energy_efficient_appliance"],
-        "transportation": ["bike_commute_km", "public_transport_km", "electric_vehicle", "carpooling", "walking"],
-        "renewable_energy": ["solar_panel_kw", "wind_turbine_kw", "green_energy_plan"],
-        "food": ["vegetarian_meal", "local_food_kg", "food_waste_reduction_kg", "composting_kg"],
-        "water": ["low_flow_fixture", "rainwater_harvesting", "drought_resistant_landscaping"],
-        "waste": ["recycling_kg", "reusable_bag", "composting_kg", "electronic_recycling_kg"]
-    }
-    return subtypes.get(action_type, ["general"])
+    return ACTION_SUBTYPES.get(action_type, ("general",))
 
 def get_action_examples(action_type):
     """Get example actions for categories"""
-    examples = {
-        "energy_efficiency": ["Replace 5 incandescent bulbs with LEDs", "Install programmable thermostat", "Add insulation to attic"],
-        "transportation": ["Bike to work (10 km)", "Take public transit instead of driving", "Carpool with colleagues"],
-        "renewable_energy": ["Install 5kW solar panel system", "Switch to renewable energy plan"],
-        "food": ["Eat vegetarian meal instead of meat", "Buy local produce", "Compost food scraps"],
-        "water": ["Install low-flow showerhead", "Set up rain barrel", "Plant drought-resistant garden"],
-        "waste": ["Recycle electronics", "Use reusable shopping bags", "Compost organic waste"]
-    }
-    return examples.get(action_type, ["Log any climate-positive action"])
+    return ACTION_EXAMPLES.get(action_type, ("Log any climate-positive action",))
 
+@st.fragment
 def display_global_dashboard(api_handler, demo_mode=False):
     """Display impressive global climate dashboard with real-time data and visualizations"""
     st.header("🌍 Global Climate Intelligence Dashboard")
@@ -942,9 +1099,9 @@ def display_global_dashboard(api_handler, demo_mode=False):
         st.subheader("📈 Climate Trends")
         
         # Historical and projected temperature data
-        years = list(range(1980, 2051))
-        historical_temp = [14.0 + 0.02 * (year - 1980) + np.random.normal(0, 0.1) for year in range(1980, 2025)]
-        projected_temp = [historical_temp[-1] + 0.03 * (year - 2024) for year in range(2025, 2051)]
+        years = np.arange(1980, 2051)
+        historical_temp = 14.0 + 0.02 * (years[:45] - 1980) + np.random.normal(0, 0.1, 45)
+        projected_temp = historical_temp[-1] + 0.03 * (years[44:] - 2024)
         
         fig_trends = go.Figure()
         
@@ -1044,29 +1201,7 @@ def display_global_dashboard(api_handler, demo_mode=False):
     # Real-time climate news and insights
     st.subheader("📰 Latest Climate Intelligence")
     
-    # Mock climate news data
-    news_items = [
-        {
-            "title": "Global Renewable Energy Capacity Hits Record High",
-            "summary": "Solar and wind installations reached 295 GW in 2024, marking a 73% increase from previous year.",
-            "impact": "Positive",
-            "source": "International Energy Agency"
-        },
-        {
-            "title": "Arctic Sea Ice Reaches Second-Lowest Extent on Record",
-            "summary": "September 2024 sea ice extent was 4.28 million km², highlighting accelerating Arctic warming.",
-            "impact": "Concerning",
-            "source": "National Snow and Ice Data Center"
-        },
-        {
-            "title": "Carbon Capture Technology Breakthrough",
-            "summary": "New direct air capture facility can remove 1 million tons CO2/year at $100/ton cost.",
-            "impact": "Positive",
-            "source": "Climate Technology Research"
-        }
-    ]
-    
-    for item in news_items:
+    for item in CLIMATE_NEWS:
         impact_color = "green" if item["impact"] == "Positive" else "orange"
         st.markdown(f"""
         <div style="border-left: 4px solid {impact_color}; padding-left: 10px; margin: 10px 0;">
@@ -29,7 +29,7 @@ def check_dependencies():
         logger.info("✅ All dependencies are installed")
         return True
     except ImportError as e:
-        logger.error(f"❌ Missing dependency: {e}")
+        logger.error("❌ Missing dependency: %s", e)
         return False
 
 def install_dependencies():
@@ -40,7 +40,7 @@ def install_dependencies():
         logger.info("✅ Dependencies installed successfully")
         return True
     except subprocess.CalledProcessError as e:
-        logger.error(f"❌ Failed to install dependencies: {e}")
+        logger.error("❌ Failed to install dependencies: %s", e)
         return False
 
 def setup_directories():
@@ -53,7 +53,7 @@ def setup_directories():
     
     for directory in directories:
         Path(directory).mkdir(parents=True, exist_ok=True)
-        logger.info(f"📁 Created directory: {directory}")
+        logger.info("📁 Created directory: %s", directory)
 
 def check_environment():
     """Check environment variables"""
@@ -69,7 +69,7 @@ def check_environment():
             missing_vars.append(var)
     
     if missing_vars:
-        logger.warning(f"⚠️  Missing environment variables: {missing_vars}")
+        logger.warning("⚠️  Missing environment variables: %s", missing_vars)
         logger.info("💡 Make sure your .env file is properly configured")
     else:
         logger.info("✅ Environment variables are configured")
@@ -84,7 +84,7 @@ def run_streamlit_app():
     app_path = "frontend/dashboard/main_app.py"
     
     if not os.path.exists(app_path):
-        logger.error(f"❌ Application file not found: {app_path}")
+        logger.error("❌ Application file not found: %s", app_path)
         return False
     
     try:
@@ -108,7 +108,7 @@ def run_streamlit_app():
     except KeyboardInterrupt:
         logger.info("👋 Application stopped by user")
     except Exception as e:
-        logger.error(f"❌ Error running application: {e}")
+        logger.error("❌ Error running application: %s", e)
         return False
     
     return True
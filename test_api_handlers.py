@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Offline tests for ClimateAPIHandler caching and local computation (no upstream requests are made)
+"""
+import sys
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append('.')
+
+import pytest
+from backend.api_handlers import climate_apis
+from backend.api_handlers.climate_apis import ClimateAPIHandler, get_shared_handler
+
+class CountingFetch:
+    """Replacement for a _fetch_* method that records its calls and replays scripted responses"""
+    
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+    
+    def __call__(self, *args):
+        self.calls.append(args)
+        return self.responses.pop(0) if len(self.responses) > 1 else self.responses[0]
+
+PARIS = {'location': 'Paris', 'country': 'FR', 'lat': 48.8566, 'lon': 2.3522}
+SUNNY_NASA = {'solar_irradiance': {'20240101': 5.5, '20240102': 6.5}, 'wind_speed': {'20240101': 2.0, '20240102': 4.0}}
+
+class StreamedResponse:
+    """Minimal streamed requests.Response: headers, iter_content and context management"""
+    
+    def __init__(self, body, content_length=None):
+        self.body = body
+        self.headers = {} if content_length is None else {'Content-Length': str(content_length)}
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        return False
+    
+    def raise_for_status(self):
+        pass
+    
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start:start + chunk_size]
+
+def no_request(*args, **kwargs):
+    raise AssertionError("no upstream request expected")
+
+@pytest.fixture
+def handler():
+    return ClimateAPIHandler()
+
+def test_responses_are_cached_per_key(handler):
+    """A repeated lookup is served from the endpoint's TTL cache"""
+    handler._fetch_weather_data = CountingFetch({'location': 'Paris', 'temperature': 18})
+    
+    assert handler.get_weather_data("Paris")['temperature'] == 18
+    assert handler.get_weather_data("Paris")['temperature'] == 18
+    handler.get_weather_data("Lyon")
+    assert handler._fetch_weather_data.calls == [("Paris",), ("Lyon",)]
+
+def test_coordinates_share_a_cache_entry_after_rounding(handler):
+    """Coordinates that agree to three decimals hit the same air quality entry"""
+    handler._fetch_air_quality = CountingFetch({'aqi': 2})
+    
+    handler.get_air_quality(48.85661, 2.35222)
+    handler.get_air_quality(48.85658, 2.35218)
+    assert len(handler._fetch_air_quality.calls) == 1
+
+def test_error_responses_are_not_cached(handler):
+    """A failed fetch is retried on the next lookup instead of being replayed from the cache"""
+    handler._fetch_weather_data = CountingFetch({'error': 'timeout'}, {'location': 'Paris', 'temperature': 18})
+    
+    assert 'error' in handler.get_weather_data("Paris")
+    assert handler.get_weather_data("Paris")['temperature'] == 18
+    assert handler.get_weather_data("Paris")['temperature'] == 18
+    assert len(handler._fetch_weather_data.calls) == 2
+
+def test_shared_handler_is_one_instance_per_process():
+    """Concurrent first calls still construct a single shared handler"""
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        handlers = set(map(id, executor.map(lambda _: get_shared_handler(), range(16))))
+    assert handlers == {id(get_shared_handler())}
+
+def test_nasa_power_mean_skips_fill_values(handler):
+    """Missing days (-999) are left out of the average, and an all-missing series averages to zero"""
+    assert handler._mean_power_value({'20240101': 4.0, '20240102': -999.0, '20240103': 6.0}) == pytest.approx(5.0)
+    assert handler._mean_power_value({'20240101': -999.0}) == 0.0
+    assert handler._mean_power_value({}) == 0.0
+
+def test_renewable_potential_geocodes_without_weather(handler):
+    """Renewable potential resolves coordinates through the geocoder and classifies the NASA averages"""
+    handler._fetch_weather_data = no_request
+    handler._fetch_location_coordinates = CountingFetch(PARIS)
+    handler._fetch_nasa_power_data = CountingFetch(SUNNY_NASA)
+    
+    potential = handler.get_renewable_energy_potential("Paris")
+    assert potential['solar_potential'] == "High"
+    assert potential['wind_potential'] == "Low"
+    assert potential['avg_solar_irradiance'] == 6.0
+    
+    handler.get_renewable_energy_potential("Paris")
+    assert len(handler._fetch_location_coordinates.calls) == 1
+    assert handler._fetch_nasa_power_data.calls[0][:2] == (PARIS['lat'], PARIS['lon'])
+
+def test_bounded_reader_rejects_large_bodies(handler, monkeypatch):
+    """Bodies over MAX_RESPONSE_BYTES are refused, by Content-Length or by bytes actually read"""
+    monkeypatch.setattr(climate_apis, 'MAX_RESPONSE_BYTES', 100)
+    assert handler._read_bounded_json(StreamedResponse(b'{"ok": true}', content_length=12)) == {'ok': True}
+    
+    with pytest.raises(ValueError):
+        handler._read_bounded_json(StreamedResponse(b'{}', content_length=1000))
+    with pytest.raises(ValueError):
+        handler._read_bounded_json(StreamedResponse(b'[' + b'1,' * 100 + b'1]'))
+
+def test_nasa_date_range_is_checked_before_requesting(handler):
+    """Reversed or decade-plus NASA POWER ranges come back as errors without a request"""
+    handler.session.get = no_request
+    assert 'error' in handler._fetch_nasa_power_data(48.8, 2.3, '20240201', '20240101')
+    assert 'error' in handler._fetch_nasa_power_data(48.8, 2.3, '20000101', '20240101')
+
+def world_bank_row(indicator, year, value):
+    return {'indicator': {'id': indicator, 'value': indicator}, 'country': {'value': 'France'}, 'date': year, 'value': value}
+
+def test_climate_indicators_come_from_one_request(handler):
+    """All indicators are fetched in one multi-indicator call and split back into per-indicator series"""
+    requested = []
+    body = json.dumps([
+        {'page': 1},
+        [world_bank_row('EN.ATM.CO2E.PC', '2020', 4.2), world_bank_row('EG.FEC.RNEW.ZS', '2020', 17.0),
+         world_bank_row('EN.ATM.CO2E.PC', '2021', None)]
+    ]).encode()
+    handler.session.get = lambda url, **kwargs: requested.append(url) or StreamedResponse(body)
+    
+    result = handler.get_climate_indicators('FR', ['EN.ATM.CO2E.PC', 'EG.FEC.RNEW.ZS', 'AG.LND.FRST.ZS'])
+    assert len(requested) == 1
+    assert requested[0].endswith('/country/FR/indicator/EN.ATM.CO2E.PC;EG.FEC.RNEW.ZS;AG.LND.FRST.ZS')
+    assert result['indicators']['EN.ATM.CO2E.PC']['data'] == [{'year': '2020', 'value': 4.2}]
+    assert result['indicators']['EG.FEC.RNEW.ZS']['country'] == 'France'
+    assert 'error' in result['indicators']['AG.LND.FRST.ZS']
+
+def test_carbon_payloads(handler):
+    """Each supported activity type gets its Carbon Interface payload; others are rejected"""
+    assert handler._prepare_carbon_payload('electricity', {'kwh': 120, 'country': 'fr'}) == {
+        'type': 'electricity', 'electricity_unit': 'kwh', 'electricity_value': 120, 'country': 'fr'
+    }
+    assert handler._prepare_carbon_payload('vehicle', {'distance': 42})['distance_value'] == 42
+    assert handler._prepare_carbon_payload('flight', {'passengers': 2})['passengers'] == 2
+    with pytest.raises(ValueError):
+        handler._prepare_carbon_payload('shipping', {})
+
+def test_electricity_estimate_is_local(handler):
+    """Electricity in a country with a known grid factor is estimated without calling Carbon Interface"""
+    handler.use_local_carbon = True
+    handler.session.post = no_request
+    
+    estimate = handler.calculate_carbon_footprint('electricity', {'kwh': 100, 'country': 'FR'})
+    assert estimate['source'] == 'local_factors'
+    assert estimate['carbon_kg'] == pytest.approx(100 * climate_apis.GRID_CARBON_INTENSITY['fr'])
+    assert estimate['carbon_lb'] == pytest.approx(estimate['carbon_kg'] * climate_apis.KG_TO_LB, abs=0.01)
+
+def test_world_bank_series_parser(handler):
+    """Rows become (year, value) points in response order, without the null years"""
+    rows = [world_bank_row('EN.ATM.CO2E.PC', year, value) for year, value in (('2022', 4.0), ('2021', None), ('2020', 4.4))]
+    series = handler._parse_world_bank_series([{'page': 1}, rows])
+    assert series['data'] == [{'year': '2022', 'value': 4.0}, {'year': '2020', 'value': 4.4}]
+    assert 'error' in handler._parse_world_bank_series([{'page': 1}, None])
+
+def test_concurrent_misses_share_one_fetch(handler):
+    """Callers that miss on the same key while a fetch is running wait for it instead of fetching again"""
+    started, release = threading.Event(), threading.Event()
+    calls = []
+    
+    def slow_fetch(city):
+        calls.append(city)
+        started.set()
+        release.wait(5)
+        return {'location': city, 'temperature': 18}
+    
+    handler._fetch_weather_data = slow_fetch
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        leader = executor.submit(handler.get_weather_data, "Paris")
+        started.wait(5)
+        waiters = [executor.submit(handler.get_weather_data, "Paris") for _ in range(3)]
+        release.set()
+        results = [leader.result()] + [waiter.result() for waiter in waiters]
+    
+    assert calls == ["Paris"]
+    assert all(result is results[0] for result in results)
+
+def test_coalesced_fetch_failure_reaches_every_waiter(handler):
+    """An exception raised by the shared fetch propagates to the waiting callers and is not cached"""
+    started, release = threading.Event(), threading.Event()
+    
+    def failing_fetch(city):
+        started.set()
+        release.wait(5)
+        raise RuntimeError("upstream down")
+    
+    handler._fetch_weather_data = failing_fetch
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        leader = executor.submit(handler.get_weather_data, "Paris")
+        started.wait(5)
+        waiters = [executor.submit(handler.get_weather_data, "Paris") for _ in range(2)]
+        release.set()
+        for future in [leader] + waiters:
+            with pytest.raises(RuntimeError):
+                future.result()
+    
+    assert not handler._inflight
+
+def test_last_good_response_is_served_when_upstream_fails(handler):
+    """After the TTL entry expires, a failed refetch falls back to the previous good response marked stale"""
+    handler._fetch_weather_data = CountingFetch({'location': 'Paris', 'temperature': 18}, {'error': 'timeout'})
+    handler.get_weather_data("Paris")
+    handler._weather_cache.clear()
+    
+    stale = handler.get_weather_data("Paris")
+    assert stale['temperature'] == 18 and stale['stale'] is True
+    assert 'error' in handler.get_weather_data("Lyon")
+
+def test_renewable_potential_batch_classifies_each_location(handler):
+    """The batch lookup classifies each location on its own and passes errors through in place"""
+    cities = {'Paris': PARIS, 'Nowhere': {'error': 'not found'}, 'Oslo': {**PARIS, 'location': 'Oslo', 'lat': 59.9}}
+    handler._fetch_location_coordinates = lambda location: cities[location]
+    handler._fetch_nasa_power_data = lambda lat, lon, start, end: (
+        SUNNY_NASA if lat == PARIS['lat'] else {'solar_irradiance': {'20240101': 1.5}, 'wind_speed': {'20240101': 7.0}}
+    )
+    
+    paris, nowhere, oslo = handler.get_renewable_energy_potential_batch(['Paris', 'Nowhere', 'Oslo'])
+    assert (paris['solar_potential'], paris['wind_potential']) == ("High", "Low")
+    assert 'error' in nowhere
+    assert (oslo['solar_potential'], oslo['wind_potential']) == ("Low", "High")
+    assert handler.get_renewable_energy_potential_batch([]) == []
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
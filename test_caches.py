@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Tests for the response and search caches, including what must never be cached
+"""
+import sys
+import zlib
+sys.path.append('.')
+
+import numpy as np
+import pytest
+from backend.cache.embedding_cache import EmbeddingCache
+from backend.cache.semantic_cache import SemanticCache
+from backend.watsonx_integration.response_stream import ResponseStream, INTERRUPTED_NOTICE
+
+# Paraphrases embed next to the question they rephrase, like they would with the sentence encoder
+PARAPHRASES = {"how can I save energy at home?": "how do I save energy at home?"}
+
+def embed(text):
+    """Deterministic stand-in for the sentence encoder: one random direction per distinct question"""
+    base = PARAPHRASES.get(text, text)
+    vector = np.random.default_rng(zlib.crc32(base.encode('utf-8'))).standard_normal(32)
+    if base != text:
+        vector += np.random.default_rng(0).standard_normal(32) * 0.01
+    return vector
+
+def failing_chunks(chunks):
+    """Model stream that dies after yielding the given chunks"""
+    yield from chunks
+    raise ConnectionError("stream reset")
+
+def test_semantic_cache_round_trip():
+    """Stored values come back for the same query and scope only"""
+    cache = SemanticCache(embed_fn=embed)
+    cache.put("how do I save energy at home?", "answer", scope="us")
+    
+    assert cache.get("how do I save energy at home?", scope="us") == "answer"
+    assert cache.get("how do I save energy at home?", scope="uk") is None
+    assert cache.get("what is a heat pump?", scope="us") is None
+
+def test_semantic_cache_hits_paraphrases():
+    """A near-duplicate question reuses the cached value without computing it again"""
+    cache = SemanticCache(embed_fn=embed)
+    computed = []
+    
+    def compute():
+        computed.append(1)
+        return "answer"
+    
+    assert cache.get_or_compute("how do I save energy at home?", "us", compute) == "answer"
+    assert cache.get_or_compute("how can I save energy at home?", "us", compute) == "answer"
+    assert len(computed) == 1
+    assert cache.stats()['hits'] == 1
+
+def test_semantic_cache_exact_hit_skips_embedding():
+    """Repeating a question verbatim is answered from the exact tier without embedding it"""
+    embedded = []
+    cache = SemanticCache(embed_fn=lambda text: embedded.append(text) or embed(text))
+    cache.get_or_compute("what is a heat pump?", "us", lambda: "answer")
+    
+    assert cache.get_or_compute("what is a heat pump?", "us", lambda: "recomputed") == "answer"
+    assert cache.get("what is a heat pump?", scope="us") == "answer"
+    assert embedded == ["what is a heat pump?"]
+
+def test_semantic_cache_should_store():
+    """Values rejected by should_store are returned but not cached"""
+    cache = SemanticCache(embed_fn=embed)
+    assert cache.get_or_compute("q", "us", lambda: [], should_store=bool) == []
+    assert cache.get("q", scope="us") is None
+
+def test_semantic_cache_evicts_oldest():
+    """The cache holds at most max_entries values, dropping the least recently used"""
+    cache = SemanticCache(embed_fn=embed, max_entries=2)
+    for query in ("first", "second", "third"):
+        cache.put(query, query)
+    
+    assert cache.get("first") is None
+    assert cache.get("third") == "third"
+
+def test_semantic_cache_persists_exact_matches(tmp_path):
+    """Exact matches written with persist_dir are served by a new cache instance on the same directory"""
+    pytest.importorskip("diskcache")
+    cache = SemanticCache(embed_fn=embed, persist_dir=str(tmp_path))
+    cache.put("what is a heat pump?", "answer", scope="us")
+    
+    restarted = SemanticCache(embed_fn=embed, persist_dir=str(tmp_path))
+    assert restarted.get("what is a heat pump?", scope="us") == "answer"
+    assert restarted.get("what is a heat pump?", scope="uk") is None
+    
+    restarted.clear()
+    assert SemanticCache(embed_fn=embed, persist_dir=str(tmp_path)).get("what is a heat pump?", scope="us") is None
+
+def test_semantic_cache_clear_scope(tmp_path):
+    """Clearing one scope leaves the other scopes' entries, in memory and on disk"""
+    pytest.importorskip("diskcache")
+    cache = SemanticCache(embed_fn=embed, persist_dir=str(tmp_path))
+    cache.put("q", "us answer", scope="us")
+    cache.put("q", "uk answer", scope="uk")
+    cache.clear_scope("us")
+    
+    assert cache.get("q", scope="us") is None
+    assert cache.get("q", scope="uk") == "uk answer"
+    
+    restarted = SemanticCache(embed_fn=embed, persist_dir=str(tmp_path))
+    assert restarted.get("q", scope="us") is None
+    assert restarted.get("q", scope="uk") == "uk answer"
+
+def test_response_stream_completed_runs_callbacks():
+    """A stream that runs to the end is marked completed and hands the cleaned text to on_complete"""
+    stored = []
+    stream = ResponseStream(iter(["Use ", "LED bulbs.  "]), clean=str.strip)
+    stream.on_complete(stored.append)
+    
+    assert "".join(stream) == "Use LED bulbs.  "
+    assert stream.completed
+    assert stored == ["Use LED bulbs."]
+
+def test_response_stream_truncated_is_not_completed():
+    """A stream cut off mid-answer says so and never reaches the completion callbacks"""
+    stored = []
+    stream = ResponseStream(failing_chunks(["Use ", "LED"]), fallback=lambda: "fallback")
+    stream.on_complete(stored.append)
+    
+    assert "".join(stream) == "Use LED" + INTERRUPTED_NOTICE
+    assert not stream.completed
+    assert not stream.is_fallback
+    assert stored == []
+
+def test_response_stream_fallback_is_not_completed():
+    """A stream that fails before any output, or a canned response, is flagged as fallback"""
+    stream = ResponseStream(failing_chunks([]), fallback=lambda: "fallback")
+    assert "".join(stream) == "fallback"
+    assert stream.is_fallback and not stream.completed
+    
+    canned = ResponseStream.from_fallback("canned")
+    assert "".join(canned) == "canned"
+    assert canned.is_fallback and not canned.completed
+
+def test_embedding_cache_round_trip(tmp_path):
+    """Vectors come back as float32 for the keys that were stored, keyed per model"""
+    cache = EmbeddingCache(str(tmp_path / "embeddings.db"), "model-a")
+    vectors = np.random.default_rng(0).standard_normal((3, 8)).astype(np.float32)
+    keys = [cache.key(text) for text in ("a", "b", "c")]
+    cache.put_many(keys, vectors)
+    
+    found = cache.get_many(keys + [cache.key("d")])
+    assert set(found) == set(keys)
+    assert found[keys[1]].dtype == np.float32
+    np.testing.assert_allclose(found[keys[1]], vectors[1], atol=1e-2)
+    assert EmbeddingCache(str(tmp_path / "embeddings.db"), "model-b").key("a") != keys[0]
+    cache.close()
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+Tests for the RAG system's ingestion and retrieval against an in-memory Chroma collection (no model is loaded)
+"""
+import gc
+import sys
+import json
+import weakref
+import threading
+import uuid
+import zlib
+sys.path.append('.')
+
+import numpy as np
+import pytest
+from cachetools import LRUCache, TTLCache
+
+chromadb = pytest.importorskip("chromadb")
+pytest.importorskip("sentence_transformers")
+pytest.importorskip("langchain")
+pytest.importorskip("ibm_watsonx_ai")
+from backend.cache.embedding_cache import EmbeddingCache
+from backend.cache.semantic_cache import SemanticCache
+from backend.rag_system import climate_rag
+from backend.rag_system.climate_rag import ClimateRAGSystem
+from backend.watsonx_integration.response_stream import ResponseStream
+from config import settings
+
+class HashingEmbedder:
+    """Stand-in for the sentence encoder: one deterministic unit vector per distinct text"""
+    
+    def __init__(self, dim=16):
+        self.dim = dim
+        self.calls = []
+    
+    def encode(self, texts, batch_size=32, **kwargs):
+        self.calls.append(list(texts))
+        vectors = np.stack([
+            np.random.default_rng(zlib.crc32(text.encode('utf-8'))).standard_normal(self.dim) for text in texts
+        ]) if texts else np.empty((0, self.dim))
+        return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+class CountingCollection:
+    """Chroma collection proxy that records every add() batch and counts queries"""
+    
+    def __init__(self, collection):
+        self._collection = collection
+        self.batches = []
+        self.embedding_types = set()
+        self.queries = 0
+    
+    def add(self, **kwargs):
+        self.batches.append(len(kwargs['ids']))
+        self.embedding_types.add(type(kwargs['embeddings']))
+        return self._collection.add(**kwargs)
+    
+    def query(self, **kwargs):
+        self.queries += 1
+        return self._collection.query(**kwargs)
+    
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+class FakeWatsonXClient:
+    """Scripted client that answers with numbered responses and counts model calls"""
+    
+    def __init__(self):
+        self.calls = 0
+        self.stream_chunks = None
+        self.incomplete = []
+        self.failed_prompts = set()
+    
+    def generate_response(self, prompt, context=""):
+        return self.generate_response_with_status(prompt, context)[0]
+    
+    def generate_response_with_status(self, prompt, context=""):
+        self.calls += 1
+        if self.incomplete:
+            return self.incomplete.pop(0), False
+        return f"answer {self.calls}", True
+    
+    def generate_response_stream(self, prompt, context=""):
+        self.calls += 1
+        chunks = self.stream_chunks or iter(["streamed ", f"answer {self.calls}"])
+        return ResponseStream(chunks, fallback=lambda: "fallback answer")
+    
+    def generate_responses_batch(self, prompts, contexts=None):
+        self.calls += 1
+        return [
+            (f"fallback for {prompt}", False) if prompt in self.failed_prompts else (f"batch answer to {prompt}", True)
+            for prompt in prompts
+        ]
+
+def make_rag():
+    """RAG system over a fresh in-memory collection, skipping the watsonx client and model loading"""
+    rag = ClimateRAGSystem.__new__(ClimateRAGSystem)
+    rag.embedding_model = HashingEmbedder()
+    rag.chroma_client = chromadb.EphemeralClient()
+    rag.collection = CountingCollection(rag.chroma_client.create_collection(f"test_{uuid.uuid4().hex}"))
+    rag._precomputed_embeddings = {}
+    rag._query_embeddings = LRUCache(maxsize=climate_rag.QUERY_EMBEDDING_CACHE_SIZE)
+    rag._query_embeddings_lock = threading.Lock()
+    rag._embedding_cache = EmbeddingCache(":memory:", "hashing-embedder")
+    rag._search_cache = SemanticCache(
+        embed_fn=rag.embed_query,
+        threshold=climate_rag.SEARCH_CACHE_THRESHOLD,
+        n_planes=climate_rag.SEARCH_CACHE_PLANES,
+        max_entries=climate_rag.SEARCH_CACHE_SIZE
+    )
+    rag._response_cache = TTLCache(maxsize=climate_rag.RESPONSE_CACHE_SIZE, ttl=climate_rag.RESPONSE_CACHE_TTL)
+    rag._response_cache_lock = threading.Lock()
+    rag._kb_generation = 0
+    rag.watsonx_client = FakeWatsonXClient()
+    rag.text_splitter = climate_rag.build_text_splitter()
+    return rag
+
+def test_add_documents_writes_in_fixed_size_batches():
+    """Chunks are written in batches of at most ADD_BATCH_SIZE and are all searchable afterwards"""
+    rag = make_rag()
+    documents = [
+        {'title': f"Tip {i}", 'content': f"Energy tip number {i}: turn off unused lights.", 'source': "Guide"}
+        for i in range(climate_rag.ADD_BATCH_SIZE + 10)
+    ]
+    rag.add_documents(documents)
+    
+    assert rag.collection.batches == [climate_rag.ADD_BATCH_SIZE, 10]
+    assert rag.collection.embedding_types == {list}  # chromadb 0.4.x rejects ndarrays
+    assert rag.collection.count() == len(documents)
+    
+    results = rag.search_knowledge("Energy tip number 7: turn off unused lights.", n_results=1)
+    assert results[0]['metadata']['title'] == "Tip 7"
+    assert results[0]['similarity'] == pytest.approx(1.0, abs=1e-4)
+
+def test_add_documents_normalizes_blank_lines():
+    """Content is stripped and runs of blank lines collapse to one paragraph break before chunking"""
+    rag = make_rag()
+    rag.add_documents([{'title': "Solar", 'content': "\n  Solar panels cut emissions.\n\n\n\n\nThey pay back in years.  \n"}])
+    
+    stored = rag.collection.get(include=['documents'])['documents']
+    assert stored == ["Solar panels cut emissions.\n\nThey pay back in years."]
+
+def test_prepare_context_labels_each_source():
+    """Each retrieved chunk is prefixed with its source and title and separated by a rule"""
+    docs = [
+        {'content': "Insulate the attic.", 'metadata': {'source': "Guide", 'title': "Insulation"}},
+        {'content': "Seal the windows.", 'metadata': {}},
+    ]
+    assert make_rag()._prepare_context(docs) == (
+        "Source: Guide - Insulation\nInsulate the attic.\n\n---\n\nSource: Unknown - Untitled\nSeal the windows."
+    )
+    assert make_rag()._prepare_context([]) == ""
+
+def test_enhance_query_reads_location_and_lifestyle():
+    """Only the profile's location and lifestyle are appended, and an empty profile leaves the query alone"""
+    rag = make_rag()
+    profile = {'location': "Lyon", 'lifestyle': "urban", 'name': "Ana"}
+    assert rag._enhance_query("heat pumps?", profile) == "heat pumps? in Lyon for urban lifestyle"
+    assert rag._enhance_query("heat pumps?", {'location': "Lyon"}) == "heat pumps? in Lyon"
+    assert rag._enhance_query("heat pumps?", None) == "heat pumps?"
+
+def test_add_documents_encodes_every_chunk_in_one_call():
+    """Chunks from all documents are embedded together rather than per document"""
+    rag = make_rag()
+    rag.add_documents([
+        {'title': "Solar", 'content': "Solar panels cut emissions. " * 60},
+        {'title': "Wind", 'content': "Wind turbines need steady wind."},
+    ])
+    
+    assert len(rag.embedding_model.calls) == 1
+    assert len(rag.embedding_model.calls[0]) == rag.collection.count() > 2
+
+def test_repeated_search_is_served_from_the_cache():
+    """A repeated query skips Chroma until new documents are added"""
+    rag = make_rag()
+    rag.add_documents([{'title': "Solar", 'content': "Solar panels cut emissions."}])
+    
+    first = rag.search_knowledge("solar panels", n_results=1)
+    assert rag.search_knowledge("solar panels", n_results=1) == first
+    assert rag.collection.queries == 1
+    assert rag.cache_stats()['hits'] == 1
+    
+    rag.add_documents([{'title': "Wind", 'content': "Wind turbines need steady wind."}])
+    rag.search_knowledge("solar panels", n_results=1)
+    assert rag.collection.queries == 2
+
+def test_mmr_skips_near_duplicate_chunks():
+    """MMR prefers a less similar but novel chunk over a near-copy of one already picked"""
+    query = np.array([1.0, 1.0, 0.0])
+    candidates = np.array([
+        [1.0, 0.04, 0.0],  # near-copy of the best match
+        [1.0, 0.05, 0.0],  # best match
+        [0.0, 1.0, 0.0],   # slightly weaker match that covers the rest of the query
+    ])
+    assert climate_rag._mmr_select(query, candidates, 2) == [1, 2]
+    assert sorted(climate_rag._mmr_select(query, candidates, 10)) == [0, 1, 2]
+
+def test_reingested_chunks_reuse_cached_embeddings():
+    """Chunks embedded once are not sent to the encoder again, even into an empty collection"""
+    rag = make_rag()
+    documents = [{'title': "Solar", 'content': "Solar panels cut emissions."}]
+    rag.add_documents(documents)
+    
+    rag.collection = CountingCollection(rag.chroma_client.create_collection(f"test_{uuid.uuid4().hex}"))
+    rag.add_documents(documents + [{'title': "Wind", 'content': "Wind turbines need steady wind."}])
+    assert rag.embedding_model.calls[-1] == ["Wind turbines need steady wind."]
+    assert rag.collection.count() == 2
+
+def test_duplicate_chunks_are_embedded_once():
+    """Identical chunks in different documents share one encode but are each stored under their own id"""
+    rag = make_rag()
+    rag.add_documents([
+        {'title': "Guide A", 'content': "Turn off unused lights."},
+        {'title': "Guide B", 'content': "Turn off unused lights."},
+        {'title': "Guide C", 'content': "Wash clothes in cold water."},
+    ])
+    
+    assert rag.embedding_model.calls == [["Turn off unused lights.", "Wash clothes in cold water."]]
+    stored = rag.collection.get(include=['embeddings', 'metadatas'])
+    assert sorted(metadata['title'] for metadata in stored['metadatas']) == ["Guide A", "Guide B", "Guide C"]
+    by_id = dict(zip(stored['ids'], stored['embeddings']))
+    np.testing.assert_allclose(by_id['doc_0_chunk_0'], by_id['doc_1_chunk_0'])
+
+def test_collection_with_old_index_settings_is_rebuilt(tmp_path, monkeypatch):
+    """A collection created before the cosine HNSW settings is recreated with them, keeping its chunks"""
+    monkeypatch.setattr(settings, 'CHROMA_PERSIST_DIRECTORY', str(tmp_path))
+    old = chromadb.PersistentClient(path=str(tmp_path)).create_collection(
+        climate_rag.COLLECTION_NAME, metadata={"description": "Climate action and environmental knowledge base"}
+    )
+    old.add(ids=["doc_0_chunk_0"], embeddings=[[0.6, 0.8, 0.0]], documents=["Insulate the attic."], metadatas=[{'title': "Insulation"}])
+    
+    rag = ClimateRAGSystem.__new__(ClimateRAGSystem)
+    rag._initialize_vector_db()
+    assert rag.collection.metadata['hnsw:space'] == "cosine"
+    
+    stored = rag.collection.get(include=['embeddings', 'documents', 'metadatas'])
+    assert stored['ids'] == ["doc_0_chunk_0"] and stored['documents'] == ["Insulate the attic."]
+    np.testing.assert_allclose(stored['embeddings'][0], [0.6, 0.8, 0.0], rtol=1e-6)
+    
+    rebuilt = []
+    monkeypatch.setattr(ClimateRAGSystem, '_rebuild_collection', lambda self: rebuilt.append(self))
+    ClimateRAGSystem.__new__(ClimateRAGSystem)._initialize_vector_db()
+    assert rebuilt == []
+    
+    # A new store gets the current settings straight away
+    monkeypatch.setattr(settings, 'CHROMA_PERSIST_DIRECTORY', str(tmp_path / "fresh"))
+    fresh = ClimateRAGSystem.__new__(ClimateRAGSystem)
+    fresh._initialize_vector_db()
+    assert fresh.collection.metadata['hnsw:space'] == "cosine"
+    assert rebuilt == []
+
+def test_faiss_backend_serves_ingestion_and_search(tmp_path, monkeypatch):
+    """With VECTOR_BACKEND=faiss, chunks are stored in FAISS and searched through the same RAG calls"""
+    pytest.importorskip("faiss")
+    monkeypatch.setattr(settings, 'VECTOR_BACKEND', "faiss")
+    monkeypatch.setattr(settings, 'FAISS_PERSIST_DIRECTORY', str(tmp_path))
+    
+    rag = make_rag()
+    rag._initialize_vector_db()
+    rag.add_documents([
+        {'title': "Solar", 'content': "Solar panels cut emissions."},
+        {'title': "Wind", 'content': "Wind turbines need steady wind."},
+    ])
+    
+    assert rag.collection.count() == 2
+    assert type(rag.collection)(settings.FAISS_PERSIST_DIRECTORY, settings.FAISS_INDEX_TYPE).count() == 2
+    results = rag.search_knowledge("Wind turbines need steady wind.", n_results=1)
+    assert results[0]['metadata']['title'] == "Wind"
+    assert results[0]['similarity'] == pytest.approx(1.0, abs=1e-4)
+
+def test_answers_are_cached_until_the_knowledge_base_changes():
+    """A repeated question (up to case and spacing) reuses the answer until documents are added"""
+    rag = make_rag()
+    rag.add_documents([{'title': "Solar", 'content': "Solar panels cut emissions."}])
+    
+    assert rag.retrieve_and_generate("Do solar panels help?")[0] == "answer 1"
+    assert rag.retrieve_and_generate("do  solar panels help?")[0] == "answer 1"
+    assert "".join(rag.retrieve_and_generate_stream("Do solar panels help?")[0]) == "answer 1"
+    
+    rag.add_documents([{'title': "Wind", 'content': "Wind turbines need steady wind."}])
+    assert rag.retrieve_and_generate("Do solar panels help?")[0] == "answer 2"
+    assert rag.watsonx_client.calls == 2
+
+def test_fallback_and_truncated_answers_are_not_cached():
+    """Answers the model did not finish are shown once and the next ask goes back to the model"""
+    rag = make_rag()
+    rag.add_documents([{'title': "Solar", 'content': "Solar panels cut emissions."}])
+    rag.watsonx_client.incomplete = ["fallback answer", "cut off answer"]
+    
+    assert rag.retrieve_and_generate("Do solar panels help?")[0] == "fallback answer"
+    assert rag.retrieve_and_generate("Do solar panels help?")[0] == "cut off answer"
+    assert rag.retrieve_and_generate("Do solar panels help?")[0] == "answer 3"
+    assert rag.retrieve_and_generate("Do solar panels help?")[0] == "answer 3"
+    assert rag.watsonx_client.calls == 3
+
+def test_streamed_answers_are_cached_once_finished():
+    """A stream read to the end is stored, and the next ask replays it without the model"""
+    rag = make_rag()
+    rag.add_documents([{'title': "Solar", 'content': "Solar panels cut emissions."}])
+    
+    stream, sources = rag.retrieve_and_generate_stream("Do solar panels help?")
+    assert "".join(stream) == "streamed answer 1"
+    assert sources[0]['metadata']['title'] == "Solar"
+    assert rag.retrieve_and_generate("Do solar panels help?")[0] == "streamed answer 1"
+    assert rag.watsonx_client.calls == 1
+
+def write_precomputed_samples(tmp_path, monkeypatch, fingerprint=None):
+    """Write sample vectors and their manifest the way build_sample_embeddings.py does, using the hashing embedder"""
+    path = tmp_path / "sample_embeddings.npy"
+    monkeypatch.setattr(settings, 'PRECOMPUTED_SAMPLE_PATH', str(path))
+    chunks = list(climate_rag.iter_document_chunks(climate_rag.SAMPLE_DOCUMENTS, climate_rag.build_text_splitter()))
+    
+    np.save(path, HashingEmbedder().encode([text for text, _, _ in chunks]).astype(np.float16))
+    with open(tmp_path / "sample_ids.json", 'w') as f:
+        json.dump({
+            'model': settings.EMBEDDING_MODEL,
+            'ids': [chunk_id for _, _, chunk_id in chunks],
+            'fingerprint': fingerprint or climate_rag.sample_fingerprint(chunks)
+        }, f)
+    return chunks
+
+def test_cold_start_loads_precomputed_sample_vectors(tmp_path, monkeypatch):
+    """An empty collection is filled from the precomputed vectors without running the encoder"""
+    chunks = write_precomputed_samples(tmp_path, monkeypatch)
+    rag = make_rag()
+    rag.initialize_with_sample_data()
+    
+    assert rag.embedding_model.calls == []
+    assert rag.collection.count() == len(chunks)
+    assert rag.search_knowledge(chunks[3][0], n_results=1)[0]['content'] == chunks[3][0]
+
+def test_stale_precomputed_samples_fall_back_to_encoding(tmp_path, monkeypatch):
+    """Vectors built from other sample texts or another model are ignored"""
+    chunks = write_precomputed_samples(tmp_path, monkeypatch, fingerprint="stale")
+    rag = make_rag()
+    rag.initialize_with_sample_data()
+    
+    assert len(rag.embedding_model.calls) == 1
+    assert rag.collection.count() == len(chunks)
+
+def test_native_splitter_respects_chunk_size():
+    """The Rust splitter keeps chunks within 1000 characters and overlaps neighbouring chunks"""
+    pytest.importorskip("semantic_text_splitter")
+    text = " ".join(f"Sentence {i} about saving energy at home." for i in range(200))
+    chunks = climate_rag.NativeTextSplitter(chunk_size=1000, chunk_overlap=200).split_text(text)
+    
+    assert len(chunks) > 1
+    assert max(len(chunk) for chunk in chunks) <= 1000
+    assert chunks[0].startswith("Sentence 0 ") and chunks[-1].endswith("Sentence 199 about saving energy at home.")
+    assert chunks[1].split(". ")[0] in chunks[0]
+
+def test_native_splitter_is_opt_in(monkeypatch):
+    """LangChain's splitter is the default; USE_NATIVE_TEXT_SPLITTER switches to the Rust one"""
+    assert isinstance(climate_rag.build_text_splitter(), climate_rag.RecursiveCharacterTextSplitter)
+    
+    pytest.importorskip("semantic_text_splitter")
+    monkeypatch.setattr(settings, 'USE_NATIVE_TEXT_SPLITTER', True)
+    assert isinstance(climate_rag.build_text_splitter(), climate_rag.NativeTextSplitter)
+
+def test_batch_generates_only_uncached_answers():
+    """Cached answers are reused and every other query goes to the model in one batched call"""
+    rag = make_rag()
+    rag.add_documents([{'title': "Solar", 'content': "Solar panels cut emissions."}])
+    rag.retrieve_and_generate("Do solar panels help?")
+    
+    answers = rag.retrieve_and_generate_batch(["Do solar panels help?", "Is wind power cheap?", "Should I insulate?"])
+    assert [answer for answer, _ in answers] == [
+        "answer 1", "batch answer to Is wind power cheap?", "batch answer to Should I insulate?"
+    ]
+    assert rag.watsonx_client.calls == 2
+    assert rag.retrieve_and_generate("Should I insulate?")[0] == "batch answer to Should I insulate?"
+
+def test_batch_does_not_cache_fallback_items():
+    """A batch item that fell back is returned but asked again on the next batch"""
+    rag = make_rag()
+    rag.add_documents([{'title': "Solar", 'content': "Solar panels cut emissions."}])
+    rag.watsonx_client.failed_prompts = {"Is wind power cheap?"}
+    
+    first = rag.retrieve_and_generate_batch(["Is wind power cheap?", "Should I insulate?"])
+    assert [answer for answer, _ in first] == ["fallback for Is wind power cheap?", "batch answer to Should I insulate?"]
+    
+    rag.watsonx_client.failed_prompts = set()
+    second = rag.retrieve_and_generate_batch(["Is wind power cheap?", "Should I insulate?"])
+    assert [answer for answer, _ in second] == ["batch answer to Is wind power cheap?", "batch answer to Should I insulate?"]
+    assert rag.watsonx_client.calls == 2
+
+def test_truncated_streams_are_not_cached():
+    """A stream that breaks off mid-answer is shown but the next ask goes back to the model"""
+    rag = make_rag()
+    rag.add_documents([{'title': "Solar", 'content': "Solar panels cut emissions."}])
+    
+    def failing_chunks():
+        yield "partial "
+        raise ConnectionError("stream reset")
+    
+    rag.watsonx_client.stream_chunks = failing_chunks()
+    stream, _ = rag.retrieve_and_generate_stream("Do solar panels help?")
+    assert "".join(stream).startswith("partial ")
+    assert not stream.completed
+    
+    rag.watsonx_client.stream_chunks = None
+    assert "".join(rag.retrieve_and_generate_stream("Do solar panels help?")[0]) == "streamed answer 2"
+    assert rag.retrieve_and_generate("Do solar panels help?")[0] == "streamed answer 2"
+    assert rag.watsonx_client.calls == 2
+
+def test_query_embeddings_are_memoized_per_instance():
+    """A query is encoded once, and the memo does not keep the RAG system alive"""
+    rag = make_rag()
+    first = rag.embed_query("heat pumps?")
+    assert rag.embed_query("heat pumps?") is first
+    assert rag.embedding_model.calls == [["heat pumps?"]]
+    
+    ref = weakref.ref(rag)
+    del rag, first
+    gc.collect()
+    assert ref() is None
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tests for the optional embedding backends' pooling, using a scripted tokenizer and model
+"""
+import sys
+from types import SimpleNamespace
+sys.path.append('.')
+
+import numpy as np
+import pytest
+
+class WordTokenizer:
+    """Tokenizer stand-in: one token per word, right-padded to the longest text in the batch"""
+    
+    def __call__(self, texts, padding=True, truncation=True, max_length=None, return_tensors="np"):
+        lengths = [len(text.split()) for text in texts]
+        width = max(lengths)
+        ids = np.zeros((len(texts), width), dtype=np.int64)
+        mask = np.zeros((len(texts), width), dtype=np.int64)
+        for row, text in enumerate(texts):
+            ids[row, :lengths[row]] = [len(word) for word in text.split()]
+            mask[row, :lengths[row]] = 1
+        return {"input_ids": ids, "attention_mask": mask}
+
+class TokenModel:
+    """Model stand-in whose hidden state for a token depends only on the token id"""
+    
+    def __init__(self, dim=4):
+        self.table = np.random.default_rng(0).standard_normal((32, dim)).astype(np.float32)
+        self.batches = 0
+    
+    def __call__(self, input_ids, attention_mask):
+        self.batches += 1
+        return SimpleNamespace(last_hidden_state=self.table[input_ids])
+
+def expected_pooled(token_states):
+    """Mean of the given token states, L2-normalized"""
+    pooled = token_states.mean(axis=0)
+    return pooled / np.linalg.norm(pooled)
+
+def expected_embedding(model, text):
+    """Mean of the text's token states, L2-normalized"""
+    return expected_pooled(model.table[[len(word) for word in text.split()]])
+
+def make_onnx_embedder():
+    pytest.importorskip("optimum.onnxruntime")
+    from backend.rag_system.onnx_embedder import ONNXEmbedder
+    
+    embedder = ONNXEmbedder.__new__(ONNXEmbedder)
+    embedder.tokenizer = WordTokenizer()
+    embedder.model = TokenModel()
+    return embedder
+
+def test_onnx_embedder_mean_pools_without_padding():
+    """Padded positions are left out of the mean, and each embedding is unit length"""
+    embedder = make_onnx_embedder()
+    texts = ["heat pumps save energy", "insulate", "solar panels on the roof"]
+    
+    embeddings = embedder.encode(texts, batch_size=2)
+    assert embeddings.dtype == np.float32
+    assert embedder.model.batches == 2
+    for text, embedding in zip(texts, embeddings):
+        np.testing.assert_allclose(embedding, expected_embedding(embedder.model, text), rtol=1e-5)
+
+def test_onnx_embedder_handles_no_texts():
+    """An empty input gives an empty array without running the model"""
+    embedder = make_onnx_embedder()
+    assert embedder.encode([]).shape[0] == 0
+    assert embedder.model.batches == 0
+
+def test_pool_and_normalize_matches_numpy_reference():
+    """The compiled kernel (when numba is installed) and the NumPy path pool the same way"""
+    from backend.rag_system import fastpool
+    
+    rng = np.random.default_rng(1)
+    hidden = rng.standard_normal((5, 7, 6)).astype(np.float32)
+    mask = (np.arange(7)[None, :] < np.array([7, 3, 1, 5, 0])[:, None]).astype(np.int64)
+    
+    reference = fastpool._pool_and_normalize_numpy(hidden, mask)
+    np.testing.assert_allclose(fastpool.pool_and_normalize(hidden, mask), reference, rtol=1e-4, atol=1e-6)
+    np.testing.assert_allclose(reference[1], expected_pooled(hidden[1, :3]), rtol=1e-5)
+    assert not reference[4].any()  # a fully masked row pools to zeros instead of NaN
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
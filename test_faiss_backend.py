@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for the FAISS vector store: exact staging, training the compressed index, search and persistence
+"""
+import sys
+sys.path.append('.')
+
+import numpy as np
+import pytest
+
+pytest.importorskip("faiss")
+from backend.rag_system import faiss_backend
+from backend.rag_system.faiss_backend import FAISSBackend
+
+DIM = 32
+
+def make_chunks(start, count, rng):
+    """L2-normalized vectors with matching chunk ids, documents and metadata"""
+    vectors = rng.standard_normal((count, DIM)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    ids = [f"chunk_{i}" for i in range(start, start + count)]
+    documents = [f"document {i}" for i in range(start, start + count)]
+    metadatas = [{'chunk_id': chunk_id, 'source': 'test'} for chunk_id in ids]
+    return documents, metadatas, vectors, ids
+
+TRAIN_SIZE = 300
+
+@pytest.mark.parametrize("index_type", ["ivfpq", "sq8"])
+def test_add_and_search_after_training(tmp_path, monkeypatch, index_type):
+    """Vectors added before and after training stay searchable and survive a reload"""
+    monkeypatch.setattr(faiss_backend, 'NLIST', 8)  # a handful of lists suits the small training set
+    rng = np.random.default_rng(7)
+    backend = FAISSBackend(str(tmp_path), index_type)
+    backend.train_size = TRAIN_SIZE  # train on a small corpus instead of TRAIN_SIZES[index_type]
+    
+    documents, metadatas, vectors, ids = make_chunks(0, TRAIN_SIZE, rng)
+    half = TRAIN_SIZE // 2
+    backend.add(documents[:half], metadatas[:half], vectors[:half].tolist(), ids[:half])
+    assert backend._is_exact()
+    assert backend.query(vectors[:1], n_results=1)['ids'] == [[ids[0]]]
+    
+    backend.add(documents[half:], metadatas[half:], vectors[half:], ids[half:])
+    assert not backend._is_exact()
+    
+    # Adds after training go straight into the compressed index; repeated ids are skipped
+    more = make_chunks(TRAIN_SIZE, 50, rng)
+    backend.add(*more)
+    backend.add(*more)
+    assert backend.count() == TRAIN_SIZE + 50
+    backend.persist()
+    
+    results = backend.query(more[2][:5], n_results=3, include=['documents', 'metadatas', 'distances', 'embeddings'])
+    for chunk_id, row in zip(more[3][:5], results['ids']):
+        assert chunk_id in row
+    assert len(results['embeddings'][0]) == 3
+    
+    reloaded = FAISSBackend(str(tmp_path), index_type)
+    assert reloaded.count() == backend.count()
+    assert documents[0] in reloaded.query(vectors[:1], n_results=3)['documents'][0]
+
+def test_sq8_search_is_near_exact(tmp_path):
+    """int8 codes keep the best match on top with a distance close to zero"""
+    rng = np.random.default_rng(3)
+    backend = FAISSBackend(str(tmp_path), "sq8")
+    backend.train_size = TRAIN_SIZE
+    documents, metadatas, vectors, ids = make_chunks(0, TRAIN_SIZE, rng)
+    backend.add(documents, metadatas, vectors, ids)
+    
+    results = backend.query(vectors[:10], n_results=1)
+    assert [row[0] for row in results['ids']] == ids[:10]
+    assert max(row[0] for row in results['distances']) < 0.05
+
+def test_rows_added_after_the_last_persist_are_dropped_on_reload(tmp_path):
+    """Chunks whose vectors were never written to the index file are forgotten, so adding them again works"""
+    rng = np.random.default_rng(5)
+    backend = FAISSBackend(str(tmp_path), "sq8")
+    saved, unsaved = make_chunks(0, 10, rng), make_chunks(10, 5, rng)
+    backend.add(*saved)
+    backend.persist()
+    backend.add(*unsaved)
+    
+    reloaded = FAISSBackend(str(tmp_path), "sq8")
+    assert reloaded.count() == 10
+    reloaded.add(*unsaved)
+    assert reloaded.count() == 15
+    assert reloaded.query(unsaved[2][:1], n_results=1)['ids'] == [[unsaved[3][0]]]
+    assert reloaded.query(saved[2][:1], n_results=1)['ids'] == [[saved[3][0]]]
+
+def test_unknown_index_type_is_rejected(tmp_path):
+    """Only the index types with a training size are accepted"""
+    with pytest.raises(ValueError):
+        FAISSBackend(str(tmp_path), "hnsw")
+
+def test_empty_query(tmp_path):
+    """Searching an empty store returns one empty result list per query"""
+    backend = FAISSBackend(str(tmp_path), "sq8")
+    results = backend.query(np.zeros((2, DIM), dtype=np.float32), n_results=3)
+    assert results['ids'] == [[], []]
+    assert results['documents'] == [[], []]
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Tests for impact tracking: summaries, the daily rollup, bulk inserts and group commits
+"""
+import sys
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+sys.path.append('.')
+
+import pytest
+from config import settings
+from backend.data_processors import impact_tracker
+from backend.data_processors.impact_tracker import ImpactTracker, IMPACT_COLUMNS, PENDING_FLUSH_SIZE, PENDING_MAX_SIZE
+
+ACTIONS = [
+    {'action_type': 'transportation', 'subtype': 'bike_commute_km', 'description': 'Biked to work', 'quantity': 12},
+    {'action_type': 'energy_efficiency', 'subtype': 'led_bulb_replacement', 'description': 'Swapped bulbs', 'quantity': 6},
+    {'action_type': 'waste', 'subtype': 'composting_kg', 'description': 'Composted scraps', 'quantity': 3.5},
+    {'action_type': 'food', 'subtype': 'vegetarian_meal', 'description': 'Meat-free dinner', 'quantity': 2},
+    {'action_type': 'transportation', 'subtype': 'public_transport_km', 'description': 'Took the train', 'quantity': 40},
+]
+
+def reference_impact(impact_factors, action):
+    """The per-key impact formula the factor matrix replaces"""
+    factors = impact_factors.get(action['action_type'], {}).get(action.get('subtype', ''), {})
+    quantity = action.get('quantity', 1)
+    carbon = factors.get('carbon_kg_per_year', 0) + quantity * sum(
+        factors.get(key, 0) for key in ('carbon_kg_per_unit', 'carbon_kg_per_km', 'carbon_kg_per_kg',
+                                        'carbon_kg_per_meal', 'carbon_kg_per_kwh')
+    )
+    energy = factors.get('energy_kwh_per_year', 0) + factors.get('energy_kwh_per_sqm', 0) * quantity
+    water = factors.get('water_liters_per_year', 0)
+    waste = factors.get('waste_kg_per_year', 0) + factors.get('waste_kg_per_kg', 0) * quantity
+    return [carbon, energy, water, waste, energy * 0.12 + water * 0.001]
+
+TOTAL_KEYS = (
+    'total_actions', 'total_carbon_saved_kg', 'total_energy_saved_kwh',
+    'total_water_saved_liters', 'total_waste_reduced_kg', 'total_cost_savings'
+)
+
+def legacy_record(description, carbon_saved_kg, timestamp=None):
+    """One entry of a {user_id}_impacts.json file as earlier versions wrote it"""
+    return {
+        'action_type': 'transportation', 'description': description, 'quantity': 10, 'unit': 'km',
+        'carbon_saved_kg': carbon_saved_kg, 'energy_saved_kwh': 0, 'water_saved_liters': 0, 'waste_reduced_kg': 0,
+        'cost_savings': 1.5, 'timestamp': timestamp or datetime.now().isoformat(), 'location': 'Paris', 'verified': False
+    }
+
+@pytest.fixture
+def tracker(tmp_path):
+    tracker = ImpactTracker(data_dir=str(tmp_path))
+    yield tracker
+    tracker.close()
+
+def test_track_action_summary_round_trip(tracker):
+    """Tracked actions show up in the summary with their calculated impact"""
+    records = [tracker.track_action('alice', action) for action in ACTIONS]
+    summary = tracker.get_user_impact_summary('alice')
+    
+    assert summary['total_actions'] == len(ACTIONS)
+    assert summary['total_carbon_saved_kg'] == round(sum(record.carbon_saved_kg for record in records), 2)
+    assert summary['action_breakdown']['transportation']['count'] == 2
+    assert summary['recent_actions'][-1]['description'] == ACTIONS[-1]['description']
+    assert tracker.get_user_impact_summary('bob')['total_actions'] == 0
+
+def test_legacy_json_files_are_imported_once(tmp_path):
+    """Per-user JSON files from earlier versions are imported on startup and not again on the next one"""
+    with open(tmp_path / "carol_impacts.json", 'w') as f:
+        json.dump([legacy_record('Biked', 2.0), legacy_record('Walked', 1.0)], f)
+    
+    for _ in range(2):
+        tracker = ImpactTracker(data_dir=str(tmp_path))
+        summary = tracker.get_user_impact_summary('carol')
+        tracker.close()
+        assert summary['total_actions'] == 2
+        assert summary['total_carbon_saved_kg'] == 3.0
+
+def test_summary_cache_invalidated_by_write(tracker):
+    """A summary is served from the cache until the user records another action"""
+    tracker.track_action('alice', ACTIONS[0])
+    summary = tracker.get_user_impact_summary('alice')
+    assert summary['total_actions'] == 1
+    assert tracker.get_user_impact_summary('alice') is summary
+    
+    tracker.track_action('alice', ACTIONS[1])
+    assert tracker.get_user_impact_summary('alice')['total_actions'] == 2
+    
+    tracker.track_actions_bulk('alice', ACTIONS)
+    assert tracker.get_user_impact_summary('alice')['total_actions'] == 2 + len(ACTIONS)
+
+def test_summary_window_excludes_older_records(tmp_path):
+    """Only records inside the requested number of days are summarized"""
+    old = (datetime.now() - timedelta(days=60)).isoformat()
+    with open(tmp_path / "carol_impacts.json", 'w') as f:
+        json.dump([legacy_record('Biked', 2.0), legacy_record('Drove less', 5.0, timestamp=old)], f)
+    
+    tracker = ImpactTracker(data_dir=str(tmp_path))
+    try:
+        assert tracker.get_user_impact_summary('carol', days=30)['total_carbon_saved_kg'] == 2.0
+        assert tracker.get_user_impact_summary('carol', days=90)['total_carbon_saved_kg'] == 7.0
+    finally:
+        tracker.close()
+
+def test_summary_totals_and_recent_actions_share_the_cutoff(tmp_path):
+    """A record just before the cutoff is left out of the totals as well as recent_actions, even on the cutoff's day"""
+    cutoff = datetime.now() - timedelta(days=30)
+    with open(tmp_path / "dave_impacts.json", 'w') as f:
+        json.dump([
+            legacy_record('Just inside', 2.0, timestamp=(cutoff + timedelta(minutes=10)).isoformat()),
+            legacy_record('Just outside', 5.0, timestamp=(cutoff - timedelta(minutes=10)).isoformat()),
+        ], f)
+    
+    tracker = ImpactTracker(data_dir=str(tmp_path))
+    try:
+        summary = tracker.get_user_impact_summary('dave', days=30)
+        assert summary['total_actions'] == 1
+        assert summary['total_carbon_saved_kg'] == 2.0
+        assert [action['description'] for action in summary['recent_actions']] == ['Just inside']
+    finally:
+        tracker.close()
+
+def test_bulk_calculate_impact_matches_factor_formula(tracker):
+    """Every known action, plus an unknown one, gets the impact the factor formula gives"""
+    actions = [
+        {'action_type': action_type, 'subtype': subtype, 'quantity': 3}
+        for action_type, subtypes in tracker.impact_factors.items() for subtype in subtypes
+    ] + [{'action_type': 'gardening', 'subtype': 'tree', 'quantity': 3}]
+    
+    impacts = tracker.bulk_calculate_impact(actions)
+    assert impacts.shape == (len(actions), len(IMPACT_COLUMNS))
+    for action, row in zip(actions, impacts):
+        expected = reference_impact(tracker.impact_factors, action)
+        assert row.tolist() == pytest.approx(expected)
+        assert list(tracker._calculate_impact(action).values()) == pytest.approx(expected)
+    assert not impacts[-1].any()
+
+def test_bulk_insert_matches_single_inserts(tracker):
+    """track_actions_bulk produces the same records and summary as one track_action per action"""
+    single = [tracker.track_action('single', action) for action in ACTIONS]
+    bulk = tracker.track_actions_bulk('bulk', ACTIONS)
+    
+    for one, many in zip(single, bulk):
+        assert one.carbon_saved_kg == pytest.approx(many.carbon_saved_kg)
+        assert one.energy_saved_kwh == pytest.approx(many.energy_saved_kwh)
+        assert one.waste_reduced_kg == pytest.approx(many.waste_reduced_kg)
+        assert one.cost_savings == pytest.approx(many.cost_savings)
+    
+    single_summary = tracker.get_user_impact_summary('single')
+    bulk_summary = tracker.get_user_impact_summary('bulk')
+    for key in TOTAL_KEYS:
+        assert single_summary[key] == pytest.approx(bulk_summary[key])
+    assert single_summary['action_breakdown'].keys() == bulk_summary['action_breakdown'].keys()
+    for action_type, breakdown in single_summary['action_breakdown'].items():
+        assert breakdown == pytest.approx(bulk_summary['action_breakdown'][action_type])
+
+def test_rollup_matches_raw_records(tracker):
+    """Totals served from the daily rollup equal the sums over the raw impact rows"""
+    for action in ACTIONS:
+        tracker.track_action('alice', action)
+    tracker.track_actions_bulk('alice', ACTIONS)
+    summary = tracker.get_user_impact_summary('alice')
+    
+    raw = tracker._conn.execute(
+        """
+        SELECT COUNT(*), SUM(carbon_saved_kg), SUM(energy_saved_kwh), SUM(water_saved_liters),
+               SUM(waste_reduced_kg), SUM(cost_savings)
+        FROM impacts WHERE user_id = ?
+        """,
+        ('alice',)
+    ).fetchone()
+    
+    assert summary['total_actions'] == raw[0]
+    for key, value in zip(TOTAL_KEYS[1:], raw[1:]):
+        assert summary[key] == pytest.approx(round(value, 2))
+
+def test_leaderboard_ranks_users_by_metric(tracker):
+    """Users are ordered by the requested metric, and by action count for an unknown metric"""
+    tracker.track_actions_bulk('alice', ACTIONS)
+    tracker.track_action('bob', ACTIONS[3])
+    tracker.track_action('bob', ACTIONS[3])
+    tracker.track_actions_bulk('carol', ACTIONS[:1] * 6)
+    
+    by_carbon = tracker.get_leaderboard()
+    assert [entry['user_id'] for entry in by_carbon] == ['alice', 'carol', 'bob']
+    alice = tracker.get_user_impact_summary('alice')
+    assert by_carbon[0]['total_actions'] == alice['total_actions']
+    assert by_carbon[0]['carbon_saved_kg'] == alice['total_carbon_saved_kg']
+    assert [entry['user_id'] for entry in tracker.get_leaderboard(metric='total_actions')] == ['carol', 'alice', 'bob']
+    assert len(tracker.get_leaderboard(limit=2)) == 2
+
+def stored_rows(tracker):
+    return tracker._conn.execute("SELECT COUNT(*) FROM impacts").fetchone()[0]
+
+def wait_for_timer(tracker):
+    timer = tracker._flush_timer
+    if timer is not None:
+        timer.join(5)
+
+def test_group_commit_is_read_your_writes(tracker, monkeypatch):
+    """Queued actions are committed together, and a summary read sees them without waiting for the timer"""
+    monkeypatch.setattr(impact_tracker, 'PENDING_FLUSH_INTERVAL', 60)
+    tracker.track_action('alice', ACTIONS[0])
+    tracker.track_action('alice', ACTIONS[1])
+    assert stored_rows(tracker) == 0
+    
+    assert tracker.get_user_impact_summary('alice')['total_actions'] == 2
+    assert stored_rows(tracker) == 2
+    
+    for _ in range(PENDING_FLUSH_SIZE):
+        tracker.track_action('bob', ACTIONS[0])
+    wait_for_timer(tracker)
+    assert stored_rows(tracker) == 2 + PENDING_FLUSH_SIZE
+
+def test_close_flushes_queued_actions(tmp_path):
+    """Actions still queued when the tracker closes are written before the connection goes away"""
+    tracker = ImpactTracker(data_dir=str(tmp_path))
+    tracker.track_action('alice', ACTIONS[0])
+    tracker.close()
+    
+    reopened = ImpactTracker(data_dir=str(tmp_path))
+    try:
+        assert reopened.get_user_impact_summary('alice')['total_actions'] == 1
+    finally:
+        reopened.close()
+
+def test_full_batch_commits_off_the_calling_thread(tracker):
+    """The action that fills a batch hands the commit to the timer thread instead of writing inline"""
+    insert_records = tracker._insert_records
+    committing_threads = []
+    
+    def recording_insert(user_id, records):
+        committing_threads.append(threading.current_thread())
+        insert_records(user_id, records)
+    
+    tracker._insert_records = recording_insert
+    for _ in range(PENDING_FLUSH_SIZE):
+        tracker.track_action('alice', ACTIONS[0])
+    wait_for_timer(tracker)
+    
+    assert committing_threads and threading.main_thread() not in committing_threads
+    assert stored_rows(tracker) == PENDING_FLUSH_SIZE
+
+def test_legacy_import_adds_to_existing_rollup(tmp_path):
+    """A legacy file imported into a database that already has actions adds to the user's totals"""
+    tracker = ImpactTracker(data_dir=str(tmp_path))
+    live = tracker.track_action('carol', ACTIONS[0])
+    tracker.close()
+    
+    with open(tmp_path / "carol_impacts.json", 'w') as f:
+        json.dump([legacy_record('Biked', 2.0), legacy_record('Walked', 1.0)], f)
+    tracker = ImpactTracker(data_dir=str(tmp_path))
+    try:
+        summary = tracker.get_user_impact_summary('carol')
+        assert summary['total_actions'] == 3
+        assert summary['total_carbon_saved_kg'] == round(live.carbon_saved_kg + 3.0, 2)
+        assert summary['action_breakdown']['transportation']['count'] == 3
+    finally:
+        tracker.close()
+
+def test_close_refreshes_planner_statistics(tmp_path):
+    """close() runs PRAGMA optimize, which leaves sqlite_stat1 behind for the next process"""
+    tracker = ImpactTracker(data_dir=str(tmp_path))
+    tracker.track_actions_bulk('alice', ACTIONS)
+    tracker.get_user_impact_summary('alice')
+    tracker.get_leaderboard()
+    tracker.close()
+    
+    conn = sqlite3.connect(str(tmp_path / "impacts.db"))
+    try:
+        assert conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone()[0] == 1
+    finally:
+        conn.close()
+
+def test_close_is_idempotent(tmp_path):
+    """Closing twice (e.g. explicitly, then from another owner) does nothing the second time"""
+    tracker = ImpactTracker(data_dir=str(tmp_path))
+    tracker.track_action('alice', ACTIONS[0])
+    tracker.close()
+    tracker.close()
+
+def test_single_action_coefficients_match_bulk(tracker):
+    """The precomputed per-action coefficients give the bulk result at any quantity"""
+    actions = [
+        {'action_type': action_type, 'subtype': subtype, 'quantity': quantity}
+        for action_type, subtypes in tracker.impact_factors.items() for subtype in subtypes
+        for quantity in (0, 1, 2.5, 40)
+    ]
+    for action, row in zip(actions, tracker.bulk_calculate_impact(actions)):
+        assert list(tracker._calculate_impact(action).values()) == pytest.approx(row.tolist())
+
+def test_cached_summary_expires_after_ttl(tracker, monkeypatch):
+    """Summaries cached with a zero TTL are recomputed on the next read"""
+    monkeypatch.setattr(settings, 'IMPACT_SUMMARY_TTL_SECONDS', 0)
+    tracker.track_action('alice', ACTIONS[0])
+    summary = tracker.get_user_impact_summary('alice')
+    
+    expired = tracker.get_user_impact_summary('alice')
+    assert expired is not summary and expired == summary
+
+def test_missing_location_and_unit_are_accepted(tracker):
+    """None for location or unit is stored as-is instead of failing on interning"""
+    action = {**ACTIONS[0], 'location': None, 'unit': None}
+    assert tracker.track_action('alice', action).location is None
+    assert tracker.track_actions_bulk('alice', [action])[0].unit is None
+    
+    recent = tracker.get_user_impact_summary('alice')['recent_actions']
+    assert recent[-1]['location'] is None and recent[-1]['unit'] is None
+
+def test_failed_group_commit_is_requeued(tracker, monkeypatch):
+    """A commit that fails on the timer thread keeps its records queued without failing later callers"""
+    monkeypatch.setattr(impact_tracker, 'PENDING_FLUSH_INTERVAL', 60)
+    insert_records = tracker._insert_records
+    
+    def failing_insert(user_id, records):
+        raise RuntimeError("disk I/O error")
+    
+    tracker._insert_records = failing_insert
+    tracker.track_action('alice', ACTIONS[0])
+    tracker._flush_on_timer()
+    tracker.track_action('alice', ACTIONS[1])
+    assert tracker._pending_count == 2
+    assert tracker._flush_timer is not None
+    
+    # The queued records are written once the database recovers
+    tracker._insert_records = insert_records
+    tracker._flush_on_timer()
+    assert stored_rows(tracker) == 2
+    assert tracker.get_user_impact_summary('alice')['total_actions'] == 2
+
+def test_pending_queue_is_bounded(tracker):
+    """Callers commit synchronously instead of queueing past PENDING_MAX_SIZE"""
+    tracker._schedule_flush = lambda delay: None  # keep the timer from draining the queue
+    for _ in range(PENDING_MAX_SIZE + 10):
+        tracker.track_action('alice', ACTIONS[0])
+    
+    assert tracker._pending_count <= PENDING_MAX_SIZE
+    assert tracker.get_user_impact_summary('alice')['total_actions'] == PENDING_MAX_SIZE + 10
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -11,11 +11,11 @@ def test_python_version():
     """Test Python version compatibility"""
     print("🐍 Testing Python version...")
     version = sys.version_info
-    if version.major >= 3 and version.minor >= 8:
+    if version >= (3, 10):
         print(f"✅ Python {version.major}.{version.minor}.{version.micro} - Compatible")
         return True
     else:
-        print(f"❌ Python {version.major}.{version.minor}.{version.micro} - Requires Python 3.8+")
+        print(f"❌ Python {version.major}.{version.minor}.{version.micro} - Requires Python 3.10+")
         return False
 
 def test_dependencies():
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Offline tests for WatsonXClient's text handling (no model or IAM requests are made)
+"""
+import gc
+import sys
+import weakref
+sys.path.append('.')
+
+import pytest
+
+pytest.importorskip("ibm_watsonx_ai")
+from backend.watsonx_integration.watsonx_client import WatsonXClient
+
+PLANS = [
+    "1. Install a smart thermostat this month\n• Switch to LED bulbs\nImmediate: seal the window drafts\nshort\n",
+    "Overview\r\n  1. Start composting kitchen scraps  \r\n• Bike to work twice a week\r\nTop PRIORITY is insulation of the attic\r\n",
+    "\n".join(f"• Priority action number {i} for the household" for i in range(8)),
+    "Nothing to see here\nJust prose without markers",
+]
+
+def reference_priority_actions(plan_text, current_actions):
+    """The line-by-line scan the compiled regex replaces"""
+    priorities = []
+    for line in plan_text.split('\n'):
+        line = line.strip()
+        if (line.startswith('1.') or line.startswith('•') or
+            'priority' in line.lower() or 'immediate' in line.lower()):
+            if len(line) > 10 and not any(action.lower() in line.lower() for action in current_actions):
+                priorities.append(line.lstrip('1234567890.• '))
+    return priorities[:5]
+
+@pytest.mark.parametrize("plan", PLANS)
+def test_priority_actions_match_line_scan(plan):
+    """The regex pass picks the same priority lines as scanning line by line"""
+    client = WatsonXClient.__new__(WatsonXClient)
+    for current_actions in ([], ["LED bulbs"], ["composting", "Insulation"]):
+        assert client._extract_priority_actions(plan, current_actions) == reference_priority_actions(plan, current_actions)
+
+class BatchModel:
+    """generate_text stand-in that answers list prompts and can fail chosen calls"""
+    
+    def __init__(self, fail_calls=()):
+        self.fail_calls = set(fail_calls)
+        self.batches = []
+    
+    def generate_text(self, prompt, concurrency_limit=None):
+        self.batches.append(len(prompt))
+        if len(self.batches) in self.fail_calls:
+            raise RuntimeError("rate limited")
+        return [f"model answer {len(self.batches)}" for _ in prompt]
+
+def test_batch_generation_sends_groups_and_falls_back_per_group():
+    """Prompts go out in groups of GENERATION_BATCH_SIZE, and only a failed group falls back"""
+    from backend.watsonx_integration import watsonx_client
+    
+    client = WatsonXClient.__new__(WatsonXClient)
+    client.use_fallback = False
+    client.model = BatchModel(fail_calls={2})
+    prompts = [f"question {i} about solar panels" for i in range(watsonx_client.GENERATION_BATCH_SIZE + 3)]
+    
+    responses = client.generate_responses_batch(prompts)
+    assert client.model.batches == [watsonx_client.GENERATION_BATCH_SIZE, 3]
+    assert len(responses) == len(prompts)
+    assert all(response == ("model answer 1", True) for response in responses[:watsonx_client.GENERATION_BATCH_SIZE])
+    assert all("model answer" not in text and not generated for text, generated in responses[watsonx_client.GENERATION_BATCH_SIZE:])
+
+class TextModel:
+    """generate_text stand-in that returns a fixed answer"""
+    
+    def __init__(self, text):
+        self.text = text
+    
+    def generate_text(self, prompt):
+        return self.text
+
+def test_response_status_flags_only_complete_model_output():
+    """Model answers are flagged complete; the fallback and answers at the length limit are not"""
+    client = WatsonXClient.__new__(WatsonXClient)
+    client.use_fallback = True
+    assert client.generate_response_with_status("How do I save energy?")[1] is False
+    
+    client.use_fallback = False
+    client.model = TextModel("Install a smart thermostat.")
+    assert client.generate_response_with_status("How do I save energy?") == ("Install a smart thermostat.", True)
+    
+    client.model = TextModel("Insulate the attic. " * 100)
+    text, generated = client.generate_response_with_status("How do I save energy?")
+    assert not generated and "[Response continues" in text
+
+class Recorder:
+    """Stands in for an SDK class, keeping the keyword arguments it was constructed with"""
+    
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+
+def test_model_shares_one_keep_alive_pool(monkeypatch):
+    """The model is built on one API client whose httpx pool fits a generation batch and outlives idle gaps"""
+    from backend.watsonx_integration import watsonx_client
+    monkeypatch.setattr(watsonx_client, 'APIClient', Recorder)
+    monkeypatch.setattr(watsonx_client, 'ModelInference', Recorder)
+    monkeypatch.setattr(watsonx_client.settings, 'WATSONX_WARM_UP', False)
+    
+    client = WatsonXClient.__new__(WatsonXClient)
+    client.api_key, client.credentials = "key", {"url": "https://us-south.ml.cloud.ibm.com"}
+    client.access_token, client.project_id = "token", "project"
+    client._initialize_model()
+    
+    assert not client.use_fallback
+    http_client = client.model.kwargs['api_client'].kwargs['httpx_client']
+    assert isinstance(http_client, watsonx_client.httpx.Client)
+    assert watsonx_client.HTTP_LIMITS.max_connections >= watsonx_client.GENERATION_BATCH_SIZE
+    assert watsonx_client.HTTP_LIMITS.keepalive_expiry > 5
+    http_client.close()
+
+def test_fallback_responses_do_not_pin_the_client():
+    """Fallback answers are memoized at module level, so a discarded client can be collected"""
+    client = WatsonXClient.__new__(WatsonXClient)
+    answer = client._generate_fallback_response("How do I cut my carbon footprint?")
+    assert "Carbon Reduction" in answer
+    assert client._generate_fallback_response("How do I cut my carbon footprint?") is answer
+    
+    ref = weakref.ref(client)
+    del client
+    gc.collect()
+    assert ref() is None
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))